@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import fetchAllHistory from '../history';
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import API_URL from '../config';
 
@@ -11,8 +11,7 @@ const Archive = () => {
     const fetchHistory = async () => {
         setLoading(true);
         try {
-            const response = await axios.get(`${API_URL}/archive/${symbol}`);
-            setHistory(response.data.history);
+            setHistory(await fetchAllHistory(`${API_URL}/archive/${symbol}`));
         } catch (err) {
             console.error(err);
         } finally {
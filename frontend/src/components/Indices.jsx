@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import fetchAllHistory from '../history';
 import API_URL from '../config';
 
 const Indices = () => {
@@ -10,8 +10,7 @@ const Indices = () => {
         const fetchHistory = async () => {
             setLoading(true);
             try {
-                const response = await axios.get(`${API_URL}/indices/history`);
-                setHistory(response.data.history);
+                setHistory(await fetchAllHistory(`${API_URL}/indices/history`));
             } catch (err) {
                 console.error(err);
             } finally {
@@ -1,5 +1,4 @@
-import React, { useState, useEffect } from 'react';
-import axios from 'axios';
+import React, { useState, useEffect, useRef } from 'react';
 import API_URL from '../config';
 import OverviewTable from './OverviewTable';
 
@@ -7,19 +6,44 @@ const MarketOverview = () => {
     const [overview, setOverview] = useState([]);
     const [loading, setLoading] = useState(false);
     const [selectedDate, setSelectedDate] = useState(new Date().toISOString().split('T')[0]);
+    const requestRef = useRef(null);
 
     const fetchOverview = async (date) => {
+        // A newer request (e.g. date change) cancels the stream in progress
+        if (requestRef.current) requestRef.current.abort();
+        const controller = new AbortController();
+        requestRef.current = controller;
         setLoading(true);
+        setOverview([]);
         try {
+            // NDJSON stream: rows appear as soon as each symbol is ready
             const url = date
-                ? `${API_URL}/market/overview?date=${date}`
-                : `${API_URL}/market/overview`;
-            const response = await axios.get(url);
-            setOverview(response.data.overview);
+                ? `${API_URL}/market/overview/stream?date=${date}`
+                : `${API_URL}/market/overview/stream`;
+            const response = await fetch(url, { signal: controller.signal });
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            while (true) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                const rows = lines
+                    .filter((line) => line.trim())
+                    .map((line) => JSON.parse(line))
+                    .filter((event) => event.type === 'overview' && event.overview)
+                    .map((event) => event.overview);
+                if (rows.length) {
+                    setOverview((prev) => [...prev, ...rows]);
+                    setLoading(false);
+                }
+            }
         } catch (err) {
-            console.error(err);
+            if (err.name !== 'AbortError') console.error(err);
         } finally {
-            setLoading(false);
+            if (requestRef.current === controller) setLoading(false);
         }
     };
 
@@ -0,0 +1,18 @@
+import axios from 'axios';
+
+// The history endpoints return one keyset page at a time; follow
+// next_cursor until the whole range has been read.
+const fetchAllHistory = async (url, params = {}) => {
+    const rows = [];
+    let cursor = null;
+    do {
+        const response = await axios.get(url, {
+            params: { ...params, limit: 5000, ...(cursor ? { cursor } : {}) }
+        });
+        rows.push(...response.data.history);
+        cursor = response.data.next_cursor;
+    } while (cursor);
+    return rows;
+};
+
+export default fetchAllHistory;
@@ -1,16 +1,29 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .routes import router
+from .routes import router, job_queue
 from ..core.scheduler import start_scheduler
+from ..core.config import settings
+from ..core.mongo import ensure_indexes, close_clients
+from ..core.jobs import JobWorkers
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    try:
+        ensure_indexes()
+    except Exception as e:
+        print(f"Warning: index migration failed: {e}")
     scheduler = start_scheduler()
+    # Background jobs run in a separate worker process (src/scripts/worker.py)
+    # unless JOB_WORKERS gives this process threads of its own
+    job_workers = JobWorkers(job_queue).start() if settings.JOB_WORKERS > 0 else None
     yield
     # Shutdown
     scheduler.shutdown()
+    if job_workers:
+        job_workers.stop(timeout=5)
+    close_clients()
 
 app = FastAPI(title="Antigravity API", lifespan=lifespan)
 
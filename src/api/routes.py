@@ -1,15 +1,25 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import pandas as pd
 import numpy as np
 
 from src.services.logic import MarketService, SimulationService
-from src.core.repository import WishlistRepository
+from src.core.repository import WishlistRepository, AsyncWishlistRepository
+from src.core.models import WishlistItem, SimulationChart
 from src.core.database import Database
-from src.data.loader import DataLoader
+from src.data.cache import frame_cache
+from src.core.singleflight import singleflight_stats
+from src.core.response_cache import response_cache
+from src.core.freshness import freshness
+from src.core.jobs import JobQueue, FINISHED, SUCCEEDED
+import src.services.jobs  # noqa: F401 (registers the job handlers)
 from src.features.pipeline import FeaturePipeline
-from src.models.registry import ModelRegistry
+from src.models.registry import ModelRegistry, model_cache
 from src.models.hmm import RegimeDetector
 from src.core.config import settings
 
@@ -17,54 +27,127 @@ router = APIRouter()
 
 market_service = MarketService()
 simulation_service = SimulationService()
+forecast_pipeline = FeaturePipeline()
+model_registry = ModelRegistry(settings.MODELS_DIR)
 try:
     wishlist_repo = WishlistRepository()
 except Exception as e:
     print(f"Warning: WishlistRepository init failed: {e}")
     wishlist_repo = None
+# Async endpoints await Mongo directly instead of borrowing a worker thread
+async_wishlist_repo = AsyncWishlistRepository() if wishlist_repo and settings.DATABASE_URL.startswith("mongodb") else None
+job_queue = JobQueue()
 
 # ------------------------------------------------------------------
 # NEW ARCHITECTURE ENDPOINTS
 # ------------------------------------------------------------------
 
-@router.get("/market/overview")
-def get_market_overview(date: Optional[str] = None):
-    """
-    Get market overview for watchlist symbols.
-    """
-    if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
-        
+DEFAULT_OVERVIEW_SYMBOLS = ["SPY", "QQQ", "IWM", "DIA", "GLD", "BTC-USD", "ETH-USD", "NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA"]
+
+async def _overview_symbols() -> List[str]:
     symbols = []
     if wishlist_repo:
         try:
-            symbols = wishlist_repo.get_all_symbols()
+            if async_wishlist_repo:
+                symbols = await async_wishlist_repo.get_all_symbols()
+            else:
+                # Embedded store: short local query in a worker thread
+                symbols = await asyncio.to_thread(wishlist_repo.get_all_symbols)
         except Exception as e:
             print(f"Warning: Wishlist fetch failed: {e}")
             
     if not symbols:
         # Default symbols if watchlist empty or DB failed
-        symbols = ["SPY", "QQQ", "IWM", "DIA", "GLD", "BTC-USD", "ETH-USD", "NVDA", "AAPL", "MSFT", "AMZN", "GOOGL", "META", "TSLA"]
+        symbols = DEFAULT_OVERVIEW_SYMBOLS
+    return symbols
+
+def _overview_dict(ov) -> Dict[str, Any]:
+    # Convert Pydantic to dict
+    ov_dict = ov.model_dump()
+    # Add legacy fields for frontend compatibility if needed
+    # Frontend expects: symbol, date, price, volatility, regime, trend
+    ov_dict['trend'] = "Neutral" # Placeholder
+    ov_dict['stale'] = ov.stale
+    return ov_dict
+
+@router.get("/market/overview")
+async def get_market_overview(request: Request, date: Optional[str] = None):
+    """
+    Get market overview for watchlist symbols.
+    Symbols are computed concurrently, so the response takes as long as the
+    slowest symbol (capped by OVERVIEW_DEADLINE). Symbols that are not ready
+    are listed in 'status' and finish in the background.
+    Complete overviews are cached until the next freshness change point.
+    """
+    if not date:
+        date = datetime.now().strftime("%Y-%m-%d")
         
-    overview = []
-    for sym in symbols:
-        try:
-            # This will fetch from DB or compute & save
-            ov = market_service.get_overview(sym, date)
-            # Convert Pydantic to dict
-            ov_dict = ov.model_dump()
-            # Add legacy fields for frontend compatibility if needed
-            # Frontend expects: symbol, date, price, volatility, regime, trend
-            ov_dict['trend'] = "Neutral" # Placeholder
-            overview.append(ov_dict)
-        except Exception as e:
-            print(f"Error for {sym}: {e}")
-            continue
-            
-    return {"overview": overview}
+    symbols = await _overview_symbols()
+    key = ("overview", date, tuple(symbols),
+           tuple(freshness.last_change_point(s).isoformat() for s in symbols))
+    cached = response_cache.lookup(request, key)
+    if cached is not None:
+        return cached
+
+    results = await market_service.aget_overviews(symbols, date)
+
+    overview = [_overview_dict(res["overview"]) for res in results.values() if res["overview"] is not None]
+    status = {sym: {"status": res["status"], "error": res["error"]} for sym, res in results.items()}
+    content = {
+        "overview": overview,
+        "status": status,
+        "complete": all(res["overview"] is not None for res in results.values())
+    }
+    if not content["complete"] or any(res["status"] == "stale" for res in results.values()):
+        # Pending and stale symbols finish in the background; ask again for the rest
+        return content
+    return response_cache.store(request, key, content)
+
+@router.get("/market/overview/stream")
+async def stream_market_overview(date: Optional[str] = None, format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    """
+    Streaming variant of /market/overview: one event per symbol as soon as it
+    is ready (stored overviews first), then a summary event.
+    format=ndjson emits JSON lines with a "type" field; format=sse emits
+    Server-Sent Events named "overview" and "summary".
+    """
+    if not date:
+        date = datetime.now().strftime("%Y-%m-%d")
+
+    symbols = await _overview_symbols()
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    def encode(event: str, payload: Dict[str, Any]) -> str:
+        if format == "sse":
+            return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+        return json.dumps({"type": event, **payload}, default=str) + "\n"
+
+    async def events():
+        counts: Dict[str, int] = {}
+        async for symbol, res in market_service.astream_overviews(symbols, date):
+            counts[res["status"]] = counts.get(res["status"], 0) + 1
+            yield encode("overview", {
+                "symbol": symbol,
+                "status": res["status"],
+                "error": res["error"],
+                "overview": _overview_dict(res["overview"]) if res["overview"] is not None else None
+            })
+        yield encode("summary", {
+            "date": date,
+            "total": sum(counts.values()),
+            "counts": counts,
+            "complete": sum(counts.get(s, 0) for s in ("cached", "stale", "computed")) == sum(counts.values()),
+            "elapsed_ms": round((loop.time() - started) * 1000, 1)
+        })
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # Disable proxy buffering so each event reaches the client immediately
+    return StreamingResponse(events(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.get("/simulation/advanced/{symbol}")
-def get_advanced_simulation(symbol: str, date: Optional[str] = None, horizons: str = "10,30,100,365,547,730", method: str = "garch", conservative: bool = False):
+def get_advanced_simulation(symbol: str, request: Request, date: Optional[str] = None, horizons: str = "10,30,100,365,547,730", method: str = "garch", conservative: bool = False):
     """
     Run advanced realistic simulation.
     """
@@ -76,106 +159,40 @@ def get_advanced_simulation(symbol: str, date: Optional[str] = None, horizons: s
         horizon_list = [int(h) for h in horizons.split(",")]
     else:
         horizon_list = [10, 30, 100, 365, 547, 730]
-    
+
+    return response_cache.cached(
+        request,
+        lambda: ("simulation", symbol, date, tuple(horizon_list), conservative, market_service.loader.fingerprint(symbol)),
+        lambda: _advanced_simulation(symbol, date, horizon_list, conservative),
+        cacheable=lambda content: not content["stale"]
+    )
+
+def _advanced_simulation(symbol: str, date: str, horizon_list: List[int], conservative: bool = False) -> Dict[str, Any]:
     try:
-        # Use the new service
-        # Note: The service currently doesn't support 'method' or 'conservative' params in run_simulation signature
-        # We should update the service or just pass them if we update the service.
-        # For now, let's use the service's default logic which is GARCH.
-        # If user wants bootstrap, we might need to bypass service or update it.
-        # The prompt asked for "Simulation Pipeline Connectors".
-        # Let's assume the service handles the "best" method (GARCH).
-        
-        result = simulation_service.run_simulation(symbol.upper(), date, horizon_list)
-        
-        # Transform result to match what frontend expects (it expects 'quantiles' dict, 'paths', 'analysis')
-        # The service returns 'runs' list. We need to adapt.
-        
-        quantiles = {}
-        analysis = {}
-        
-        for run in result['runs']:
-            h = run['horizon']
-            quantiles[h] = {
-                'p10': run['p10'],
-                'p50': run['p50'],
-                'p90': run['p90']
-            }
-            # Generate analysis text
-            upside = (run['p90'] / 1.0 - 1) * 100 # We need start price? 
-            # The run object has p10/p50/p90 as PRICES.
-            # We need current price to calc pct.
-            # We can get it from market_service
-            
-        # Get current price for pct calc
-        ov = market_service.get_overview(symbol.upper(), date)
-        current_price = ov.price
-        
-        for h, q in quantiles.items():
-            upside = (q['p90'] / current_price - 1) * 100
-            downside = (q['p10'] / current_price - 1) * 100
-            
-            risk_label = "Moderate"
-            if downside < -20 and h <= 30: risk_label = "High Crash Risk"
-            elif downside < -40: risk_label = "High Risk"
-            elif upside > 50 and downside > -10: risk_label = "Bullish Skew"
-            
-            analysis[h] = {
-                "risk_label": risk_label,
-                "upside_pct": upside,
-                "downside_pct": downside,
-                "interpretation": f"P90: +{upside:.1f}%, P10: {downside:.1f}% ({risk_label})"
-            }
-            
-        # We also need 'paths' for the chart. The service saves runs but maybe not paths?
-        # The prompt said "Store simulation scenarios".
-        # The SimulationRun model doesn't have 'paths'.
-        # We might need to re-run simulation for the chart or store paths.
-        # For now, let's re-run a small batch for visualization or add paths to model.
-        # I'll re-run a quick simulation for visualization only.
-        
-        sim = simulation_service.simulator
-        # We need params
-        # This is getting complicated to reconstruct. 
-        # Ideally the service returns everything.
-        # Let's just return what we have and maybe the frontend can handle it?
-        # The frontend expects 'paths'.
-        
-        # Quick fix: Generate paths on the fly for visualization
-        # (This violates "Never regenerate", but paths are heavy to store in Mongo if we store 1000x730 floats)
-        # Maybe store a sample?
-        
-        # Let's call the simulator directly for paths
-        loader = DataLoader(settings.DATA_CACHE_DIR)
-        df = loader.get_data(symbol.upper())
-        returns = df['Close'].pct_change().dropna()
-        hmm = RegimeDetector()
-        hmm.fit(returns)
-        regimes = hmm.predict(returns)
-        params = sim.fit_regime_params(returns, regimes)
-        transmat = hmm.model.transmat_
-        
-        sim_res = sim.simulate_paths(
-            start_price=current_price,
-            start_regime=int(regimes[-1]),
-            params=params,
-            transmat=transmat,
-            days=730,
-            sims=20, # Small number for chart
-            conservative=conservative
-        )
+        # One data load, one model fit and one simulation (or a pure read of the
+        # stored runs and fan chart); the service returns everything we serve.
+        # 'method' is accepted for compatibility; the service always runs the
+        # regime-switching GARCH model. 'conservative' selects the fan chart
+        # with damped tails (quantiles stay on the baseline).
+        result = simulation_service.run_simulation(symbol.upper(), date, horizon_list, conservative)
+        chart = SimulationChart(**result['chart'])
         
         return {
             "symbol": symbol,
             "method": "Regime-Switching GARCH + Jump Diffusion",
-            "current_price": current_price,
+            "current_price": result['current_price'],
             "current_regime": {
-                "id": int(regimes[-1]),
+                "id": result['regime_id'],
                 "label": result['regime']
             },
-            "quantiles": quantiles,
-            "analysis": analysis,
-            "paths": sim_res['paths'].tolist()
+            "quantiles": result['quantiles'],
+            "analysis": result['analysis'],
+            "stale": result['stale'],
+            "paths": chart.paths_array().tolist(),
+            "bands": {
+                "levels": chart.levels,
+                "values": chart.bands_array().tolist()
+            }
         }
         
     except Exception as e:
@@ -221,8 +238,12 @@ def remove_from_watchlist(symbol: str):
     return {"status": "removed", "symbol": symbol}
 
 @router.get("/watchlist/overview")
-def get_watchlist_overview(date: Optional[str] = None):
-    return get_market_overview(date)
+async def get_watchlist_overview(request: Request, date: Optional[str] = None):
+    return await get_market_overview(request, date)
+
+@router.get("/watchlist/overview/stream")
+async def stream_watchlist_overview(date: Optional[str] = None, format: str = Query("ndjson", pattern="^(ndjson|sse)$")):
+    return await stream_market_overview(date, format)
 
 # ------------------------------------------------------------------
 # LEGACY ENDPOINTS (Preserved for Dashboard Compatibility)
@@ -230,13 +251,28 @@ def get_watchlist_overview(date: Optional[str] = None):
 
 @router.get("/health")
 def health_check():
-    return {"status": "ok", "version": settings.VERSION}
+    return {
+        "status": "ok",
+        "version": settings.VERSION,
+        "data_cache": frame_cache.stats(),
+        "model_cache": model_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "singleflight": singleflight_stats()
+    }
 
 @router.get("/forecast/{symbol}")
-def get_forecast(symbol: str):
+def get_forecast(symbol: str, request: Request):
     """
     Legacy forecast endpoint for Dashboard.
+    Served from the response cache until the symbol's data or models change.
     """
+    return response_cache.cached(
+        request,
+        lambda: ("forecast", symbol, market_service.loader.fingerprint(symbol), model_registry.version(symbol)),
+        lambda: _forecast(symbol)
+    )
+
+def _forecast(symbol: str) -> Dict[str, Any]:
     # Lazy imports to save memory on startup
     from src.models.lightgbm_forecaster import ForecastModel
     from src.models.monte_carlo import Simulator
@@ -244,9 +280,10 @@ def get_forecast(symbol: str):
     from src.models.kalman_filter import KalmanTrend
     from src.models.transformer_model import TransformerForecaster
 
-    loader = DataLoader(settings.DATA_CACHE_DIR)
-    pipeline = FeaturePipeline()
-    registry = ModelRegistry(settings.MODELS_DIR)
+    # Shared loader and registry: data frames and fitted models stay in memory
+    loader = market_service.loader
+    pipeline = forecast_pipeline
+    registry = model_registry
     db = Database()
     ensemble = EnsembleModel()
 
@@ -279,6 +316,7 @@ def get_forecast(symbol: str):
 
         horizons = [10, 100, 365, 547, 730]
         forecasts = {}
+        forecast_rows = []
         
         current_price = df['Close'].iloc[-1]
         current_date = str(df.index[-1].date())
@@ -341,7 +379,17 @@ def get_forecast(symbol: str):
             forecasts[f"{h}d"]["analysis"] = analysis_text
             forecasts[f"{h}d"]["components"]["Monte Carlo P50"] = mc_p50
 
-            db.save_forecast(current_date, symbol, h, float(final_log_return), float(current_price), str(target_date))
+            forecast_rows.append({
+                "date": current_date,
+                "symbol": symbol,
+                "horizon": h,
+                "prediction": float(final_log_return),
+                "start_price": float(current_price),
+                "target_date": str(target_date)
+            })
+
+        # One write for all horizons
+        db.save_forecasts(forecast_rows)
 
         return {
             "symbol": symbol,
@@ -359,15 +407,106 @@ def get_forecast(symbol: str):
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/archive/{symbol}")
-def get_archive(symbol: str):
+INDEX_SYMBOLS = ["SPY", "QQQ", "DIA", "IWM", "^VIX"]
+
+def _history_response(symbols: List[str], start: Optional[str], end: Optional[str], fields: Optional[str],
+                      limit: int, cursor: Optional[str], format: str, extra: Dict[str, Any]):
+    """
+    Shared body of the archive endpoints: one keyset page as JSON,
+    or the full range streamed as JSON Lines (format=jsonl).
+    """
     db = Database()
-    history = db.get_history(symbol)
-    return {"symbol": symbol, "history": history}
+    columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        if format == "jsonl":
+            # Validate up front so bad parameters fail before the stream starts
+            db.query_history(symbols, start, end, columns, limit=1, cursor=cursor)
+            rows = db.iter_history(symbols, start, end, columns, cursor=cursor)
+            lines = (json.dumps(row, default=str) + "\n" for row in rows)
+            return StreamingResponse(lines, media_type="application/x-ndjson")
+        history, next_cursor = db.query_history(symbols, start, end, columns, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**extra, "history": history, "next_cursor": next_cursor}
 
-@router.get("/indices/history")
-def get_indices_history():
+@router.get("/accuracy")
+def get_accuracy(symbols: Optional[str] = None, horizons: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None, by_month: bool = True):
+    """Per symbol / horizon / month MAE, RMSE, hit rate and bias of reconciled forecasts."""
     db = Database()
-    indices = ["SPY", "QQQ", "DIA", "IWM", "^VIX"]
-    history = db.get_indices_history(indices)
-    return {"history": history}
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else None
+    try:
+        horizon_list = [int(h) for h in horizons.split(",") if h.strip()] if horizons else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="horizons must be comma-separated integers")
+    metrics = db.accuracy(symbol_list, horizon_list, start, end, by_month)
+    return {"version": db.forecasts_version(), "metrics": metrics}
+
+@router.get("/archive/{symbol}")
+def get_archive(symbol: str, request: Request, start: Optional[str] = None, end: Optional[str] = None,
+                fields: Optional[str] = None, limit: int = Query(500, ge=1, le=5000),
+                cursor: Optional[str] = None, format: str = Query("json", pattern="^(json|jsonl)$")):
+    if format == "jsonl":
+        return _history_response([symbol], start, end, fields, limit, cursor, format, {"symbol": symbol})
+    # Pages only change when forecasts or actuals are written
+    return response_cache.cached(
+        request,
+        lambda: ("archive", symbol, start, end, fields, limit, cursor, Database().forecasts_version()),
+        lambda: _history_response([symbol], start, end, fields, limit, cursor, format, {"symbol": symbol})
+    )
+
+@router.get("/indices/history")
+def get_indices_history(start: Optional[str] = None, end: Optional[str] = None,
+                        fields: Optional[str] = None, limit: int = Query(500, ge=1, le=5000),
+                        cursor: Optional[str] = None, format: str = Query("json", pattern="^(json|jsonl)$")):
+    return _history_response(INDEX_SYMBOLS, start, end, fields, limit, cursor, format, {})
+
+# ------------------------------------------------------------------
+# BACKGROUND JOBS
+# ------------------------------------------------------------------
+
+class JobRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+
+@router.post("/jobs", status_code=202)
+def submit_job(job: JobRequest):
+    """
+    Queue a long-running job ("simulation", "calibration" or "backfill").
+    Returns at once; poll /jobs/{id} for progress and the result.
+    """
+    try:
+        return job_queue.submit(job.kind, job.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs")
+def list_jobs(status: Optional[str] = None, kind: Optional[str] = None, limit: int = Query(50, ge=1, le=500)):
+    return {"jobs": job_queue.list(status, kind, limit)}
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, progress and, once it has succeeded, the result of a job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in FINISHED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    if job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job['status']}: {job['error'] or 'no result'}")
+    return job["result"]
+
+@router.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued job, or ask a running one to stop at its next progress report."""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
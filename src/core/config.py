@@ -12,6 +12,10 @@ class Settings:
     PROJECT_NAME: str = "Antigravity"
     VERSION: str = "0.1.0"
     DATA_CACHE_DIR: str = "data/cache"
+    DATA_CACHE_BACKEND: str = os.getenv("DATA_CACHE_BACKEND", "parquet") # "parquet" or "arrow" (memory-mapped)
+    # Optional consolidated dataset (symbol/year partitions) for cross-symbol reads
+    DATA_DATASET_DIR: str = "data/dataset"
+    DATA_DATASET_ENABLED: bool = os.getenv("DATA_DATASET_ENABLED", "false").lower() in ("1", "true", "yes")
     MODELS_DIR: str = "models"
     SYMBOLS: list = ["SPY", "QQQ", "IWM"] # Default symbols to track
     
@@ -21,7 +25,37 @@ class Settings:
     # Business cycle: 10 years * 252 days = 2520 days
     BUSINESS_CYCLE_DAYS: int = 2520
     
+    # Data source: "yfinance", "synthetic" (offline, deterministic) or "replay" (local files)
+    DATA_PROVIDER: str = os.getenv("DATA_PROVIDER", "yfinance")
+    DATA_SYNTHETIC_SEED: int = int(os.getenv("DATA_SYNTHETIC_SEED", "42"))
+    DATA_REPLAY_DIR: str = os.getenv("DATA_REPLAY_DIR", "data/replay")
+    
+    # Data ingestion (bulk downloads)
+    DATA_FETCH_WORKERS: int = int(os.getenv("DATA_FETCH_WORKERS", "8"))
+    DATA_FETCH_RATE: float = float(os.getenv("DATA_FETCH_RATE", "5")) # Requests per second per host
+    DATA_FETCH_RETRIES: int = int(os.getenv("DATA_FETCH_RETRIES", "3"))
+    FRESHNESS_INTRADAY_MINUTES: int = int(os.getenv("FRESHNESS_INTRADAY_MINUTES", "120")) # Refresh cadence while the market is open
+    OVERVIEW_WORKERS: int = int(os.getenv("OVERVIEW_WORKERS", "8")) # Parallel overview computations
+    OVERVIEW_SYMBOL_TIMEOUT: float = float(os.getenv("OVERVIEW_SYMBOL_TIMEOUT", "20")) # Seconds per symbol
+    OVERVIEW_DEADLINE: float = float(os.getenv("OVERVIEW_DEADLINE", "25")) # Seconds for the whole dashboard
+    RESULT_MAX_STALENESS_MINUTES: int = int(os.getenv("RESULT_MAX_STALENESS_MINUTES", "360")) # Older stale results are recomputed in the request
+    REFRESH_WORKERS: int = int(os.getenv("REFRESH_WORKERS", "2")) # Background refreshes of stale results
+    JOBS_DB_PATH: str = os.getenv("JOBS_DB_PATH", "data/jobs.db") # SQLite job queue (shared by API and worker processes)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "0")) # Job threads in this process (API default 0: jobs run in src/scripts/worker.py)
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", "1"))
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60")) # Running jobs without a heartbeat this long are requeued
+    JOB_MAX_SIMS: int = int(os.getenv("JOB_MAX_SIMS", "20000")) # Paths per simulation job
+    DATA_MEMORY_CACHE_MB: int = int(os.getenv("DATA_MEMORY_CACHE_MB", "256")) # In-process DataFrame LRU budget
+    MODEL_CACHE_MB: int = int(os.getenv("MODEL_CACHE_MB", "512")) # In-process loaded-model LRU budget
+    RESPONSE_CACHE_MB: int = int(os.getenv("RESPONSE_CACHE_MB", "64")) # Rendered API responses (ETag cache)
+    RESPONSE_CACHE_MAX_AGE: int = int(os.getenv("RESPONSE_CACHE_MAX_AGE", "0")) # Seconds clients may reuse without revalidating
+    
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///data/forecasts.db")
+    SQLITE_MMAP_MB: int = int(os.getenv("SQLITE_MMAP_MB", "256"))
+    SQLITE_CACHE_MB: int = int(os.getenv("SQLITE_CACHE_MB", "64"))
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "50")) # Connections per process (shared client)
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
 
 settings = Settings()
@@ -1,63 +1,123 @@
 import sqlite3
+import threading
+import time
 import pandas as pd
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Tuple
 import numpy as np
 from .config import settings
 
+# Persistent SQLite connections, one per (thread, database file).
+# WAL lets readers run while the scheduler writes; NORMAL sync is safe with WAL.
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    f"PRAGMA mmap_size={settings.SQLITE_MMAP_MB * 1024 * 1024}",
+    f"PRAGMA cache_size=-{settings.SQLITE_CACHE_MB * 1024}",
+]
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized: set = set()
+
+# Accuracy results keyed by query, valid while the forecasts version is unchanged
+_accuracy_cache: Dict = {}
+_accuracy_lock = threading.Lock()
+
+def get_sqlite_connection(db_path: Path) -> sqlite3.Connection:
+    """
+    Return this thread's persistent connection to `db_path`, opening it on first use.
+    Statements are reused through sqlite3's per-connection statement cache.
+    """
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = str(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = sqlite3.connect(key, timeout=5.0, cached_statements=256)
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+        connections[key] = conn
+    return conn
+
+def close_sqlite_connections():
+    """Close the calling thread's connections (e.g. at worker shutdown)."""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+FORECAST_FIELDS = ["id", "date", "symbol", "horizon", "prediction", "start_price", "target_date", "actual", "created_at"]
+
+def sqlite_path(db_url: str) -> Path:
+    """Database file for a sqlite:///path URL (data/forecasts.db for anything else)."""
+    if db_url.startswith("sqlite:///"):
+        return Path(db_url.replace("sqlite:///", ""))
+    return Path("data/forecasts.db")
+
 class Database:
     def __init__(self):
         self.db_url = settings.DATABASE_URL
         self.is_mongo = self.db_url.startswith("mongodb")
         
         if self.is_mongo:
-            import pymongo
-            self.client = pymongo.MongoClient(self.db_url)
-            try:
-                self.db = self.client.get_default_database()
-            except pymongo.errors.ConfigurationError:
-                self.db = self.client.get_database("forcast_antigravity")
+            from .mongo import get_client, get_database
+            self.client = get_client(self.db_url)
+            self.db = get_database(self.db_url)
             self.forecasts = self.db.forecasts
         else:
             # SQLite fallback
             # Extract path from sqlite:///path/to/db or use default
-            if self.db_url.startswith("sqlite:///"):
-                self.db_path = Path(self.db_url.replace("sqlite:///", ""))
-            else:
-                self.db_path = Path("data/forecasts.db")
-                
+            self.db_path = sqlite_path(self.db_url)
             self.db_path.parent.mkdir(parents=True, exist_ok=True)
-            self._init_sqlite()
-
+            # Schema DDL runs once per database file per process
+            with _schema_lock:
+                if str(self.db_path) not in _initialized:
+                    self._init_sqlite()
+                    _initialized.add(str(self.db_path))
 
+    def _conn(self) -> sqlite3.Connection:
+        return get_sqlite_connection(self.db_path)
 
     def _init_sqlite(self):
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS forecasts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                symbol TEXT,
-                horizon INTEGER,
-                prediction REAL,
-                start_price REAL,
-                target_date TEXT,
-                actual REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                UNIQUE(date, symbol, horizon)
-            )
-        ''')
-        # Watchlist Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS watchlist (
-                symbol TEXT PRIMARY KEY,
-                added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        conn = self._conn()
+        with conn:
+            c = conn.cursor()
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS forecasts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT,
+                    symbol TEXT,
+                    horizon INTEGER,
+                    prediction REAL,
+                    start_price REAL,
+                    target_date TEXT,
+                    actual REAL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(date, symbol, horizon)
+                )
+            ''')
+            # Watchlist Table
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS watchlist (
+                    symbol TEXT PRIMARY KEY,
+                    added_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            # Version counter bumped whenever predictions or actuals change
+            c.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER
+                )
+            ''')
+            # History pages walk (symbol, date, id) in reverse; open forecasts are found by target date
+            c.execute('CREATE INDEX IF NOT EXISTS idx_forecasts_symbol_date ON forecasts(symbol, date, id)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_forecasts_date ON forecasts(date, id)')
+            c.execute('CREATE INDEX IF NOT EXISTS idx_forecasts_open ON forecasts(symbol, target_date) WHERE actual IS NULL')
 
     def add_to_watchlist(self, symbol: str):
         symbol = symbol.upper()
@@ -68,15 +128,9 @@ class Database:
                 upsert=True
             )
         else:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            try:
-                c.execute('INSERT INTO watchlist (symbol) VALUES (?)', (symbol,))
-                conn.commit()
-            except sqlite3.IntegrityError:
-                pass
-            finally:
-                conn.close()
+            conn = self._conn()
+            with conn:
+                conn.execute('INSERT OR IGNORE INTO watchlist (symbol) VALUES (?)', (symbol,))
 
     def remove_from_watchlist(self, symbol: str):
         symbol = symbol.upper()
@@ -86,11 +140,9 @@ class Database:
                 {"$pull": {"symbols": symbol}}
             )
         else:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute('DELETE FROM watchlist WHERE symbol = ?', (symbol,))
-            conn.commit()
-            conn.close()
+            conn = self._conn()
+            with conn:
+                conn.execute('DELETE FROM watchlist WHERE symbol = ?', (symbol,))
 
     def get_watchlist(self) -> List[str]:
         if self.is_mongo:
@@ -99,84 +151,273 @@ class Database:
                 return sorted(doc["symbols"])
             return []
         else:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._conn()
             c = conn.cursor()
             c.execute('SELECT symbol FROM watchlist ORDER BY symbol')
             rows = c.fetchall()
-            conn.close()
             return [row[0] for row in rows]
 
     def save_forecast(self, date: str, symbol: str, horizon: int, prediction: float, start_price: float, target_date: str):
+        self.save_forecasts([{
+            "date": date,
+            "symbol": symbol,
+            "horizon": horizon,
+            "prediction": prediction,
+            "start_price": start_price,
+            "target_date": target_date
+        }])
+
+    def save_forecasts(self, rows: List[Dict]) -> int:
+        """
+        Upsert many forecasts in one round-trip.
+        Each row needs date, symbol, horizon, prediction, start_price and
+        target_date. Existing (date, symbol, horizon) rows get the new
+        prediction; an already reconciled 'actual' is kept.
+        Returns the number of rows written.
+        """
+        if not rows:
+            return 0
+
         if self.is_mongo:
-            doc = {
-                "date": date,
-                "symbol": symbol,
-                "horizon": horizon,
-                "prediction": float(prediction),
-                "start_price": float(start_price),
-                "target_date": str(target_date),
-                "actual": None,
-                "created_at": datetime.now()
-            }
-            # Upsert
-            self.forecasts.update_one(
-                {"date": date, "symbol": symbol, "horizon": horizon},
-                {"$set": doc},
-                upsert=True
-            )
+            from pymongo import UpdateOne
+            now = datetime.now()
+            ops = [
+                UpdateOne(
+                    {"date": r["date"], "symbol": r["symbol"], "horizon": int(r["horizon"])},
+                    {
+                        "$set": {
+                            "prediction": float(r["prediction"]),
+                            "start_price": float(r["start_price"]),
+                            "target_date": str(r["target_date"]),
+                            "created_at": now
+                        },
+                        "$setOnInsert": {"actual": None}
+                    },
+                    upsert=True
+                )
+                for r in rows
+            ]
+            self.forecasts.bulk_write(ops, ordered=False)
+            self._bump_version()
         else:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            try:
-                c.execute('''
+            conn = self._conn()
+            with conn:
+                self._bump_version(conn)
+                conn.executemany('''
                     INSERT INTO forecasts (date, symbol, horizon, prediction, start_price, target_date)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (date, symbol, horizon, float(prediction), float(start_price), str(target_date)))
-                conn.commit()
-            except sqlite3.IntegrityError:
-                pass # Already exists
-            finally:
-                conn.close()
+                    ON CONFLICT(date, symbol, horizon) DO UPDATE SET
+                        prediction = excluded.prediction,
+                        start_price = excluded.start_price,
+                        target_date = excluded.target_date
+                ''', [
+                    (r["date"], r["symbol"], int(r["horizon"]), float(r["prediction"]),
+                     float(r["start_price"]), str(r["target_date"]))
+                    for r in rows
+                ])
+        return len(rows)
 
     def update_actuals(self, symbol: str, current_date: str, current_price: float):
         """
         Update 'actual' values for past forecasts where target_date <= current_date.
         Actual Return = log(Current Price / Start Price)
+        Prefer reconcile_actuals, which scores each forecast at its own target date.
+        """
+        open_df = self._open_forecasts([symbol], current_date)
+        open_df = open_df[open_df["start_price"].astype(float) > 0]
+        actuals = np.log(float(current_price) / open_df["start_price"].astype(float).values)
+        return self._write_actuals(list(zip(open_df["id"].values, actuals)))
+
+    def reconcile_actuals(self, closes: Dict[str, pd.Series]) -> int:
         """
+        Fill 'actual' for open forecasts of many symbols in one pass.
+        `closes` maps symbol -> close price series (DatetimeIndex). Each open
+        forecast whose target_date is covered by its series gets the close
+        on its own target date (as-of: the last close on or before it), so
+        actual = log(close_at_target / start_price).
+        Open forecasts are read with one query and written with one bulk update.
+        Returns the number of forecasts reconciled.
+        """
+        closes = {sym: s.dropna().sort_index() for sym, s in closes.items() if s is not None and not s.dropna().empty}
+        if not closes:
+            return 0
+        last_date = max(str(s.index[-1].date()) for s in closes.values())
+        open_df = self._open_forecasts(list(closes), last_date)
+        if open_df.empty:
+            return 0
+
+        # Vectorized as-of join per symbol
+        updates = []
+        for symbol, group in open_df.groupby("symbol"):
+            series = closes[symbol]
+            dates = series.index.values
+            targets = pd.to_datetime(group["target_date"]).values
+            start_prices = group["start_price"].astype(float).values
+
+            pos = np.searchsorted(dates, targets, side="right") - 1
+            valid = (targets <= dates[-1]) & (pos >= 0) & (start_prices > 0)
+            if not valid.any():
+                continue
+            actuals = np.log(series.values[pos[valid]] / start_prices[valid])
+            updates.extend(zip(group["id"].values[valid], actuals))
+
+        return self._write_actuals(updates)
+
+    def _open_forecasts(self, symbols: List[str], until: str) -> pd.DataFrame:
+        """Forecasts without an actual whose target_date <= until (id, symbol, start_price, target_date)."""
+        columns = ["id", "symbol", "start_price", "target_date"]
         if self.is_mongo:
-            # Find forecasts where target_date <= current_date and actual is None
-            # Note: String comparison for dates works if format is YYYY-MM-DD
-            cursor = self.forecasts.find({
-                "symbol": symbol,
-                "target_date": {"$lte": current_date},
-                "actual": None
-            })
-            
-            for doc in cursor:
-                start_price = doc.get("start_price")
-                if start_price and start_price > 0:
-                    actual_log_return = np.log(current_price / start_price)
-                    self.forecasts.update_one(
-                        {"_id": doc["_id"]},
-                        {"$set": {"actual": float(actual_log_return)}}
-                    )
+            cursor = self.forecasts.find(
+                {"symbol": {"$in": symbols}, "actual": None, "target_date": {"$lte": until}},
+                {"_id": 1, "symbol": 1, "start_price": 1, "target_date": 1}
+            )
+            docs = [{"id": d["_id"], **{k: d.get(k) for k in columns[1:]}} for d in cursor]
+            return pd.DataFrame(docs, columns=columns)
+        placeholders = ','.join(['?'] * len(symbols))
+        c = self._conn().cursor()
+        c.execute(f'''
+            SELECT id, symbol, start_price, target_date FROM forecasts
+            WHERE symbol IN ({placeholders}) AND actual IS NULL AND target_date <= ?
+        ''', list(symbols) + [until])
+        return pd.DataFrame(c.fetchall(), columns=columns)
+
+    def _write_actuals(self, updates: List) -> int:
+        """Write (forecast id, actual) pairs in one bulk operation."""
+        if not updates:
+            return 0
+        if self.is_mongo:
+            from pymongo import UpdateOne
+            self.forecasts.bulk_write(
+                [UpdateOne({"_id": fid}, {"$set": {"actual": float(actual)}}) for fid, actual in updates],
+                ordered=False
+            )
+            self._bump_version()
         else:
-            conn = sqlite3.connect(self.db_path)
-            c = conn.cursor()
-            c.execute('''
-                SELECT id, start_price FROM forecasts 
-                WHERE symbol = ? AND target_date <= ? AND actual IS NULL
-            ''', (symbol, current_date))
-            
-            rows = c.fetchall()
-            for row in rows:
-                fid, start_price = row
-                if start_price and start_price > 0:
-                    actual_log_return = np.log(current_price / start_price)
-                    c.execute('UPDATE forecasts SET actual = ? WHERE id = ?', (actual_log_return, fid))
-            
-            conn.commit()
-            conn.close()
+            conn = self._conn()
+            with conn:
+                self._bump_version(conn)
+                conn.executemany(
+                    'UPDATE forecasts SET actual = ? WHERE id = ?',
+                    [(float(actual), int(fid)) for fid, actual in updates]
+                )
+        return len(updates)
+
+    def forecasts_version(self) -> int:
+        """Counter that changes whenever forecasts or actuals are written (any process)."""
+        if self.is_mongo:
+            doc = self.db.meta.find_one({"_id": "forecasts"})
+            return int(doc["version"]) if doc else 0
+        c = self._conn().cursor()
+        c.execute("SELECT value FROM meta WHERE key = 'forecasts_version'")
+        row = c.fetchone()
+        return int(row[0]) if row else 0
+
+    def _bump_version(self, conn: Optional[sqlite3.Connection] = None):
+        if self.is_mongo:
+            self.db.meta.update_one({"_id": "forecasts"}, {"$inc": {"version": 1}}, upsert=True)
+        else:
+            conn.execute('''
+                INSERT INTO meta (key, value) VALUES ('forecasts_version', 1)
+                ON CONFLICT(key) DO UPDATE SET value = value + 1
+            ''')
+
+    def accuracy(self, symbols: Optional[List[str]] = None, horizons: Optional[List[int]] = None,
+                 start: Optional[str] = None, end: Optional[str] = None, by_month: bool = True) -> List[Dict]:
+        """
+        Forecast quality over reconciled forecasts (actual is set), grouped by
+        symbol, horizon and forecast month (or over the whole range if not by_month).
+        Errors are prediction - actual in log-return units:
+          mae, rmse, bias (mean error, > 0 means over-forecasting) and
+          hit_rate (share of forecasts with the right sign).
+        Results are cached per query until forecasts_version changes.
+        """
+        version = self.forecasts_version()
+        key = (self.db_url, tuple(symbols or ()), tuple(horizons or ()), start, end, by_month)
+        with _accuracy_lock:
+            cached = _accuracy_cache.get(key)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        if self.is_mongo:
+            match: Dict = {"actual": {"$ne": None}}
+            if symbols:
+                match["symbol"] = {"$in": list(symbols)}
+            if horizons:
+                match["horizon"] = {"$in": [int(h) for h in horizons]}
+            if start or end:
+                match["date"] = {k: v for k, v in (("$gte", start), ("$lte", end)) if v}
+            error = {"$subtract": ["$prediction", "$actual"]}
+            group_id = {"symbol": "$symbol", "horizon": "$horizon"}
+            if by_month:
+                group_id["month"] = {"$substrBytes": ["$date", 0, 7]}
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": group_id,
+                    "count": {"$sum": 1},
+                    "mae": {"$avg": {"$abs": error}},
+                    "mse": {"$avg": {"$multiply": [error, error]}},
+                    "hit_rate": {"$avg": {"$cond": [
+                        {"$eq": [{"$gt": ["$prediction", 0]}, {"$gt": ["$actual", 0]}]}, 1, 0
+                    ]}},
+                    "bias": {"$avg": error}
+                }}
+            ]
+            rows = []
+            for doc in self.forecasts.aggregate(pipeline):
+                group = doc.pop("_id")
+                doc.update(group)
+                rows.append(doc)
+        else:
+            where = ["actual IS NOT NULL"]
+            params: List = []
+            if symbols:
+                where.append(f"symbol IN ({','.join(['?'] * len(symbols))})")
+                params.extend(symbols)
+            if horizons:
+                where.append(f"horizon IN ({','.join(['?'] * len(horizons))})")
+                params.extend(int(h) for h in horizons)
+            if start:
+                where.append("date >= ?")
+                params.append(start)
+            if end:
+                where.append("date <= ?")
+                params.append(end)
+            month = "substr(date, 1, 7)" if by_month else "NULL"
+            c = self._conn().cursor()
+            c.row_factory = sqlite3.Row
+            c.execute(f'''
+                SELECT symbol, horizon, {month} AS month,
+                       COUNT(*) AS count,
+                       AVG(ABS(prediction - actual)) AS mae,
+                       AVG((prediction - actual) * (prediction - actual)) AS mse,
+                       AVG(CASE WHEN (prediction > 0) = (actual > 0) THEN 1.0 ELSE 0.0 END) AS hit_rate,
+                       AVG(prediction - actual) AS bias
+                FROM forecasts
+                WHERE {' AND '.join(where)}
+                GROUP BY symbol, horizon, month
+            ''', params)
+            rows = [dict(row) for row in c.fetchall()]
+
+        metrics = []
+        for row in rows:
+            metrics.append({
+                "symbol": row["symbol"],
+                "horizon": int(row["horizon"]),
+                "month": row.get("month"),
+                "count": int(row["count"]),
+                "mae": float(row["mae"]),
+                "rmse": float(np.sqrt(row["mse"])),
+                "hit_rate": float(row["hit_rate"]),
+                "bias": float(row["bias"])
+            })
+        metrics.sort(key=lambda m: (m["symbol"], m["horizon"], m["month"] or ""))
+
+        with _accuracy_lock:
+            if len(_accuracy_cache) >= 256:
+                _accuracy_cache.clear()
+            _accuracy_cache[key] = (version, metrics)
+        return metrics
 
     def get_history(self, symbol: str) -> List[Dict]:
         if self.is_mongo:
@@ -188,16 +429,15 @@ class Database:
                 results.append(doc)
             return results
         else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conn()
             c = conn.cursor()
+            c.row_factory = sqlite3.Row
             c.execute('''
                 SELECT * FROM forecasts 
                 WHERE symbol = ? 
                 ORDER BY date DESC
             ''', (symbol,))
             rows = c.fetchall()
-            conn.close()
             return [dict(row) for row in rows]
     
     def get_indices_history(self, symbols: List[str]) -> List[Dict]:
@@ -209,9 +449,9 @@ class Database:
                 results.append(doc)
             return results
         else:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = self._conn()
             c = conn.cursor()
+            c.row_factory = sqlite3.Row
             placeholders = ','.join(['?'] * len(symbols))
             c.execute(f'''
                 SELECT * FROM forecasts 
@@ -219,5 +459,138 @@ class Database:
                 ORDER BY date DESC, symbol ASC
             ''', symbols)
             rows = c.fetchall()
-            conn.close()
             return [dict(row) for row in rows]
+
+
+    def query_history(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                      fields: Optional[List[str]] = None, limit: int = 500,
+                      cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of forecasts for `symbols`, newest first (date DESC, id DESC).
+        `start`/`end` bound the forecast date (inclusive), `fields` projects columns
+        (id and date are always returned). Pages are keyset-paginated: pass the
+        returned cursor back to continue; it is None on the last page.
+        """
+        fields = list(fields or FORECAST_FIELDS)
+        unknown = set(fields) - set(FORECAST_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {sorted(unknown)}")
+        fields = ["id", "date"] + [f for f in fields if f not in ("id", "date")]
+        after = self._decode_cursor(cursor) if cursor else None
+
+        if self.is_mongo:
+            query: Dict = {"symbol": {"$in": list(symbols)}}
+            if start or end:
+                query["date"] = {k: v for k, v in (("$gte", start), ("$lte", end)) if v}
+            if after:
+                query["$or"] = [{"date": {"$lt": after[0]}}, {"date": after[0], "_id": {"$lt": after[1]}}]
+            projection = {f: 1 for f in fields if f != "id"}
+            docs = self.forecasts.find(query, projection).sort([("date", -1), ("_id", -1)]).limit(limit + 1)
+            rows = []
+            for doc in docs:
+                doc["id"] = str(doc.pop("_id"))
+                rows.append({f: doc.get(f) for f in fields})
+        else:
+            where = [f"symbol IN ({','.join(['?'] * len(symbols))})"]
+            params: List = list(symbols)
+            if start:
+                where.append("date >= ?")
+                params.append(start)
+            if end:
+                where.append("date <= ?")
+                params.append(end)
+            if after:
+                where.append("(date, id) < (?, ?)")
+                params.extend(after)
+            c = self._conn().cursor()
+            c.row_factory = sqlite3.Row
+            c.execute(f'''
+                SELECT {', '.join(fields)} FROM forecasts
+                WHERE {' AND '.join(where)}
+                ORDER BY date DESC, id DESC
+                LIMIT ?
+            ''', params + [limit + 1])
+            rows = [dict(row) for row in c.fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['date']}|{rows[-1]['id']}"
+        return rows, next_cursor
+
+    def iter_history(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                     fields: Optional[List[str]] = None, batch_size: int = 1000,
+                     cursor: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Stream every matching forecast, newest first, one keyset page at a time
+        (optionally resuming after `cursor`).
+        Each page is a separate query, so memory stays bounded by `batch_size`
+        and the generator may be resumed from a different thread.
+        """
+        while True:
+            rows, cursor = self.query_history(symbols, start, end, fields, batch_size, cursor)
+            yield from rows
+            if cursor is None:
+                return
+
+    def _decode_cursor(self, cursor: str) -> Tuple:
+        try:
+            date, fid = cursor.rsplit("|", 1)
+            if self.is_mongo:
+                from bson import ObjectId
+                return date, ObjectId(fid)
+            return date, int(fid)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class ForecastWriter:
+    """
+    Buffers forecast rows and writes them with Database.save_forecasts.
+    The buffer is flushed when it holds `max_rows` rows, when the oldest
+    buffered row is older than `max_seconds` (checked on add), and on close.
+    Use as a context manager so the tail is always written.
+    """
+    def __init__(self, db: Database, max_rows: int = 500, max_seconds: float = 5.0):
+        self.db = db
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.written = 0
+        self._rows: List[Dict] = []
+        self._first_added: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, date: str, symbol: str, horizon: int, prediction: float, start_price: float, target_date: str):
+        with self._lock:
+            if not self._rows:
+                self._first_added = time.monotonic()
+            self._rows.append({
+                "date": date,
+                "symbol": symbol,
+                "horizon": horizon,
+                "prediction": prediction,
+                "start_price": start_price,
+                "target_date": target_date
+            })
+            due = len(self._rows) >= self.max_rows or time.monotonic() - self._first_added >= self.max_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._first_added = None
+        if not rows:
+            return 0
+        written = self.db.save_forecasts(rows)
+        self.written += written
+        return written
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
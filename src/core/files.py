@@ -0,0 +1,20 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+def write_atomic(path: Path, write: Callable[[str], None]):
+    """
+    Call `write` with a temporary file next to `path` and swap the result in
+    with os.replace, so concurrent readers never see a half-written file.
+    Readers that still have the old file open or mapped keep their (now
+    unlinked) copy.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        write(str(tmp_path))
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
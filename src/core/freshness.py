@@ -0,0 +1,143 @@
+import csv
+from datetime import datetime, date, time, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+import pandas as pd
+from .config import settings
+
+CALENDAR_PATH = Path(__file__).resolve().parent / "market_calendar.csv"
+
+def _aware(dt: datetime) -> datetime:
+    """Naive datetimes are treated as UTC (models use datetime.utcnow)."""
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt
+
+class MarketCalendar:
+    """
+    Exchange trading sessions from the bundled calendar table
+    (holidays and early closes). Defaults describe NYSE/Nasdaq.
+    Dates outside the table fall back to weekday-only sessions.
+    """
+    def __init__(self, path: Path = CALENDAR_PATH, tz: str = "America/New_York",
+                 open_time: time = time(9, 30), close_time: time = time(16, 0),
+                 early_close_time: time = time(13, 0)):
+        self.tz = ZoneInfo(tz)
+        self.open_time = open_time
+        self.close_time = close_time
+        self.early_close_time = early_close_time
+        self.holidays = set()
+        self.early_closes = set()
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                day = date.fromisoformat(row["date"])
+                if row["type"] == "holiday":
+                    self.holidays.add(day)
+                elif row["type"] == "early_close":
+                    self.early_closes.add(day)
+
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def session(self, day: date) -> Tuple[datetime, datetime]:
+        """(open, close) of the session on `day` as timezone-aware datetimes."""
+        close_time = self.early_close_time if day in self.early_closes else self.close_time
+        return (datetime.combine(day, self.open_time, tzinfo=self.tz),
+                datetime.combine(day, close_time, tzinfo=self.tz))
+
+    def previous_trading_day(self, day: date) -> date:
+        day -= timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= timedelta(days=1)
+        return day
+
+class ContinuousCalendar:
+    """24/7 markets (crypto): every UTC day is one session."""
+    tz = timezone.utc
+
+    def is_trading_day(self, day: date) -> bool:
+        return True
+
+    def session(self, day: date) -> Tuple[datetime, datetime]:
+        start = datetime.combine(day, time(0, 0), tzinfo=self.tz)
+        return start, start + timedelta(days=1)
+
+    def previous_trading_day(self, day: date) -> date:
+        return day - timedelta(days=1)
+
+class FreshnessPolicy:
+    """
+    Single source of truth for "is this data / computed result still current?".
+
+    Data changes at well-defined points: every `intraday_minutes` while a
+    session is open, and once more `publish_delay_minutes` after the close,
+    when the final daily bar is published. Anything fetched or computed
+    after the latest change point is fresh, so nothing is refetched over a
+    weekend or holiday and nothing fetched before the open is served all day.
+    """
+    def __init__(self, calendar: Optional[MarketCalendar] = None, publish_delay_minutes: int = 30,
+                 intraday_minutes: int = settings.FRESHNESS_INTRADAY_MINUTES, retry_minutes: int = 15):
+        self.calendar = calendar or MarketCalendar()
+        self.continuous = ContinuousCalendar()
+        self.publish_delay = timedelta(minutes=publish_delay_minutes)
+        self.intraday = timedelta(minutes=intraday_minutes)
+        self.retry = timedelta(minutes=retry_minutes)
+
+    def calendar_for(self, symbol: Optional[str]):
+        if symbol and symbol.upper().endswith("-USD"):
+            return self.continuous
+        return self.calendar
+
+    def last_change_point(self, symbol: Optional[str] = None, now: Optional[datetime] = None) -> datetime:
+        """Most recent moment at which new market data could have appeared."""
+        calendar = self.calendar_for(symbol)
+        now = _aware(now or datetime.now(timezone.utc)).astimezone(calendar.tz)
+        today = now.date()
+
+        if calendar.is_trading_day(today):
+            open_, close = calendar.session(today)
+            if now >= close + self.publish_delay:
+                return close + self.publish_delay
+            if now >= open_:
+                steps = (now - open_) // self.intraday
+                return open_ + steps * self.intraday
+
+        _, prev_close = calendar.session(calendar.previous_trading_day(today))
+        return prev_close + self.publish_delay
+
+    def expected_last_bar(self, symbol: Optional[str] = None, now: Optional[datetime] = None) -> date:
+        """Date of the newest daily bar the provider should have by `now`."""
+        calendar = self.calendar_for(symbol)
+        now = _aware(now or datetime.now(timezone.utc)).astimezone(calendar.tz)
+        today = now.date()
+        if calendar.is_trading_day(today) and now >= calendar.session(today)[0]:
+            return today
+        return calendar.previous_trading_day(today)
+
+    def data_is_fresh(self, symbol: str, last_bar: Optional[pd.Timestamp], fetched_at: Optional[datetime],
+                      now: Optional[datetime] = None) -> bool:
+        """
+        Cached OHLCV is fresh if it was fetched after the last change point and
+        contains the expected last bar. If the provider is late publishing that
+        bar, retry every `retry_minutes` rather than on every request.
+        """
+        if fetched_at is None:
+            return False
+        now = _aware(now or datetime.now(timezone.utc))
+        fetched_at = _aware(fetched_at)
+        if fetched_at < self.last_change_point(symbol, now):
+            return False
+        if last_bar is not None and pd.Timestamp(last_bar).date() < self.expected_last_bar(symbol, now):
+            return now - fetched_at < self.retry
+        return True
+
+    def result_is_fresh(self, created_at: Optional[datetime], symbol: Optional[str] = None,
+                        now: Optional[datetime] = None) -> bool:
+        """A computed result (overview, simulation) is fresh if made after the last change point."""
+        if created_at is None:
+            return False
+        return _aware(created_at) >= self.last_change_point(symbol, now)
+
+market_calendar = MarketCalendar()
+freshness = FreshnessPolicy(market_calendar)
@@ -0,0 +1,280 @@
+import json
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import numpy as np
+from .config import settings
+from .database import get_sqlite_connection
+
+# Background jobs: a persistent queue in a local SQLite file (no broker) and
+# a pool of worker threads that claim jobs from it. Any process pointed at
+# the same file can submit, inspect or run jobs (see src/scripts/worker.py).
+# Running jobs hold a lease that their worker pool renews; a job whose lease
+# ran out (its process died or restarted) goes back to the queue.
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+JOB_FIELDS = ["id", "kind", "params", "status", "progress", "message", "result", "error",
+              "cancel_requested", "worker", "created_at", "started_at", "finished_at"]
+
+class JobCancelled(Exception):
+    """Raised inside a handler when cancellation of its job was requested."""
+
+# kind -> handler(ctx, params); handlers register with @job_handler
+_handlers: Dict[str, Callable[["JobContext", Dict[str, Any]], Any]] = {}
+
+def job_handler(kind: str):
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+def job_kinds() -> List[str]:
+    return sorted(_handlers)
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+def _boot_id() -> str:
+    # Unique per worker pool: PIDs repeat across container restarts (uvicorn runs as PID 1)
+    return f"{socket.gethostname()}:{uuid.uuid4().hex[:12]}"
+
+class JobQueue:
+    def __init__(self, path: Optional[str] = None):
+        self.path = Path(path or settings.JOBS_DB_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    progress REAL NOT NULL DEFAULT 0,
+                    message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    claim TEXT,
+                    heartbeat_at TEXT,
+                    created_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            ''')
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "heartbeat_at" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+
+    def _conn(self):
+        return get_sqlite_connection(self.path)
+
+    def _row(self, row, with_result: bool = True) -> Dict[str, Any]:
+        job = dict(zip(JOB_FIELDS, row))
+        job["params"] = json.loads(job["params"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["result"] = json.loads(job["result"]) if with_result and job["result"] is not None else None
+        return job
+
+    def submit(self, kind: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind '{kind}' (expected one of {job_kinds()})")
+        job_id = uuid.uuid4().hex
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params or {}, default=_json_default), QUEUED, _now())
+            )
+        _wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str, with_result: bool = True) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row, with_result) if row else None
+
+    def list(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest first, without results."""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM jobs {where} ORDER BY created_at DESC LIMIT ?", params + [limit]
+        ).fetchall()
+        return [self._row(row, with_result=False) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Queued jobs are cancelled at once; running jobs stop at their next
+        progress report. Finished jobs are left as they are.
+        """
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                         (CANCELLED, _now(), job_id, QUEUED))
+            conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+        return self.get(job_id, with_result=False)
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest queued job (safe across threads and processes)."""
+        token = uuid.uuid4().hex
+        now = _now()
+        conn = self._conn()
+        with conn:
+            claimed = conn.execute('''
+                UPDATE jobs SET status = ?, worker = ?, claim = ?, started_at = ?, heartbeat_at = ?
+                WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created_at, rowid LIMIT 1)
+                  AND status = ?
+            ''', (RUNNING, worker, token, now, now, QUEUED, QUEUED)).rowcount
+        if not claimed:
+            return None
+        row = self._conn().execute(f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE claim = ?", (token,)).fetchone()
+        return self._row(row)
+
+    def report(self, job_id: str, progress: float, message: Optional[str] = None) -> bool:
+        """Record progress; returns whether cancellation was requested."""
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+                         (max(0.0, min(1.0, float(progress))), message, job_id))
+        row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        conn = self._conn()
+        with conn:
+            conn.execute('''
+                UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?,
+                    progress = CASE WHEN ? = ? THEN 1 ELSE progress END
+                WHERE id = ?
+            ''', (status, json.dumps(result, default=_json_default) if result is not None else None,
+                  error, _now(), status, SUCCEEDED, job_id))
+
+    def heartbeat(self, worker: str):
+        """Renew the lease on every job `worker` is running."""
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE worker = ? AND status = ?", (_now(), worker, RUNNING))
+
+    def requeue_orphans(self, worker: Optional[str] = None,
+                        lease_seconds: float = settings.JOB_LEASE_SECONDS) -> int:
+        """
+        Put back running jobs whose lease ran out, i.e. whose worker pool
+        (any but `worker`, the caller's own) stopped renewing it.
+        """
+        expired = (datetime.utcnow() - timedelta(seconds=lease_seconds)).isoformat()
+        conn = self._conn()
+        with conn:
+            return conn.execute('''
+                UPDATE jobs SET status = ?, worker = NULL, claim = NULL, heartbeat_at = NULL
+                WHERE status = ? AND (worker IS NULL OR worker != ?)
+                  AND (heartbeat_at IS NULL OR heartbeat_at < ?)
+            ''', (QUEUED, RUNNING, worker or "", expired)).rowcount
+
+class JobContext:
+    """Handed to a handler: progress reporting doubles as the cancellation check."""
+    def __init__(self, queue: JobQueue, job: Dict[str, Any]):
+        self.queue = queue
+        self.job = job
+        self.id = job["id"]
+
+    def progress(self, fraction: float, message: Optional[str] = None):
+        if self.queue.report(self.id, fraction, message):
+            raise JobCancelled(self.id)
+
+# Set by submit so idle workers in this process start at once instead of at the next poll
+_wakeup = threading.Event()
+
+class JobWorkers:
+    """Threads that claim and run jobs until stopped, plus one that renews their leases."""
+    def __init__(self, queue: JobQueue, workers: int = settings.JOB_WORKERS,
+                 poll_seconds: float = settings.JOB_POLL_SECONDS,
+                 lease_seconds: float = settings.JOB_LEASE_SECONDS):
+        self.queue = queue
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = _boot_id()
+        self._stop = threading.Event()
+        self._lease_stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lease_thread: Optional[threading.Thread] = None
+
+    def start(self) -> "JobWorkers":
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._lease_thread = threading.Thread(target=self._lease_loop, name="job-lease", daemon=True)
+        self._lease_thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stop claiming jobs; running ones finish (or are requeued after a restart)."""
+        self._stop.set()
+        _wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        # Leases are renewed until the running jobs are done
+        self._lease_stop.set()
+        if self._lease_thread is not None:
+            self._lease_thread.join(timeout)
+            self._lease_thread = None
+
+    def run_once(self) -> bool:
+        """Claim and run a single job; returns False if the queue was empty."""
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        handler = _handlers.get(job["kind"])
+        try:
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job['kind']}'")
+            result = handler(JobContext(self.queue, job), job["params"])
+            self.queue.finish(job["id"], SUCCEEDED, result)
+        except JobCancelled:
+            self.queue.finish(job["id"], CANCELLED)
+        except Exception as e:
+            print(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            self.queue.finish(job["id"], FAILED, error=str(e))
+        return True
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if self.run_once():
+                continue
+            _wakeup.wait(self.poll_seconds)
+            _wakeup.clear()
+
+    def _lease_loop(self):
+        # Renew often enough that one missed beat never expires a lease
+        while True:
+            try:
+                self.queue.heartbeat(self.worker_id)
+                requeued = self.queue.requeue_orphans(self.worker_id, self.lease_seconds)
+                if requeued:
+                    print(f"Requeued {requeued} interrupted jobs.")
+            except Exception as e:
+                print(f"Warning: job lease renewal failed: {e}")
+            if self._lease_stop.wait(self.lease_seconds / 3):
+                return
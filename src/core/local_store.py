@@ -0,0 +1,256 @@
+import json
+import sqlite3
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+# Embedded document store: each collection is a SQLite table of JSON documents
+# (id TEXT PRIMARY KEY, doc TEXT). It implements the subset of the pymongo
+# Collection API the repositories use, so MongoRepository runs unchanged on
+# a single node without a MongoDB server.
+
+_tables_lock = threading.Lock()
+_tables: set = set()
+
+_COMPARISONS = {"$lt": "<", "$lte": "<=", "$gt": ">", "$gte": ">="}
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    return value
+
+def _dumps(doc: Dict) -> str:
+    return json.dumps({k: v for k, v in doc.items() if k != "_id"}, default=_encode)
+
+def _index_name(table: str, fields: List[str]) -> str:
+    return f"idx_{table}_" + "_".join(f.replace(".", "_") for f in fields)
+
+class LocalDatabase:
+    """Database handle for a SQLite file; collections are created on first access."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.name = self.path.stem
+
+    def __getitem__(self, name: str) -> "LocalCollection":
+        return LocalCollection(self, name)
+
+    def __getattr__(self, name: str) -> "LocalCollection":
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def conn(self) -> sqlite3.Connection:
+        from .database import get_sqlite_connection
+        return get_sqlite_connection(self.path)
+
+class LocalCursor:
+    """Lazy query: sort/limit can be chained before iterating, as with pymongo."""
+    def __init__(self, collection: "LocalCollection", query: Optional[Dict], projection: Optional[Dict]):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._limit = 0
+
+    def sort(self, key, direction: int = 1) -> "LocalCursor":
+        self._sort = list(key) if isinstance(key, list) else [(key, direction)]
+        return self
+
+    def limit(self, n: int) -> "LocalCursor":
+        self._limit = n
+        return self
+
+    def __iter__(self) -> Iterator[Dict]:
+        where, params = self.collection._where(self.query)
+        sql = f"SELECT id, doc FROM {self.collection.table} WHERE {where}"
+        if self._sort:
+            order = ", ".join(f"{self.collection._expr(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in self._sort)
+            sql += f" ORDER BY {order}"
+        if self._limit:
+            sql += f" LIMIT {int(self._limit)}"
+        rows = self.collection.db.conn().execute(sql, params).fetchall()
+        for fid, doc in rows:
+            yield self.collection._project(fid, json.loads(doc), self.projection)
+
+class LocalCollection:
+    def __init__(self, db: LocalDatabase, name: str):
+        self.db = db
+        self.name = name
+        self.table = f"doc_{name}"
+        key = (str(db.path), name)
+        if key not in _tables:
+            with _tables_lock:
+                if key not in _tables:
+                    self._create_table()
+                    _tables.add(key)
+
+    def _create_table(self):
+        from .mongo import INDEXES, OBSOLETE_INDEXES
+        conn = self.db.conn()
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+        # Same unique keys as the Mongo collections
+        for keys in OBSOLETE_INDEXES.get(self.name, []):
+            self.drop_index(keys)
+        for keys, options in INDEXES.get(self.name, []):
+            self.create_index(keys, **options)
+
+    # --- query translation ---
+
+    def _expr(self, field: str) -> str:
+        if field == "_id":
+            return "id"
+        return f"json_extract(doc, '$.{field}')"
+
+    def _where(self, query: Dict) -> Tuple[str, List]:
+        clauses, params = [], []
+        for field, cond in query.items():
+            if field in ("$or", "$and"):
+                parts = [self._where(sub) for sub in cond]
+                joiner = " OR " if field == "$or" else " AND "
+                clauses.append("(" + joiner.join(f"({sql})" for sql, _ in parts) + ")")
+                for _, sub_params in parts:
+                    params.extend(sub_params)
+                continue
+
+            expr = self._expr(field)
+            if isinstance(cond, dict) and cond and all(k.startswith("$") for k in cond):
+                for op, value in cond.items():
+                    if op in ("$in", "$nin"):
+                        values = [_encode(v) for v in value]
+                        if not values:
+                            clauses.append("0" if op == "$in" else "1")
+                            continue
+                        neg = "NOT " if op == "$nin" else ""
+                        clauses.append(f"{expr} {neg}IN ({','.join(['?'] * len(values))})")
+                        params.extend(values)
+                    elif op in _COMPARISONS:
+                        clauses.append(f"{expr} {_COMPARISONS[op]} ?")
+                        params.append(_encode(value))
+                    elif op == "$ne":
+                        if value is None:
+                            clauses.append(f"{expr} IS NOT NULL")
+                        else:
+                            clauses.append(f"({expr} IS NULL OR {expr} != ?)")
+                            params.append(_encode(value))
+                    elif op == "$exists":
+                        clauses.append(f"{expr} IS {'NOT ' if value else ''}NULL")
+                    else:
+                        raise NotImplementedError(f"Operator {op} is not supported by the local store")
+            elif cond is None:
+                clauses.append(f"{expr} IS NULL")
+            else:
+                clauses.append(f"{expr} = ?")
+                params.append(_encode(cond))
+        return (" AND ".join(clauses) or "1"), params
+
+    def _project(self, fid: str, doc: Dict, projection: Optional[Dict]) -> Dict:
+        doc = {"_id": fid, **doc}
+        if not projection:
+            return doc
+        include = {k for k, v in projection.items() if v}
+        if include:
+            keep = include | ({"_id"} if projection.get("_id", 1) else set())
+            return {k: v for k, v in doc.items() if k in keep}
+        return {k: v for k, v in doc.items() if k not in projection}
+
+    # --- pymongo Collection subset ---
+
+    def find(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None) -> LocalCursor:
+        return LocalCursor(self, filter, projection)
+
+    def find_one(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None,
+                 sort: Optional[List] = None) -> Optional[Dict]:
+        cursor = self.find(filter, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return next(iter(cursor.limit(1)), None)
+
+    def count_documents(self, filter: Dict) -> int:
+        where, params = self._where(filter)
+        return self.db.conn().execute(f"SELECT COUNT(*) FROM {self.table} WHERE {where}", params).fetchone()[0]
+
+    def distinct(self, key: str, filter: Optional[Dict] = None) -> List:
+        where, params = self._where(filter or {})
+        expr = self._expr(key)
+        rows = self.db.conn().execute(
+            f"SELECT DISTINCT {expr} FROM {self.table} WHERE {where} AND {expr} IS NOT NULL", params
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def insert_one(self, document: Dict):
+        return SimpleNamespace(inserted_id=self.insert_many([document]).inserted_ids[0])
+
+    def insert_many(self, documents: List[Dict], ordered: bool = True):
+        """All documents are written in one transaction; a duplicate key rolls back the batch."""
+        for doc in documents:
+            doc.setdefault("_id", str(ObjectId()))
+        conn = self.db.conn()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO {self.table} (id, doc) VALUES (?, ?)",
+                    [(str(doc["_id"]), _dumps(doc)) for doc in documents]
+                )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+        return SimpleNamespace(inserted_ids=[str(doc["_id"]) for doc in documents])
+
+    def update_one(self, filter: Dict, update: Dict, upsert: bool = False):
+        unsupported = set(update) - {"$set", "$setOnInsert"}
+        if unsupported:
+            raise NotImplementedError(f"Update operators {sorted(unsupported)} are not supported by the local store")
+        existing = self.find_one(filter)
+        if existing is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+            doc = {k: v for k, v in filter.items() if not k.startswith("$") and not isinstance(v, dict)}
+            doc.update(update.get("$setOnInsert", {}))
+            doc.update(update.get("$set", {}))
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=self.insert_one(doc).inserted_id)
+
+        existing.update(update.get("$set", {}))
+        conn = self.db.conn()
+        try:
+            with conn:
+                conn.execute(f"UPDATE {self.table} SET doc = ? WHERE id = ?", (_dumps(existing), existing["_id"]))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    def _delete(self, filter: Dict, limit: Optional[int]):
+        where, params = self._where(filter)
+        sub = f"SELECT id FROM {self.table} WHERE {where}" + (f" LIMIT {limit}" if limit else "")
+        conn = self.db.conn()
+        with conn:
+            deleted = conn.execute(f"DELETE FROM {self.table} WHERE id IN ({sub})", params).rowcount
+        return SimpleNamespace(deleted_count=deleted)
+
+    def delete_one(self, filter: Dict):
+        return self._delete(filter, 1)
+
+    def delete_many(self, filter: Dict):
+        return self._delete(filter, None)
+
+    def create_index(self, keys, unique: bool = False, **kwargs) -> str:
+        """Expression index over the JSON fields (sort direction is irrelevant to SQLite)."""
+        fields = [keys] if isinstance(keys, str) else [k for k, _ in keys]
+        name = _index_name(self.table, fields)
+        columns = ", ".join(self._expr(f) for f in fields)
+        conn = self.db.conn()
+        with conn:
+            conn.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {self.table} ({columns})")
+        return name
+
+    def drop_index(self, keys):
+        fields = [keys] if isinstance(keys, str) else [k for k, _ in keys]
+        conn = self.db.conn()
+        with conn:
+            conn.execute(f"DROP INDEX IF EXISTS {_index_name(self.table, fields)}")
@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+class SizedLRU:
+    """
+    Thread-safe LRU bounded by the total size of its entries in bytes.
+    Each entry carries a signature (e.g. the mtime/size of its source file);
+    a lookup with a different signature is a miss, so changed sources are
+    reloaded without explicit invalidation. Values larger than the whole
+    budget are returned uncached.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, signature: Any = None) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, signature: Any, value: Any, nbytes: int) -> Any:
+        with self._lock:
+            self._remove(key)
+            if nbytes > self.max_bytes:
+                return value
+            self._entries[key] = (signature, value, nbytes)
+            self.current_bytes += nbytes
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return value
+
+    def resign(self, key: Hashable, old_signature: Any, new_signature: Any):
+        """Keep an entry valid after its source was touched but not rewritten."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == old_signature:
+                self._entries[key] = (new_signature, entry[1], entry[2])
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
@@ -1,7 +1,10 @@
+import base64
+import zlib
 from pydantic import BaseModel, Field, BeforeValidator, ConfigDict
 from typing import List, Dict, Optional, Annotated, Any
 from datetime import datetime
 from bson import ObjectId
+import numpy as np
 
 def validate_object_id(v: Any) -> str:
     if isinstance(v, ObjectId):
@@ -31,6 +34,8 @@ class MarketOverview(MongoBaseModel):
     forecast_short: Dict[str, float] = {} # 10d
     forecast_medium: Dict[str, float] = {} # 100d
     forecast_long: Dict[str, float] = {} # 365d+
+    # Set when served past its freshness point while a refresh runs; never stored
+    stale: bool = Field(default=False, exclude=True)
 
 class WishlistItem(MongoBaseModel):
     symbol: str
@@ -49,6 +54,43 @@ class SimulationRun(MongoBaseModel):
     regime: str
     model_snapshot: Dict = {}
     
+def pack_array(values: np.ndarray) -> str:
+    """float32, zlib-compressed, base64 text (fits Mongo and the JSON local store alike)."""
+    raw = np.ascontiguousarray(values, dtype=np.float32).tobytes()
+    return base64.b64encode(zlib.compress(raw, 6)).decode("ascii")
+
+def unpack_array(packed: str, columns: int) -> np.ndarray:
+    raw = zlib.decompress(base64.b64decode(packed))
+    return np.frombuffer(raw, dtype=np.float32).reshape(-1, columns)
+
+class SimulationChart(MongoBaseModel):
+    """
+    Fan-chart artifact of one simulation: per-day price quantile bands and a
+    few representative sample paths, stored packed (see pack_array).
+    Row i of the bands is the `levels[i]` percentile; columns are days 0..days.
+    """
+    symbol: str
+    date: str # YYYY-MM-DD
+    conservative: bool = False # damped jumps and tighter daily cap
+    days: int
+    sims: int
+    start_price: float
+    regime_id: int
+    regime: str
+    levels: List[int]
+    bands: str
+    paths: str
+
+    @classmethod
+    def from_arrays(cls, bands: np.ndarray, paths: np.ndarray, **fields) -> "SimulationChart":
+        return cls(bands=pack_array(bands), paths=pack_array(paths), **fields)
+
+    def bands_array(self) -> np.ndarray:
+        return unpack_array(self.bands, self.days + 1)
+
+    def paths_array(self) -> np.ndarray:
+        return unpack_array(self.paths, self.days + 1)
+
 class UserPreferences(MongoBaseModel):
     user_id: str
     wishlist_symbols: List[str] = []
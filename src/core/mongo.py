@@ -0,0 +1,140 @@
+import asyncio
+import sqlite3
+import threading
+import weakref
+from typing import Dict, List, Optional, Tuple
+import pymongo
+from .config import settings
+
+DEFAULT_DB_NAME = "forcast_antigravity"
+
+# One client (and connection pool) per URL for the whole process.
+# MongoClient is thread-safe; repositories and Database share it.
+_clients: Dict[str, pymongo.MongoClient] = {}
+# Async clients per event loop; entries go away with their loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, object]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+# Indexes per collection: (keys, options). Created once by ensure_indexes,
+# not on every repository construction.
+INDEXES: Dict[str, List[Tuple[list, dict]]] = {
+    "forecasts": [
+        ([("date", 1), ("symbol", 1), ("horizon", 1)], {"unique": True}),
+        ([("symbol", 1), ("date", -1), ("_id", -1)], {}),
+    ],
+    "market_overview": [
+        ([("symbol", 1), ("date", 1)], {"unique": True}),
+    ],
+    "simulation_runs": [
+        ([("symbol", 1), ("date", 1), ("horizon", 1)], {"unique": True}),
+    ],
+    "simulation_charts": [
+        ([("symbol", 1), ("date", 1), ("conservative", 1)], {"unique": True}),
+    ],
+    "wishlist": [
+        ([("symbol", 1)], {"unique": True}),
+    ],
+}
+
+# Indexes replaced by one in INDEXES; dropped where they still exist
+OBSOLETE_INDEXES: Dict[str, List[list]] = {
+    "simulation_charts": [
+        [("symbol", 1), ("date", 1)],
+    ],
+}
+
+def _client_options() -> dict:
+    return {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+
+def get_client(url: Optional[str] = None) -> pymongo.MongoClient:
+    """Shared MongoClient for `url` (default: settings.DATABASE_URL)."""
+    url = url or settings.DATABASE_URL
+    with _lock:
+        client = _clients.get(url)
+        if client is None:
+            client = pymongo.MongoClient(url, **_client_options())
+            _clients[url] = client
+        return client
+
+def _default_database(client):
+    try:
+        return client.get_default_database()
+    except pymongo.errors.ConfigurationError:
+        # Fallback if no database name in URL
+        return client.get_database(DEFAULT_DB_NAME)
+
+def get_database(url: Optional[str] = None):
+    """
+    Shared database handle for `url`: MongoDB for mongodb:// URLs, otherwise
+    the embedded SQLite document store (same collection API, no server).
+    """
+    url = url or settings.DATABASE_URL
+    if not url.startswith("mongodb"):
+        from .database import sqlite_path
+        from .local_store import LocalDatabase
+        return LocalDatabase(sqlite_path(url))
+    return _default_database(get_client(url))
+
+def get_async_client(url: Optional[str] = None):
+    """
+    Shared async client for `url`, one per event loop (async clients are
+    bound to the loop they first run on). Uses pymongo's native async API,
+    falling back to motor on older pymongo versions.
+    """
+    url = url or settings.DATABASE_URL
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(url)
+        if client is None:
+            try:
+                from pymongo import AsyncMongoClient
+            except ImportError:
+                from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+            client = AsyncMongoClient(url, **_client_options())
+            clients[url] = client
+        return client
+
+def get_async_database(url: Optional[str] = None):
+    return _default_database(get_async_client(url))
+
+def ensure_indexes(url: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Create every index in INDEXES (idempotent) on MongoDB or the local store.
+    Run once at startup or via `python -m src.scripts.migrate`. Returns the
+    index names per collection; an index that cannot be built (e.g. duplicates
+    block a unique index) is reported and skipped.
+    """
+    from .local_store import LocalDatabase
+    db = get_database(url)
+    created = {}
+    for collection, obsolete in OBSOLETE_INDEXES.items():
+        for keys in obsolete:
+            try:
+                db[collection].drop_index(keys)
+            except pymongo.errors.OperationFailure:
+                pass  # already gone
+    for collection, indexes in INDEXES.items():
+        if isinstance(db, LocalDatabase) and collection == "forecasts":
+            # The SQLite forecasts table has its own schema (see Database)
+            continue
+        created[collection] = []
+        for keys, options in indexes:
+            try:
+                created[collection].append(db[collection].create_index(keys, **options))
+            except (pymongo.errors.PyMongoError, sqlite3.Error) as e:
+                print(f"Warning: index {keys} on {collection} failed: {e}")
+    return created
+
+def close_clients():
+    """Close all shared clients (at shutdown)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+        # Async clients are closed by their event loop's teardown
+        _async_clients.clear()
@@ -1,19 +1,15 @@
-from typing import List, Optional, Type, TypeVar, Generic
+from typing import Dict, List, Optional, Type, TypeVar, Generic
 from datetime import datetime
-import pymongo
-from .config import settings
-from .models import MarketOverview, WishlistItem, SimulationRun, UserPreferences
+from .mongo import get_database, get_async_database
+from .models import MarketOverview, WishlistItem, SimulationRun, SimulationChart, UserPreferences
 
 T = TypeVar('T', bound='MongoBaseModel')
 
 class MongoRepository(Generic[T]):
     def __init__(self, collection_name: str, model_cls: Type[T]):
-        self.client = pymongo.MongoClient(settings.DATABASE_URL)
-        try:
-            self.db = self.client.get_default_database()
-        except pymongo.errors.ConfigurationError:
-            # Fallback if no database name in URL
-            self.db = self.client.get_database("forcast_antigravity")
+        # Shared process-wide client (or the embedded store for sqlite:// URLs);
+        # indexes are created by mongo.ensure_indexes
+        self.db = get_database()
         self.collection = self.db[collection_name]
         self.model_cls = model_cls
 
@@ -23,8 +19,8 @@ class MongoRepository(Generic[T]):
         item.id = str(result.inserted_id)
         return item
 
-    def find_one(self, query: dict) -> Optional[T]:
-        data = self.collection.find_one(query)
+    def find_one(self, query: dict, sort: list = None) -> Optional[T]:
+        data = self.collection.find_one(query, sort=sort)
         if data:
             return self.model_cls(**data)
         return None
@@ -36,9 +32,29 @@ class MongoRepository(Generic[T]):
         cursor = cursor.limit(limit)
         return [self.model_cls(**doc) for doc in cursor]
 
+    def create_many(self, items: List[T]) -> List[T]:
+        """Insert several items in one round-trip."""
+        if not items:
+            return items
+        result = self.collection.insert_many(
+            [item.model_dump(by_alias=True, exclude={"id"}) for item in items], ordered=False
+        )
+        for item, inserted_id in zip(items, result.inserted_ids):
+            item.id = str(inserted_id)
+        return items
+
     def update(self, query: dict, update_data: dict):
         self.collection.update_one(query, {"$set": update_data})
 
+    def replace(self, query: dict, item: T) -> T:
+        """
+        Overwrite the document matching `query` in place (inserting it if there
+        is none), so readers see either the old or the new version, never a gap.
+        """
+        data = item.model_dump(by_alias=True, exclude={"id"})
+        self.collection.update_one(query, {"$set": data}, upsert=True)
+        return item
+
     def delete(self, query: dict):
         self.collection.delete_one(query)
 
@@ -48,14 +64,17 @@ class MongoRepository(Generic[T]):
 class MarketRepository(MongoRepository[MarketOverview]):
     def __init__(self):
         super().__init__("market_overview", MarketOverview)
-        # Ensure index on symbol and date
-        self.collection.create_index([("symbol", 1), ("date", 1)], unique=True)
 
     def find_latest_by_symbol(self, symbol: str) -> Optional[MarketOverview]:
         return self.find_one({"symbol": symbol}, sort=[("date", -1)])
 
     def find_by_date(self, symbol: str, date: str) -> Optional[MarketOverview]:
         return self.find_one({"symbol": symbol, "date": date})
+
+    def find_by_symbols_date(self, symbols: List[str], date: str) -> Dict[str, MarketOverview]:
+        """Overviews for many symbols on one date in a single query, keyed by symbol."""
+        cursor = self.collection.find({"symbol": {"$in": list(symbols)}, "date": date})
+        return {doc["symbol"]: self.model_cls(**doc) for doc in cursor}
     
     def get_available_dates(self) -> List[str]:
         return sorted(self.collection.distinct("date"))
@@ -63,19 +82,86 @@ class MarketRepository(MongoRepository[MarketOverview]):
 class SimulationRepository(MongoRepository[SimulationRun]):
     def __init__(self):
         super().__init__("simulation_runs", SimulationRun)
-        self.collection.create_index([("symbol", 1), ("date", 1), ("horizon", 1)], unique=True)
 
     def find_run(self, symbol: str, date: str, horizon: int) -> Optional[SimulationRun]:
         return self.find_one({"symbol": symbol, "date": date, "horizon": horizon})
 
+    def find_runs(self, symbol: str, date: str, horizons: List[int]) -> Dict[int, SimulationRun]:
+        """Runs for several horizons in a single query, keyed by horizon."""
+        cursor = self.collection.find(
+            {"symbol": symbol, "date": date, "horizon": {"$in": [int(h) for h in horizons]}}
+        )
+        return {doc["horizon"]: self.model_cls(**doc) for doc in cursor}
+
     def get_available_dates(self, symbol: str) -> List[str]:
         return sorted(self.collection.distinct("date", {"symbol": symbol}))
 
+class ChartRepository(MongoRepository[SimulationChart]):
+    def __init__(self):
+        super().__init__("simulation_charts", SimulationChart)
+
+    @staticmethod
+    def key(symbol: str, date: str, conservative: bool = False) -> dict:
+        # Charts stored before the flag existed are baseline charts
+        return {"symbol": symbol, "date": date, "conservative": True if conservative else {"$ne": True}}
+
+    def find_chart(self, symbol: str, date: str, conservative: bool = False) -> Optional[SimulationChart]:
+        return self.find_one(self.key(symbol, date, conservative))
+
 class WishlistRepository(MongoRepository[WishlistItem]):
     def __init__(self):
         super().__init__("wishlist", WishlistItem)
-        self.collection.create_index("symbol", unique=True)
 
     def get_all_symbols(self) -> List[str]:
         items = self.find_many({}, limit=1000)
         return sorted([item.symbol for item in items])
+
+
+class AsyncMongoRepository(Generic[T]):
+    """
+    Async counterpart of MongoRepository for async endpoints.
+    The collection is resolved per call so each event loop uses its own shared client.
+    """
+    def __init__(self, collection_name: str, model_cls: Type[T]):
+        self.collection_name = collection_name
+        self.model_cls = model_cls
+
+    @property
+    def collection(self):
+        return get_async_database()[self.collection_name]
+
+    async def create(self, item: T) -> T:
+        data = item.model_dump(by_alias=True, exclude={"id"})
+        result = await self.collection.insert_one(data)
+        item.id = str(result.inserted_id)
+        return item
+
+    async def find_one(self, query: dict, sort: list = None) -> Optional[T]:
+        data = await self.collection.find_one(query, sort=sort)
+        if data:
+            return self.model_cls(**data)
+        return None
+
+    async def find_many(self, query: dict, limit: int = 100, sort: list = None) -> List[T]:
+        cursor = self.collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        cursor = cursor.limit(limit)
+        return [self.model_cls(**doc) async for doc in cursor]
+
+    async def update(self, query: dict, update_data: dict):
+        await self.collection.update_one(query, {"$set": update_data})
+
+    async def delete(self, query: dict):
+        await self.collection.delete_one(query)
+
+    async def delete_many(self, query: dict):
+        await self.collection.delete_many(query)
+
+class AsyncWishlistRepository(AsyncMongoRepository[WishlistItem]):
+    def __init__(self):
+        super().__init__("wishlist", WishlistItem)
+
+    async def get_all_symbols(self) -> List[str]:
+        items = await self.find_many({}, limit=1000)
+        return sorted([item.symbol for item in items])
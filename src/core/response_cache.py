@@ -0,0 +1,90 @@
+import hashlib
+from typing import Any, Callable, Dict, Hashable, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import Response
+from .config import settings
+from .lru import SizedLRU
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def _matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    # Weak comparison (RFC 9110): W/ prefixes are ignored for If-None-Match
+    return "*" in tags or etag in [t[2:] if t.startswith("W/") else t for t in tags]
+
+class ResponseCache(SizedLRU):
+    """
+    Rendered JSON responses keyed by (endpoint, params, fingerprint), where the
+    fingerprint describes everything the response depends on (data files,
+    model artifacts, forecast table version, freshness change point). A
+    changed input gives a new key, so entries never need explicit expiry;
+    `publish()` drops everything when the scheduler has produced new data.
+
+    ETags are the hash of the body, so a client revalidating with
+    If-None-Match gets a 304 whenever the content is unchanged, even after
+    the entry was evicted or the process restarted.
+    """
+    def __init__(self, max_bytes: int, max_age: int = 0):
+        super().__init__(max_bytes)
+        self.max_age = max_age
+        self.generation = 0
+        self.not_modified = 0
+
+    def _headers(self, etag: str) -> Dict[str, str]:
+        return {"ETag": etag, "Cache-Control": f"max-age={self.max_age}, must-revalidate"}
+
+    def _respond(self, request: Request, etag: str, body: bytes) -> Response:
+        if _matches(request, etag):
+            with self._lock:
+                self.not_modified += 1
+            return Response(status_code=304, headers=self._headers(etag))
+        return Response(content=body, media_type="application/json", headers=self._headers(etag))
+
+    def lookup(self, request: Request, key: Hashable) -> Optional[Response]:
+        """Cached response (or 304) for `key`, or None when it must be computed."""
+        entry = self.get((self.generation, key))
+        if entry is None:
+            return None
+        return self._respond(request, *entry)
+
+    def store(self, request: Request, key: Hashable, content: Any) -> Response:
+        """Render `content`, keep it under `key` and answer the request."""
+        body = JSONResponse(content=jsonable_encoder(content)).body
+        etag = _etag(body)
+        self.put((self.generation, key), None, (etag, body), len(body))
+        return self._respond(request, etag, body)
+
+    def cached(self, request: Request, key: Callable[[], Hashable], compute: Callable[[], Any],
+               cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Serve `compute()` through the cache. The key is built again after
+        computing, because computing may itself refresh data or fit models.
+        Content rejected by `cacheable` (e.g. stale results) is returned uncached.
+        """
+        response = self.lookup(request, key())
+        if response is not None:
+            return response
+        content = compute()
+        if cacheable is not None and not cacheable(content):
+            return content
+        return self.store(request, key(), content)
+
+    def publish(self):
+        """New data or models were published: start a new generation."""
+        with self._lock:
+            self.generation += 1
+        self.clear()
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        with self._lock:
+            stats.update(not_modified=self.not_modified, generation=self.generation)
+        return stats
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MB * 1024 * 1024, settings.RESPONSE_CACHE_MAX_AGE)
@@ -7,6 +7,7 @@ from ..models.lightgbm_forecaster import ForecastModel
 from ..models.registry import ModelRegistry
 from ..core.database import Database
 from .config import settings
+from .response_cache import response_cache
 import pandas as pd
 
 def update_job():
@@ -21,10 +22,15 @@ def update_job():
     pipeline = FeaturePipeline()
     registry = ModelRegistry(settings.MODELS_DIR)
 
+    # 1. Fetch Data for all symbols concurrently
+    # Only bars newer than the cached history are downloaded
+    batch = loader.get_many(settings.SYMBOLS, refresh=True)
+
     for symbol in settings.SYMBOLS:
         print(f"Updating {symbol}...")
-        # 1. Fetch Data
-        df = loader.get_data(symbol, use_cache=False) # Force refresh
+        result = batch[symbol]
+        print(f"{symbol}: {result['status']}, fetched {result['fetched']} rows, reused {result['reused']} cached rows")
+        df = result['data']
         if df.empty:
             continue
 
@@ -68,12 +74,16 @@ def update_job():
             lgb_model.fit(X, y)
             registry.save_forecast_model(symbol, lgb_model, h)
             
-        # 7. Update Actuals in DB (Analysis Step)
-        current_price = df['Close'].iloc[-1]
-        current_date = str(df.index[-1].date())
-        db = Database()
-        db.update_actuals(symbol, current_date, float(current_price))
-        
+    # 7. Reconcile Actuals in DB (Analysis Step)
+    # Every matured forecast gets the close on its own target date
+    closes = {symbol: result['data']['Close'] for symbol, result in batch.items()
+              if symbol in settings.SYMBOLS and not result['data'].empty}
+    reconciled = Database().reconcile_actuals(closes)
+    print(f"Reconciled {reconciled} forecasts.")
+
+    # New data and models are published: drop every cached API response
+    response_cache.publish()
+
     print("Daily update job completed.")
 
 def start_scheduler():
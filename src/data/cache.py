@@ -1,42 +1,172 @@
 import os
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Optional
+from ..core.config import settings
+from ..core.files import write_atomic
+from ..core.lru import SizedLRU
+
+def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """Mark the frame's column arrays read-only so a shared frame cannot be mutated in place."""
+    try:
+        for block in df._mgr.blocks:
+            if isinstance(block.values, np.ndarray):
+                block.values.flags.writeable = False
+    except AttributeError:
+        pass
+    return df
+
+class FrameCache(SizedLRU):
+    """
+    Memory-bounded LRU of decoded DataFrames, shared by all DataCache instances.
+    Entries are validated against the (mtime, size) signature of their file,
+    so a rewrite by another loader or process is picked up on the next load.
+    Frames are returned shared and read-only; callers must copy before mutating.
+    """
+    def put(self, key: str, signature: tuple, df: pd.DataFrame, nbytes: Optional[int] = None) -> pd.DataFrame:
+        df = _freeze(df)
+        if nbytes is None:
+            nbytes = int(df.memory_usage(index=True, deep=False).sum())
+        return super().put(key, signature, df, nbytes)
+
+frame_cache = FrameCache(settings.DATA_MEMORY_CACHE_MB * 1024 * 1024)
+
+def _signature(stat: os.stat_result) -> tuple:
+    return (stat.st_mtime_ns, stat.st_size)
+
+class ParquetStore:
+    """Compressed Parquet files, decoded into a new DataFrame on every read."""
+    suffix = ".parquet"
+
+    def write(self, data: pd.DataFrame, path: Path):
+        data.to_parquet(path)
+
+    def read(self, path: Path) -> pd.DataFrame:
+        return pd.read_parquet(path)
+
+class ArrowStore:
+    """
+    Uncompressed Arrow IPC (Feather v2) files opened with memory mapping.
+    Numeric columns of the loaded frame are zero-copy, read-only views of
+    the mapped file, so the OS page cache is shared by every worker process
+    that reads the same symbol.
+    """
+    suffix = ".arrow"
+
+    def write(self, data: pd.DataFrame, path: Path):
+        import pyarrow as pa
+        table = pa.Table.from_pandas(data, preserve_index=True)
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def read(self, path: Path) -> pd.DataFrame:
+        import pyarrow as pa
+        source = pa.memory_map(str(path), "r")
+        table = pa.ipc.open_file(source).read_all()
+        # split_blocks keeps one block per column, which lets pyarrow hand
+        # out views of the mapped buffers instead of consolidating copies
+        return table.to_pandas(split_blocks=True)
+
+STORES = {
+    "parquet": ParquetStore,
+    "arrow": ArrowStore
+}
 
 class DataCache:
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: str = "data/cache", memory_cache: Optional[FrameCache] = None, backend: Optional[str] = None):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory = memory_cache if memory_cache is not None else frame_cache
+        self.backend = backend or settings.DATA_CACHE_BACKEND
+        if self.backend not in STORES:
+            raise ValueError(f"Unknown data cache backend: {self.backend}")
+        self.store = STORES[self.backend]()
 
     def _get_file_path(self, symbol: str) -> Path:
-        return self.cache_dir / f"{symbol}.parquet"
+        return self.cache_dir / f"{symbol}{self.store.suffix}"
 
     def save(self, symbol: str, data: pd.DataFrame):
-        """Save dataframe to cache."""
+        """Save dataframe to cache (atomically, see write_atomic)."""
         file_path = self._get_file_path(symbol)
         # Ensure index is datetime and sorted
         if not isinstance(data.index, pd.DatetimeIndex):
             data.index = pd.to_datetime(data.index)
         data = data.sort_index()
-        data.to_parquet(file_path)
 
-    def load(self, symbol: str, max_age_hours: int = 24) -> pd.DataFrame:
+        write_atomic(file_path, lambda tmp_path: self.store.write(data, Path(tmp_path)))
+        self.memory.invalidate(str(file_path))
+
+    def fetched_at(self, symbol: str) -> Optional[datetime]:
+        """Time the cached data was last written or confirmed current (UTC)."""
+        try:
+            stat = self._get_file_path(symbol).stat()
+        except FileNotFoundError:
+            return None
+        return datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+
+    def signature(self, symbol: str) -> Optional[tuple]:
+        """(mtime, size) of the cached file, or None if there is none."""
+        try:
+            return _signature(self._get_file_path(symbol).stat())
+        except FileNotFoundError:
+            return None
+
+    def touch(self, symbol: str):
+        """Mark cached data as freshly checked without rewriting it."""
+        file_path = self._get_file_path(symbol)
+        if file_path.exists():
+            old_signature = _signature(file_path.stat())
+            file_path.touch()
+            self.memory.resign(str(file_path), old_signature, _signature(file_path.stat()))
+
+    def load(self, symbol: str, max_age_hours: Optional[int] = 24) -> pd.DataFrame:
         """
         Load dataframe from cache if it exists and is not too old.
+        Pass max_age_hours=None to ignore the file age.
         Returns None if cache miss or expired.
+        Hot symbols are served from the in-process frame cache; the
+        returned frame is shared and read-only.
         """
         file_path = self._get_file_path(symbol)
         
-        if not file_path.exists():
-            return None
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return self._migrate_legacy(symbol, max_age_hours)
 
         # Check modification time
-        mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-        if datetime.now() - mtime > timedelta(hours=max_age_hours):
-            return None
+        if max_age_hours is not None:
+            mtime = datetime.fromtimestamp(stat.st_mtime)
+            if datetime.now() - mtime > timedelta(hours=max_age_hours):
+                return None
+
+        key = str(file_path)
+        signature = _signature(stat)
+        df = self.memory.get(key, signature)
+        if df is not None:
+            return df
 
         try:
-            return pd.read_parquet(file_path)
+            df = self.store.read(file_path)
         except Exception as e:
             print(f"Error reading cache for {symbol}: {e}")
             return None
+        return self.memory.put(key, signature, df)
+
+    def _migrate_legacy(self, symbol: str, max_age_hours: Optional[int]) -> Optional[pd.DataFrame]:
+        """Convert an existing Parquet cache file when another backend is configured."""
+        if self.backend == "parquet":
+            return None
+        legacy = DataCache(str(self.cache_dir), memory_cache=self.memory, backend="parquet")
+        df = legacy.load(symbol, max_age_hours=max_age_hours)
+        if df is None:
+            return None
+        print(f"Migrating {symbol} cache to {self.backend} format.")
+        self.save(symbol, df.copy())
+        # Keep the original fetch time so freshness checks are unaffected
+        legacy_stat = legacy._get_file_path(symbol).stat()
+        os.utime(self._get_file_path(symbol), ns=(legacy_stat.st_atime_ns, legacy_stat.st_mtime_ns))
+        return self.load(symbol, max_age_hours=None)
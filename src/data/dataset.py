@@ -0,0 +1,131 @@
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+from .providers import OHLCV_COLUMNS
+from ..core.config import settings
+
+class MarketDataset:
+    """
+    Consolidated OHLCV dataset for the whole universe, stored as Parquet
+    partitioned by symbol and year (hive layout: symbol=SPY/year=2024/...).
+
+    Reads push symbol, date-range and column filters down to pyarrow, so
+    only the matching partitions and row groups are opened. This is the
+    cheap way to answer cross-symbol questions ("all closes on date X",
+    "last 252 days for the watchlist") without opening one file per symbol.
+    """
+    def __init__(self, root: str = settings.DATA_DATASET_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _partitioning(self):
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        schema = pa.schema([("symbol", pa.string()), ("year", pa.int32())])
+        return ds.partitioning(schema, flavor="hive")
+
+    def write(self, symbol: str, data: pd.DataFrame, since: Optional[pd.Timestamp] = None):
+        """
+        Write a symbol's history into the dataset.
+        Only the years covered by the written rows are replaced; pass `since`
+        to rewrite just the tail (e.g. after an incremental refresh).
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if data is None or data.empty:
+            return
+        if since is not None:
+            # Rewrite whole years so partitions stay complete
+            data = data[data.index >= pd.Timestamp(year=pd.Timestamp(since).year, month=1, day=1)]
+
+        frame = data[[c for c in OHLCV_COLUMNS if c in data.columns]].copy()
+        frame.index = pd.to_datetime(frame.index)
+        frame.index.name = "Date"
+        frame = frame.reset_index()
+        frame["symbol"] = symbol
+        frame["year"] = frame["Date"].dt.year.astype("int32")
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        ds.write_dataset(
+            table,
+            str(self.root),
+            format="parquet",
+            partitioning=self._partitioning(),
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet"
+        )
+
+    def read(self, symbols: Optional[List[str]] = None, start: Optional[str] = None, end: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read rows in long format (Date, symbol, <columns>), sorted by symbol and date.
+        `start` and `end` are inclusive dates; None means unbounded.
+        """
+        import pyarrow.dataset as ds
+
+        if not any(self.root.iterdir()):
+            return pd.DataFrame()
+
+        dataset = ds.dataset(str(self.root), format="parquet", partitioning=self._partitioning())
+        value_cols = columns or OHLCV_COLUMNS
+        value_cols = [c for c in value_cols if c in dataset.schema.names]
+
+        predicate = None
+        def both(a, b):
+            return b if a is None else a & b
+
+        if symbols is not None:
+            predicate = both(predicate, ds.field("symbol").isin(list(symbols)))
+        if start is not None:
+            start_ts = pd.Timestamp(start)
+            # Year predicate prunes whole partitions, Date prunes row groups
+            predicate = both(predicate, ds.field("year") >= start_ts.year)
+            predicate = both(predicate, ds.field("Date") >= start_ts)
+        if end is not None:
+            end_ts = pd.Timestamp(end)
+            predicate = both(predicate, ds.field("year") <= end_ts.year)
+            predicate = both(predicate, ds.field("Date") <= end_ts)
+
+        table = dataset.to_table(columns=["Date", "symbol"] + value_cols, filter=predicate)
+        df = table.to_pandas()
+        return df.sort_values(["symbol", "Date"]).reset_index(drop=True)
+
+    def load(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Single-symbol read shaped like DataLoader.get_data (Date index, OHLCV columns)."""
+        df = self.read([symbol], start=start, end=end, columns=columns)
+        if df.empty:
+            return df
+        return df.drop(columns=["symbol"]).set_index("Date")
+
+    def panel(self, symbols: Optional[List[str]] = None, start: Optional[str] = None, end: Optional[str] = None,
+              column: str = "Close") -> pd.DataFrame:
+        """Wide frame of one column: Date index, one column per symbol."""
+        df = self.read(symbols, start=start, end=end, columns=[column])
+        if df.empty:
+            return df
+        return df.pivot(index="Date", columns="symbol", values=column)
+
+    def as_of(self, date: str, symbols: Optional[List[str]] = None, columns: Optional[List[str]] = None,
+              lookback_days: int = 10) -> pd.DataFrame:
+        """
+        Last bar at or before `date` for every symbol, indexed by symbol.
+        Only `lookback_days` before the date are scanned, so weekends and
+        holidays are covered without reading older row groups.
+        """
+        end = pd.Timestamp(date)
+        start = end - pd.Timedelta(days=lookback_days)
+        df = self.read(symbols, start=str(start.date()), end=str(end.date()), columns=columns)
+        if df.empty:
+            return df
+        return df.groupby("symbol").last()
+
+    def tail(self, symbols: Optional[List[str]] = None, days: int = 252, end: Optional[str] = None,
+             column: str = "Close") -> pd.DataFrame:
+        """Last `days` trading days of one column for the given symbols (wide format)."""
+        end_ts = pd.Timestamp(end) if end else pd.Timestamp.now().normalize()
+        # Calendar window large enough to hold `days` trading days
+        start_ts = end_ts - pd.Timedelta(days=int(days * 1.5) + 10)
+        panel = self.panel(symbols, start=str(start_ts.date()), end=str(end_ts.date()), column=column)
+        return panel.tail(days)
@@ -1,11 +1,30 @@
-import yfinance as yf
+import time
 import pandas as pd
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
 from .cache import DataCache
+from .providers import DataProvider, normalize_ohlcv, get_rate_limiter, get_provider
+from .dataset import MarketDataset
+from ..core.config import settings
+from ..core.singleflight import SingleFlight
+from ..core.freshness import FreshnessPolicy, freshness as default_freshness
+
+# Concurrent loads/refreshes of the same symbol share one execution
+data_flight = SingleFlight("data")
 
 class DataLoader:
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: str = "data/cache", provider: Optional[DataProvider] = None,
+                 max_retries: int = settings.DATA_FETCH_RETRIES, backoff_seconds: float = 0.5,
+                 dataset: Optional[MarketDataset] = None, freshness: Optional[FreshnessPolicy] = None):
         self.cache = DataCache(cache_dir)
+        self.freshness = freshness or default_freshness
+        if dataset is None and settings.DATA_DATASET_ENABLED:
+            dataset = MarketDataset(settings.DATA_DATASET_DIR)
+        self.dataset = dataset
+        self.provider = provider or get_provider()
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.rate_limiter = get_rate_limiter(self.provider.host, settings.DATA_FETCH_RATE, burst=settings.DATA_FETCH_WORKERS)
         self.symbol_map = {
             "S&P 500": "SPY",
             "SP500": "SPY",
@@ -27,40 +46,203 @@ class DataLoader:
     def get_data(self, symbol: str, start_date: str = "2000-01-01", end_date: Optional[str] = None, use_cache: bool = True) -> pd.DataFrame:
         """
         Fetch OHLCV data for a symbol.
-        Tries cache first, then falls back to yfinance.
+        Tries cache first. If the cache is missing or stale according to the
+        market-calendar freshness policy, refreshes it incrementally (see `refresh`). With use_cache=False the full history
+        is fetched from the provider and the cache is left untouched.
         """
         symbol = self.resolve_symbol(symbol)
+        key = ("get", str(self.cache.cache_dir), symbol, start_date, end_date, use_cache)
+        return data_flight.do(key, self._get_data, symbol, start_date, end_date, use_cache)
 
+    def _get_data(self, symbol: str, start_date: str, end_date: Optional[str], use_cache: bool) -> pd.DataFrame:
         if use_cache:
-            df = self.cache.load(symbol)
+            df = self.load_fresh(symbol)
             if df is not None:
                 print(f"Loaded {symbol} from cache.")
                 return df
+            return self.refresh(symbol, start_date=start_date, end_date=end_date)['data']
 
-        print(f"Fetching {symbol} from yfinance...")
+        print(f"Fetching {symbol} from {self.provider.name}...")
         try:
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(start=start_date, end=end_date)
-            
+            df = self._fetch(symbol, start_date, end_date)
             if df.empty:
                 print(f"No data found for {symbol}")
-                return pd.DataFrame()
-
-            # Clean up columns (remove Dividends, Stock Splits if present, keep OHLCV)
-            keep_cols = ['Open', 'High', 'Low', 'Close', 'Volume']
-            df = df[[c for c in keep_cols if c in df.columns]]
-            
-            # Ensure index is timezone-naive for simplicity in this skeleton
-            df.index = df.index.tz_localize(None)
-
-            if use_cache:
-                self.cache.save(symbol, df)
-                
             return df
         except Exception as e:
-            import traceback
-            with open("loader_error.log", "a") as f:
-                f.write(f"Error fetching {symbol}: {e}\n")
-                f.write(traceback.format_exc())
-            print(f"Error fetching data for {symbol}: {e}")
+            self._log_error(symbol, e)
+            return pd.DataFrame()
+
+    def load_fresh(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Cached data for a resolved symbol, or None if missing or stale."""
+        df = self.cache.load(symbol, max_age_hours=None)
+        if df is None or df.empty:
+            return None
+        if not self.freshness.data_is_fresh(symbol, df.index[-1], self.cache.fetched_at(symbol)):
+            return None
+        return df
+
+    def fingerprint(self, symbol: str) -> tuple:
+        """
+        Identifies the data a result for `symbol` is computed from: the cached
+        file version and the last freshness change point (past it, the cache
+        is due for a refresh even though the file has not changed yet).
+        """
+        symbol = self.resolve_symbol(symbol)
+        return (symbol, self.cache.signature(symbol), self.freshness.last_change_point(symbol).isoformat())
+
+    def refresh(self, symbol: str, start_date: str = "2000-01-01", end_date: Optional[str] = None, overlap_days: int = 5) -> Dict[str, Any]:
+        """
+        Bring the cached history for a symbol up to date.
+        Only bars after the last cached date are requested (minus `overlap_days`
+        so late revisions of recent bars are picked up). New bars replace
+        cached ones on the same date and the merged frame is written back.
+
+        Returns a dict with the merged 'data', the number of rows 'fetched'
+        from the provider, the number of cached rows 'reused', the 'mode'
+        ("full" or "incremental") and the provider 'error' (None on success).
+        """
+        symbol = self.resolve_symbol(symbol)
+        key = ("refresh", str(self.cache.cache_dir), symbol, end_date)
+        return data_flight.do(key, self._refresh, symbol, start_date, end_date, overlap_days)
+
+    def _refresh(self, symbol: str, start_date: str, end_date: Optional[str], overlap_days: int) -> Dict[str, Any]:
+        cached = self.cache.load(symbol, max_age_hours=None)
+
+        if cached is None or cached.empty:
+            mode = "full"
+            fetch_start = start_date
+        else:
+            mode = "incremental"
+            last_date = cached.index[-1]
+            fetch_start = (last_date - pd.Timedelta(days=overlap_days)).strftime("%Y-%m-%d")
+
+        print(f"Fetching {symbol} from {self.provider.name} ({mode}, start={fetch_start})...")
+        error = None
+        try:
+            fresh = self._fetch(symbol, fetch_start, end_date)
+        except Exception as e:
+            self._log_error(symbol, e)
+            error = str(e)
+            fresh = pd.DataFrame()
+
+        if mode == "full":
+            if fresh.empty:
+                print(f"No data found for {symbol}")
+            else:
+                self.cache.save(symbol, fresh)
+                self._write_dataset(symbol, fresh)
+            return {"symbol": symbol, "data": fresh, "fetched": len(fresh), "reused": 0, "mode": mode, "error": error}
+
+        if fresh.empty:
+            # Nothing new upstream (weekend, holiday or provider error): keep cache
+            if error is None:
+                self.cache.touch(symbol)
+            return {"symbol": symbol, "data": cached, "fetched": 0, "reused": len(cached), "mode": mode, "error": error}
+
+        # Merge and dedupe: fetched bars win over cached bars on the same date
+        reused = int((~cached.index.isin(fresh.index)).sum())
+        merged = pd.concat([cached, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self.cache.save(symbol, merged)
+        self._write_dataset(symbol, merged, since=fresh.index[0])
+
+        return {"symbol": symbol, "data": merged, "fetched": len(fresh), "reused": reused, "mode": mode, "error": None}
+
+    def get_many(self, symbols: List[str], max_workers: int = settings.DATA_FETCH_WORKERS, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Load several symbols concurrently through a bounded thread pool.
+        Fresh cache entries are served from disk; everything else goes
+        through `refresh` (always, when refresh=True). Upstream requests
+        share the per-host rate limiter and are retried with backoff.
+
+        Returns {symbol: result} keyed by the requested symbols, where each
+        result has 'data', 'status' ("cached", "fetched", "empty" or
+        "error"), 'fetched', 'reused' and 'error'. A failing symbol never
+        fails the batch.
+        """
+        resolved = {sym: self.resolve_symbol(sym) for sym in symbols}
+        unique = list(dict.fromkeys(resolved.values()))
+
+        workers = max(1, min(max_workers, len(unique)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loaded = dict(zip(unique, executor.map(lambda sym: self._load_one(sym, refresh), unique)))
+
+        return {sym: loaded[res] for sym, res in resolved.items()}
+
+    def _load_one(self, symbol: str, refresh: bool) -> Dict[str, Any]:
+        """Load one resolved symbol and describe the outcome (see `get_many`)."""
+        try:
+            if not refresh:
+                df = self.load_fresh(symbol)
+                if df is not None:
+                    return {"data": df, "status": "cached", "fetched": 0, "reused": len(df), "error": None}
+            result = self.refresh(symbol)
+            if result['error'] is not None:
+                status = "error"
+            else:
+                status = "fetched" if not result['data'].empty else "empty"
+            return {"data": result['data'], "status": status, "fetched": result['fetched'],
+                    "reused": result['reused'], "error": result['error']}
+        except Exception as e:
+            self._log_error(symbol, e)
+            return {"data": pd.DataFrame(), "status": "error", "fetched": 0, "reused": 0, "error": str(e)}
+
+    def load_universe(self, symbols: List[str], start: Optional[str] = None, end: Optional[str] = None,
+                      columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Long-format (Date, symbol, <columns>) slice across many symbols.
+        Served from the consolidated dataset with filter pushdown when it is
+        enabled, otherwise assembled from the per-symbol cache files.
+        """
+        resolved = list(dict.fromkeys(self.resolve_symbol(s) for s in symbols))
+        if self.dataset is not None:
+            return self.dataset.read(resolved, start=start, end=end, columns=columns)
+
+        frames = []
+        for symbol in resolved:
+            df = self.cache.load(symbol, max_age_hours=None)
+            if df is None or df.empty:
+                continue
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df.index <= pd.Timestamp(end)]
+            if columns is not None:
+                df = df[[c for c in columns if c in df.columns]]
+            frame = df.rename_axis("Date").reset_index()
+            frame.insert(1, "symbol", symbol)
+            frames.append(frame)
+        if not frames:
             return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def _write_dataset(self, symbol: str, data: pd.DataFrame, since: Optional[pd.Timestamp] = None):
+        if self.dataset is None:
+            return
+        try:
+            self.dataset.write(symbol, data, since=since)
+        except Exception as e:
+            print(f"Warning: dataset write failed for {symbol}: {e}")
+
+    def _fetch(self, symbol: str, start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+        """Fetch from the provider with rate limiting and exponential backoff."""
+        attempt = 0
+        while True:
+            if self.provider.rate_limited:
+                self.rate_limiter.acquire()
+            try:
+                return normalize_ohlcv(self.provider.fetch(symbol, start=start, end=end))
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                print(f"Fetch failed for {symbol} ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def _log_error(self, symbol: str, e: Exception):
+        import traceback
+        with open("loader_error.log", "a") as f:
+            f.write(f"Error fetching {symbol}: {e}\n")
+            f.write(traceback.format_exc())
+        print(f"Error fetching data for {symbol}: {e}")
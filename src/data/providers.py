@@ -0,0 +1,214 @@
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Optional, Dict, List
+from ..core.config import settings
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+class DataProvider:
+    """
+    Source of daily OHLCV bars used by DataLoader.
+    Subclasses implement `fetch` and return a DataFrame indexed by a
+    timezone-naive DatetimeIndex with (a subset of) OHLCV_COLUMNS.
+    An empty DataFrame means "no data for this range".
+    `host` identifies the upstream service for rate limiting; local
+    providers set `rate_limited = False` to skip the limiter.
+    """
+    name: str = "base"
+    host: str = "local"
+    rate_limited: bool = True
+
+    def fetch(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        raise NotImplementedError
+
+def normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep OHLCV columns, drop timezone info and sort by date."""
+    if df is None or df.empty:
+        return pd.DataFrame()
+
+    # Clean up columns (remove Dividends, Stock Splits if present, keep OHLCV)
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]]
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    # Ensure index is timezone-naive for simplicity in this skeleton
+    if df.index.tz is not None:
+        df.index = df.index.tz_localize(None)
+    return df.sort_index()
+
+class YFinanceProvider(DataProvider):
+    name = "yfinance"
+    host = "query1.finance.yahoo.com"
+
+    def fetch(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        df = ticker.history(start=start, end=end)
+        return normalize_ohlcv(df)
+
+def _slice(df: pd.DataFrame, start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """Apply yfinance range semantics: start inclusive, end exclusive."""
+    if start:
+        df = df[df.index >= pd.Timestamp(start)]
+    if end:
+        df = df[df.index < pd.Timestamp(end)]
+    return df
+
+class SyntheticProvider(DataProvider):
+    """
+    Deterministic regime-switching OHLCV generator for offline tests and benchmarks.
+
+    Each symbol gets its own seeded two-state Markov chain (calm bull /
+    volatile bear) driving daily log returns. Every random component uses
+    its own stream, so a bar's values depend only on (seed, symbol, date)
+    and never on the requested range: incremental and full fetches agree.
+    """
+    name = "synthetic"
+    host = "synthetic"
+    rate_limited = False
+
+    # (daily drift, daily volatility) per regime
+    REGIMES = [(0.0005, 0.008), (-0.0010, 0.025)]
+    TRANSMAT = np.array([[0.99, 0.01], [0.03, 0.97]])
+
+    def __init__(self, seed: int = 42, start: str = "2000-01-01", end: Optional[str] = None, latency: float = 0.0):
+        self.seed = seed
+        self.start = pd.Timestamp(start)
+        self.end = pd.Timestamp(end) if end else pd.Timestamp.now().normalize()
+        self.latency = latency
+        # Business-day calendar is shared by all symbols (bdate_range is slow)
+        days = pd.date_range(self.start, self.end, freq="D")
+        self.dates = days[days.dayofweek < 5]
+
+    @staticmethod
+    def universe(size: int, prefix: str = "SYN") -> List[str]:
+        """Symbol names for a synthetic universe of `size` tickers."""
+        width = max(4, len(str(size - 1)))
+        return [f"{prefix}{i:0{width}d}" for i in range(size)]
+
+    def generate(self, symbol: str) -> pd.DataFrame:
+        dates = self.dates
+        n = len(dates)
+        # One stream per series, each drawn with size=n, so a longer calendar
+        # extends every series without changing the days they share
+        streams = np.random.SeedSequence([self.seed, zlib.crc32(symbol.encode())]).spawn(6)
+        regime_rng, return_rng, gap_rng, volume_rng, wick_up_rng, wick_down_rng = [
+            np.random.default_rng(s) for s in streams
+        ]
+
+        # Regime path: alternating spells with geometric durations, which is
+        # the same two-state Markov chain without a per-day Python loop
+        leave = 1 - np.diag(self.TRANSMAT)
+        durations = np.empty(0, dtype=np.int64)
+        while durations.sum() < n:
+            chunk = 2 * (n // 50 + 8)
+            durations = np.concatenate([durations, regime_rng.geometric(np.tile(leave, chunk // 2))])
+        states = np.arange(len(durations)) % 2
+        regimes = np.repeat(states, durations)[:n]
+
+        drift = np.array([r[0] for r in self.REGIMES])[regimes]
+        vol = np.array([r[1] for r in self.REGIMES])[regimes]
+        log_returns = drift + vol * return_rng.standard_normal(n)
+        base_price = 20 + 480 * (zlib.crc32(symbol.encode()) % 1000) / 1000
+        close = base_price * np.exp(np.cumsum(log_returns))
+
+        gaps = gap_rng.standard_normal(n) * vol * 0.5
+        wick_up = wick_up_rng.standard_normal(n) * vol * 0.5
+        wick_down = wick_down_rng.standard_normal(n) * vol * 0.5
+        open_ = np.concatenate([[base_price], close[:-1]]) * np.exp(gaps)
+        high = np.maximum(open_, close) * np.exp(np.abs(wick_up))
+        low = np.minimum(open_, close) * np.exp(-np.abs(wick_down))
+        volume = volume_rng.lognormal(mean=14, sigma=0.5, size=n) * (1 + regimes)
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume.astype(np.int64)
+        }, index=dates)
+
+    def fetch(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        if self.latency:
+            time.sleep(self.latency)
+        return _slice(self.generate(symbol), start, end)
+
+class ReplayProvider(DataProvider):
+    """
+    Serves recorded OHLCV from local files (<directory>/<symbol>.parquet,
+    .arrow or .csv), e.g. a copy of data/cache captured from a live run.
+    """
+    name = "replay"
+    host = "replay"
+    rate_limited = False
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    def fetch(self, symbol: str, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        for suffix in (".parquet", ".arrow", ".csv"):
+            path = self.directory / f"{symbol}{suffix}"
+            if not path.exists():
+                continue
+            if suffix == ".parquet":
+                df = pd.read_parquet(path)
+            elif suffix == ".arrow":
+                df = pd.read_feather(path)
+            else:
+                df = pd.read_csv(path, index_col=0, parse_dates=True)
+            return _slice(normalize_ohlcv(df), start, end)
+        return pd.DataFrame()
+
+def get_provider(name: Optional[str] = None) -> DataProvider:
+    """Build the provider selected by DATA_PROVIDER ("yfinance", "synthetic" or "replay")."""
+    name = (name or settings.DATA_PROVIDER).lower()
+    if name == "yfinance":
+        return YFinanceProvider()
+    if name == "synthetic":
+        return SyntheticProvider(seed=settings.DATA_SYNTHETIC_SEED)
+    if name == "replay":
+        return ReplayProvider(settings.DATA_REPLAY_DIR)
+    raise ValueError(f"Unknown data provider: {name}")
+
+class RateLimiter:
+    """
+    Thread-safe token bucket.
+    `rate` tokens are added per second up to `burst`; acquire() blocks
+    until a token is available.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(host: str, rate: float, burst: int = 1) -> RateLimiter:
+    """Return the process-wide limiter for a host, creating it on first use."""
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = RateLimiter(rate, burst)
+            _limiters[host] = limiter
+        return limiter
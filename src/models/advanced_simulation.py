@@ -69,85 +69,70 @@ class AdvancedSimulator:
         """
         Simulate paths using Regime-Switching GARCH + Jump Diffusion.
         transmat: Transition matrix (n_states x n_states). If None, regime is fixed.
+        All paths advance together one day at a time (vectorized over sims).
         """
         rng = np.random.default_rng(seed)
-        end_prices = np.zeros(sims)
         all_paths = np.zeros((sims, days + 1))
         all_paths[:, 0] = start_price
         
         n_regimes = len(params)
-        regimes_list = list(params.keys()) # usually 0, 1, 2...
         
-        for s in range(sims):
-            price = start_price
-            regime = start_regime
-            
-            # Initialize Volatility
-            if params[regime]['method'] == 'garch':
-                vol = params[regime]['garch_res'].conditional_volatility[-1] / 100.0
-            else:
-                vol = params[regime]['std']
+        # Per-regime parameters as arrays indexed by regime id
+        def column(key, default=0.0):
+            return np.array([params[r].get(key, default) for r in range(n_regimes)], dtype=float)
+        is_garch = np.array([params[r]['method'] == 'garch' for r in range(n_regimes)])
+        omega = column('omega')
+        persistence = column('alpha') + column('beta')
+        t_df = np.maximum(3, column('t_df', 6))
+        if conservative:
+            t_df = np.maximum(t_df, 8)
+        t_scale = np.sqrt(t_df / (t_df - 2))
+        mean = column('mean')
+        std = column('std')
+        jump_lambda = column('jump_lambda') * (0.5 if conservative else 1.0)
+        jump_scale = 0.1 if conservative else 0.2
+        current_cap = 0.15 if conservative else cap
+        # Probability of an upward jump: Bear/Crash regimes mostly jump down
+        up_prob = np.where(np.arange(n_regimes) > 0, 0.3, 0.6)
+        cum_transmat = np.cumsum(transmat, axis=1) if transmat is not None else None
+        
+        regime = np.full(sims, start_regime)
+        # Initialize Volatility
+        if params[start_regime]['method'] == 'garch':
+            vol = np.full(sims, params[start_regime]['garch_res'].conditional_volatility[-1] / 100.0)
+        else:
+            vol = np.full(sims, params[start_regime]['std'])
+        price = np.full(sims, float(start_price))
 
-            for d in range(1, days + 1):
-                # 0. Regime Transition
-                if transmat is not None:
-                    # Sample next regime based on transition probabilities
-                    # transmat[i, j] is prob of going from i to j
-                    probs = transmat[regime]
-                    regime = rng.choice(n_regimes, p=probs)
-                
-                p = params[regime]
-                
-                if p['method'] == 'garch':
-                    # 1. Forecast next-day variance
-                    vol_pct = vol * 100.0
-                    var_pct = p['omega'] + p['alpha'] * (vol_pct**2) + p['beta'] * (vol_pct**2)
-                    vol_pct = np.sqrt(var_pct)
-                    vol = vol_pct / 100.0
-                    
-                    # 2. Draw return from Student-t
-                    from scipy.stats import t
-                    df = max(3, p['t_df'])
-                    if conservative:
-                        df = max(df, 8)
-                        
-                    shock_std = t.rvs(df, random_state=rng) / np.sqrt(df/(df-2))
-                    ret = shock_std * vol
-                    
-                else:
-                    ret = rng.normal(p['mean'], p['std'])
-                
-                # 3. Jump Component
-                jump_lambda = p['jump_lambda']
-                if conservative:
-                    jump_lambda *= 0.5
-                    
-                if rng.random() < jump_lambda:
-                    scale = 0.2
-                    if conservative:
-                        scale = 0.1
-                        
-                    jump_mag = np.exp(rng.normal(0, scale)) - 1
-                    
-                    if regime > 0: # Bear/Crash
-                        direction = -1 if rng.random() < 0.7 else 1
-                    else:
-                        direction = 1 if rng.random() < 0.6 else -1
-                        
-                    jump = direction * jump_mag
-                    ret += jump
-                
-                # 4. Cap / Liquidity Constraint
-                current_cap = cap
-                if conservative:
-                    current_cap = 0.15
-                    
-                ret = np.clip(ret, -current_cap, current_cap)
-                
-                price *= (1 + ret)
-                all_paths[s, d] = price
-                
-            end_prices[s] = price
+        for d in range(1, days + 1):
+            # 0. Regime Transition
+            if cum_transmat is not None:
+                # transmat[i, j] is prob of going from i to j
+                u = rng.random(sims)
+                regime = np.minimum((u[:, None] > cum_transmat[regime]).sum(axis=1), n_regimes - 1)
+            
+            garch = is_garch[regime]
+            
+            # 1. Forecast next-day variance (GARCH regimes)
+            vol_pct = vol * 100.0
+            var_pct = omega[regime] + persistence[regime] * (vol_pct**2)
+            vol = np.where(garch, np.sqrt(var_pct) / 100.0, vol)
+            
+            # 2. Draw return: Student-t shocks for GARCH, normal otherwise
+            shock_std = rng.standard_t(t_df[regime]) / t_scale[regime]
+            ret = np.where(garch, shock_std * vol, rng.normal(mean[regime], std[regime]))
+            
+            # 3. Jump Component
+            jumps = rng.random(sims) < jump_lambda[regime]
+            jump_mag = np.exp(rng.normal(0, jump_scale, sims)) - 1
+            direction = np.where(rng.random(sims) < up_prob[regime], 1.0, -1.0)
+            ret = ret + np.where(jumps, direction * jump_mag, 0.0)
+            
+            # 4. Cap / Liquidity Constraint
+            ret = np.clip(ret, -current_cap, current_cap)
+            
+            price = price * (1 + ret)
+            all_paths[:, d] = price
             
         # Calculate Quantiles for specific horizons
         horizons = [10, 30, 100, 365, 547, 730]
@@ -167,6 +152,21 @@ class AdvancedSimulator:
             'quantiles': quantiles
         }
 
+    def fan_chart(self, paths: np.ndarray, levels=(5, 10, 25, 50, 75, 90, 95), samples: int = 20):
+        """
+        Compress simulated paths (sims x days+1) for charting:
+        per-day percentile bands plus `samples` representative paths, picked
+        at evenly spaced ranks of the terminal price so they span the fan.
+        """
+        bands = np.percentile(paths, levels, axis=0)
+        order = np.argsort(paths[:, -1])
+        picks = order[np.linspace(0, len(order) - 1, min(samples, len(order))).round().astype(int)]
+        return {
+            'levels': list(levels),
+            'bands': bands,
+            'paths': paths[picks]
+        }
+
     def block_bootstrap(self, returns: pd.Series, start_price, days=30, sims=1000, block_size=10, seed=None):
         """
         Empirical Block Bootstrap for microcaps/non-stationary assets.
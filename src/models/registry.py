@@ -1,61 +1,114 @@
-import os
 from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
 from .hmm import RegimeDetector
 from .lightgbm_forecaster import ForecastModel
+from src.core.config import settings
+from src.core.files import write_atomic
+from src.core.lru import SizedLRU
+from src.core.singleflight import SingleFlight
+
+_load_flight = SingleFlight("model_load")
+
+class ModelCache(SizedLRU):
+    """
+    Process-wide LRU of loaded models, keyed by (models dir, symbol, kind, horizon).
+    Entries are validated against the (mtime, size) signature of their
+    artifact, so a model republished by the scheduler is picked up on the
+    next request while requests already holding the old object finish with
+    it. Cost is the artifact size on disk, a proxy for its memory footprint.
+    Models are shared; callers must not refit a cached instance.
+    """
+
+model_cache = ModelCache(settings.MODEL_CACHE_MB * 1024 * 1024)
 
 class ModelRegistry:
-    def __init__(self, models_dir: str = "models"):
+    def __init__(self, models_dir: str = "models", cache: Optional[ModelCache] = None):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.cache = cache or model_cache
+
+    def _load(self, key: Tuple, path: Path, load: Callable[[str], Any]) -> Optional[Any]:
+        """Cached load of `path`; reloads once when the artifact changes on disk."""
+        key = (str(self.models_dir),) + key
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            self.cache.invalidate(key)
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        model = self.cache.get(key, signature)
+        if model is not None:
+            return model
+
+        def load_and_cache():
+            return self.cache.put(key, signature, load(str(path)), st.st_size)
+
+        # Concurrent requests for the same artifact version share one load
+        return _load_flight.do((str(path), signature), load_and_cache)
+
+    def version(self, symbol: str) -> tuple:
+        """(name, mtime, size) of every published artifact for `symbol`."""
+        artifacts = []
+        for path in sorted(self.models_dir.glob(f"{symbol}_*")):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            artifacts.append((path.name, st.st_mtime_ns, st.st_size))
+        return tuple(artifacts)
 
     def save_hmm(self, symbol: str, model: RegimeDetector):
         path = self.models_dir / f"{symbol}_hmm.joblib"
-        model.save(str(path))
+        write_atomic(path, model.save)
 
     def load_hmm(self, symbol: str) -> RegimeDetector:
         path = self.models_dir / f"{symbol}_hmm.joblib"
-        if not path.exists():
-            return None
-        model = RegimeDetector()
-        model.load(str(path))
-        return model
+
+        def load(file_path):
+            model = RegimeDetector()
+            model.load(file_path)
+            return model
+        return self._load((symbol, "hmm", None), path, load)
 
     def save_forecast_model(self, symbol: str, model: ForecastModel, horizon: int):
         path = self.models_dir / f"{symbol}_lgb_{horizon}d.txt"
-        model.save(str(path))
+        write_atomic(path, model.save)
 
     def load_forecast_model(self, symbol: str, horizon: int) -> ForecastModel:
         path = self.models_dir / f"{symbol}_lgb_{horizon}d.txt"
-        if not path.exists():
-            return None
-        model = ForecastModel()
-        model.load(str(path))
-        return model
+
+        def load(file_path):
+            model = ForecastModel()
+            model.load(file_path)
+            return model
+        return self._load((symbol, "lgb", horizon), path, load)
 
     def save_garch(self, symbol: str, model):
         path = self.models_dir / f"{symbol}_garch.joblib"
-        model.save(str(path))
+        write_atomic(path, model.save)
 
     def load_garch(self, symbol: str):
         path = self.models_dir / f"{symbol}_garch.joblib"
-        if not path.exists():
-            return None
-        from .garch_volatility import GarchModel
-        model = GarchModel()
-        model.load(str(path))
-        return model
+
+        def load(file_path):
+            from .garch_volatility import GarchModel
+            model = GarchModel()
+            model.load(file_path)
+            return model
+        return self._load((symbol, "garch", None), path, load)
 
     def save_transformer(self, symbol: str, model):
         import torch
         path = self.models_dir / f"{symbol}_transformer.pt"
-        torch.save(model.model.state_dict(), path)
+        write_atomic(path, lambda file_path: torch.save(model.model.state_dict(), file_path))
 
     def load_transformer(self, symbol: str):
         path = self.models_dir / f"{symbol}_transformer.pt"
-        if not path.exists():
-            return None
-        from .transformer_model import TransformerForecaster
-        model = TransformerForecaster(input_dim=11)
-        import torch
-        model.model.load_state_dict(torch.load(path))
-        return model
+
+        def load(file_path):
+            from .transformer_model import TransformerForecaster
+            import torch
+            model = TransformerForecaster(input_dim=11)
+            model.model.load_state_dict(torch.load(file_path))
+            return model
+        return self._load((symbol, "transformer", None), path, load)
@@ -0,0 +1,112 @@
+import sys
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.core.config import settings
+from src.data.cache import FrameCache
+from src.data.loader import DataLoader
+from src.data.providers import SyntheticProvider
+from src.features.pipeline import FeaturePipeline
+from src.models.hmm import RegimeDetector
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def run_size(size, start_date, workers, fit_sample, latency):
+    """Run the offline pipeline for one universe size and return timings in seconds."""
+    cache_dir = tempfile.mkdtemp(prefix=f"bench_{size}_")
+    try:
+        provider = SyntheticProvider(seed=settings.DATA_SYNTHETIC_SEED, start=start_date, latency=latency)
+        loader = DataLoader(cache_dir, provider=provider)
+        # Private frame cache so sizes do not evict each other
+        loader.cache.memory = FrameCache(settings.DATA_MEMORY_CACHE_MB * 1024 * 1024)
+        symbols = SyntheticProvider.universe(size)
+
+        cold, t_cold = timed(loader.get_many, symbols, max_workers=workers)
+        _, t_warm = timed(loader.get_many, symbols, max_workers=workers)
+        _, t_refresh = timed(loader.get_many, symbols, max_workers=workers, refresh=True)
+        rows = sum(len(r['data']) for r in cold.values())
+        errors = sum(1 for r in cold.values() if r['status'] == "error")
+
+        # Model stages on a fixed sample so larger universes stay tractable
+        sample = symbols[:fit_sample]
+        pipeline = FeaturePipeline()
+        start = time.perf_counter()
+        for sym in sample:
+            pipeline.get_inference_data(cold[sym]['data'])
+        t_features = (time.perf_counter() - start) / max(1, len(sample))
+
+        start = time.perf_counter()
+        for sym in sample:
+            returns = cold[sym]['data']['Close'].pct_change().dropna().tail(settings.MINI_CYCLE_DAYS)
+            hmm = RegimeDetector()
+            hmm.fit(returns)
+        t_hmm = (time.perf_counter() - start) / max(1, len(sample))
+
+        return {
+            "symbols": size,
+            "rows": rows,
+            "errors": errors,
+            "cold_load_s": round(t_cold, 4),
+            "warm_load_s": round(t_warm, 4),
+            "incremental_refresh_s": round(t_refresh, 4),
+            "features_per_symbol_s": round(t_features, 4),
+            "hmm_fit_per_symbol_s": round(t_hmm, 4),
+            "memory_cache": loader.cache.memory.stats()
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+def benchmark(sizes=(10, 500, 5000), start_date="2015-01-01", workers=settings.DATA_FETCH_WORKERS,
+              fit_sample=10, latency=0.0, output=None):
+    """
+    Offline load test of the data + model pipeline on synthetic universes.
+    Set `latency` to emulate upstream round-trip time per request.
+    Results are printed and, if `output` is given, appended as JSON lines
+    so runs can be compared over time to catch scaling regressions.
+    """
+    results = []
+    for size in sizes:
+        print(f"Benchmarking {size} symbols...")
+        result = run_size(size, start_date, workers, fit_sample, latency)
+        result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+        result["workers"] = workers
+        result["latency_s"] = latency
+        results.append(result)
+        print(f"  cold={result['cold_load_s']}s warm={result['warm_load_s']}s "
+              f"refresh={result['incremental_refresh_s']}s rows={result['rows']} errors={result['errors']}")
+
+    if output:
+        with open(output, "a") as f:
+            for result in results:
+                f.write(json.dumps(result) + "\n")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark on synthetic data")
+    parser.add_argument("--sizes", default="10,500,5000")
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--workers", type=int, default=settings.DATA_FETCH_WORKERS)
+    parser.add_argument("--fit-sample", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--output", default="bench_output.txt")
+    args = parser.parse_args()
+
+    benchmark(
+        sizes=[int(s) for s in args.sizes.split(",")],
+        start_date=args.start,
+        workers=args.workers,
+        fit_sample=args.fit_sample,
+        latency=args.latency,
+        output=args.output
+    )
@@ -0,0 +1,31 @@
+import sys
+import os
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.core.config import settings
+from src.data.cache import DataCache
+from src.data.dataset import MarketDataset
+
+def build_dataset(cache_dir=settings.DATA_CACHE_DIR, dataset_dir=settings.DATA_DATASET_DIR):
+    """
+    Rebuild the consolidated symbol/year dataset from the per-symbol cache files.
+    Set DATA_DATASET_ENABLED=true afterwards so refreshes keep it up to date.
+    """
+    cache = DataCache(cache_dir)
+    dataset = MarketDataset(dataset_dir)
+
+    symbols = sorted(p.name[:-len(cache.store.suffix)] for p in Path(cache_dir).glob(f"*{cache.store.suffix}"))
+    print(f"Writing {len(symbols)} symbols to {dataset_dir}...")
+    for symbol in symbols:
+        df = cache.load(symbol, max_age_hours=None)
+        if df is None or df.empty:
+            continue
+        dataset.write(symbol, df)
+        print(f"  {symbol}: {len(df)} rows")
+    print("Dataset build complete!")
+
+if __name__ == "__main__":
+    build_dataset()
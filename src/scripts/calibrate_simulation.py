@@ -9,7 +9,12 @@ from src.models.hmm import RegimeDetector
 from src.models.advanced_simulation import AdvancedSimulator
 from src.core.config import settings
 
-def calibrate(symbol="SPY", days_back=500, horizon=30):
+def calibrate(symbol="SPY", days_back=500, horizon=30, progress=None):
+    """
+    Rolling backtest of P10-P90 coverage. `progress(fraction, message)` is
+    called per test date (the job queue uses it to report and cancel).
+    Returns the summary.
+    """
     print(f"--- Calibrating Advanced Simulation for {symbol} ---")
     
     # 1. Load Data
@@ -17,7 +22,7 @@ def calibrate(symbol="SPY", days_back=500, horizon=30):
     df = loader.get_data(symbol)
     if df.empty:
         print("No data found.")
-        return
+        return {"symbol": symbol, "horizon": horizon, "samples": 0, "coverage": None}
 
     # 2. Setup Backtest
     # We'll do a rolling backtest over the last 'days_back'
@@ -29,7 +34,9 @@ def calibrate(symbol="SPY", days_back=500, horizon=30):
     simulator = AdvancedSimulator()
     hmm = RegimeDetector()
     
-    for date in test_dates:
+    for i, date in enumerate(test_dates):
+        if progress:
+            progress(i / len(test_dates), f"Backtesting {date.date()}")
         # Train on data UP TO this date
         train_df = df[df.index < date]
         if len(train_df) < 500:
@@ -64,7 +71,8 @@ def calibrate(symbol="SPY", days_back=500, horizon=30):
             sims=500
         )
         
-        q = sim_res['quantiles']
+        p10, p50, p90 = np.percentile(sim_res['paths'][:, horizon], [10, 50, 90])
+        q = {'p10': p10, 'p50': p50, 'p90': p90}
         
         # Check coverage
         in_band = q['p10'] <= future_price <= q['p90']
@@ -83,6 +91,9 @@ def calibrate(symbol="SPY", days_back=500, horizon=30):
 
     # Summary
     df_res = pd.DataFrame(results)
+    if df_res.empty:
+        print("Not enough history to backtest.")
+        return {"symbol": symbol, "horizon": horizon, "samples": 0, "coverage": None}
     coverage = df_res['in_band'].mean()
     print("\n--- Calibration Results ---")
     print(f"Horizon: {horizon} days")
@@ -96,5 +107,7 @@ def calibrate(symbol="SPY", days_back=500, horizon=30):
     else:
         print("SUCCESS: Model is well-calibrated.")
 
+    return {"symbol": symbol, "horizon": horizon, "samples": len(df_res), "coverage": float(coverage)}
+
 if __name__ == "__main__":
     calibrate()
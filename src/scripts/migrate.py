@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.core.config import settings
+from src.core.database import Database
+from src.core.mongo import ensure_indexes
+
+def migrate():
+    """
+    One-time schema step: create the collection indexes (MongoDB or the
+    embedded SQLite store) and the SQLite forecasts schema.
+    The API also runs this at startup, so it only needs to be called by hand
+    after deploying to a fresh database or to check for index build failures.
+    """
+    for collection, names in ensure_indexes().items():
+        print(f"  {collection}: {', '.join(names) or 'no indexes'}")
+    if not settings.DATABASE_URL.startswith("mongodb"):
+        Database()
+        print(f"  SQLite schema ready at {settings.DATABASE_URL}")
+    print("Migration complete!")
+
+if __name__ == "__main__":
+    migrate()
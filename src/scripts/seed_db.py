@@ -8,7 +8,7 @@ import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
 
 from src.core.config import settings
-from src.core.database import Database
+from src.core.database import Database, ForecastWriter
 from src.data.loader import DataLoader
 from src.features.pipeline import FeaturePipeline
 from src.models.registry import ModelRegistry
@@ -16,7 +16,11 @@ from src.models.ensemble import EnsembleModel
 from src.models.kalman_filter import KalmanTrend
 from src.models.lightgbm_forecaster import ForecastModel
 
-def seed_database(days_back=7, symbols=None):
+def seed_database(days_back=7, symbols=None, progress=None):
+    """
+    Backfill forecasts for the last `days_back` business days.
+    `progress(fraction, message)` is called per symbol; returns the row count.
+    """
     print(f"Starting database seed for last {days_back} days...")
     
     if symbols is None:
@@ -43,11 +47,19 @@ def seed_database(days_back=7, symbols=None):
     # Generate list of business days
     date_range = pd.bdate_range(start=start_date, end=end_date)
 
-    for symbol in symbols:
+    # Fetch full history for all symbols up front (concurrent, rate limited)
+    batch = loader.get_many(symbols)
+
+    # Forecasts are written in batches instead of one round-trip per row
+    writer = ForecastWriter(db)
+
+    for i, symbol in enumerate(symbols):
         print(f"Processing {symbol}...")
+        if progress:
+            # Outside the per-symbol try: a cancellation must stop the loop
+            progress(i / len(symbols), f"Processing {symbol}")
         try:
-            # Fetch full history
-            df_full = loader.get_data(symbol)
+            df_full = batch[symbol]['data']
             if df_full.empty:
                 print(f"No data for {symbol}")
                 continue
@@ -135,7 +147,7 @@ def seed_database(days_back=7, symbols=None):
                     target_date = (current_ts + timedelta(days=h)).date()
                     
                     # Save
-                    db.save_forecast(
+                    writer.add(
                         date=current_date_str,
                         symbol=symbol,
                         horizon=h,
@@ -147,7 +159,9 @@ def seed_database(days_back=7, symbols=None):
         except Exception as e:
             print(f"Error seeding {symbol}: {e}")
 
-    print("Database seeding complete!")
+    writer.close()
+    print(f"Database seeding complete! ({writer.written} forecasts written)")
+    return {"symbols": len(symbols), "days_back": days_back, "written": writer.written}
 
 if __name__ == "__main__":
     seed_database()
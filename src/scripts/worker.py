@@ -0,0 +1,28 @@
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../../")))
+
+from src.core.config import settings
+from src.core.jobs import JobQueue, JobWorkers, job_kinds
+import src.services.jobs  # noqa: F401 (registers the job handlers)
+
+def run_worker(workers: int = max(settings.JOB_WORKERS, 1)):
+    """
+    Run background jobs in a separate process, so heavy simulations never
+    compete with the API for CPU. The API leaves all jobs to this process
+    unless its own JOB_WORKERS is set; both must use the same JOBS_DB_PATH.
+    """
+    pool = JobWorkers(JobQueue(), workers=workers).start()
+    print(f"Job worker running ({workers} threads, kinds: {', '.join(job_kinds())})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping job worker...")
+        pool.stop()
+
+if __name__ == "__main__":
+    run_worker(int(sys.argv[1]) if len(sys.argv) > 1 else max(settings.JOB_WORKERS, 1))
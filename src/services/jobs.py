@@ -0,0 +1,100 @@
+from datetime import datetime
+from typing import Any, Dict
+import numpy as np
+from src.core.config import settings
+from src.core.jobs import JobContext, job_handler
+from src.services.logic import (SIMULATION_SIMS, analyze_quantiles, fit_regime_detector,
+                                fit_regime_params)
+
+# Handlers for the background job queue (src/core/jobs.py). Each takes the
+# job context and its JSON params and returns a JSON-serializable result.
+
+DEFAULT_HORIZONS = [10, 30, 100, 365, 547, 730]
+SIMULATION_BATCH = 1000
+
+@job_handler("simulation")
+def simulation_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Regime-switching simulation with more paths or longer horizons than the
+    interactive endpoint. Params: symbol, date (default today), horizons,
+    sims (up to JOB_MAX_SIMS), seed. Paths are simulated in batches so the
+    job reports progress and can be cancelled between batches.
+    """
+    from src.data.loader import DataLoader
+    from src.models.advanced_simulation import AdvancedSimulator
+
+    symbol = str(params["symbol"]).upper()
+    date = params.get("date") or datetime.now().strftime("%Y-%m-%d")
+    horizons = sorted({int(h) for h in params.get("horizons", DEFAULT_HORIZONS)})
+    sims = int(params.get("sims", SIMULATION_SIMS))
+    seed = params.get("seed")
+    if not 0 < sims <= settings.JOB_MAX_SIMS:
+        raise ValueError(f"sims must be between 1 and {settings.JOB_MAX_SIMS}")
+    if not horizons or horizons[0] < 1:
+        raise ValueError("horizons must be positive")
+
+    ctx.progress(0.0, "Loading data")
+    df = DataLoader(settings.DATA_CACHE_DIR).get_data(symbol)
+    df = df[df.index <= date]
+    if df.empty:
+        raise ValueError(f"No data for {symbol} on {date}")
+    returns = df['Close'].pct_change().dropna()
+    current_price = float(df['Close'].iloc[-1])
+
+    ctx.progress(0.05, "Fitting models")
+    simulator = AdvancedSimulator()
+    hmm = fit_regime_detector(symbol, returns)
+    regimes = hmm.predict(returns)
+    current_regime = int(regimes[-1])
+    regime_params = fit_regime_params(symbol, simulator, returns, regimes)
+
+    days = horizons[-1]
+    paths = np.empty((sims, days + 1), dtype=np.float32)
+    for start in range(0, sims, SIMULATION_BATCH):
+        n = min(SIMULATION_BATCH, sims - start)
+        paths[start:start + n] = simulator.simulate_paths(
+            start_price=current_price,
+            start_regime=current_regime,
+            params=regime_params,
+            transmat=hmm.model.transmat_,
+            days=days,
+            sims=n,
+            seed=None if seed is None else int(seed) + start
+        )['paths']
+        ctx.progress(0.1 + 0.85 * (start + n) / sims, f"Simulated {start + n}/{sims} paths")
+
+    quantiles = {}
+    for h in horizons:
+        p10, p50, p90 = np.percentile(paths[:, h], [10, 50, 90])
+        quantiles[h] = {"p10": float(p10), "p50": float(p50), "p90": float(p90)}
+    fan = simulator.fan_chart(paths)
+    return {
+        "symbol": symbol,
+        "date": date,
+        "sims": sims,
+        "days": days,
+        "current_price": current_price,
+        "regime": hmm.get_regime_label(current_regime),
+        "regime_id": current_regime,
+        "quantiles": quantiles,
+        "analysis": analyze_quantiles(quantiles, current_price),
+        "bands": {"levels": fan['levels'], "values": fan['bands'].tolist()}
+    }
+
+@job_handler("calibration")
+def calibration_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Rolling P10-P90 coverage backtest (see src/scripts/calibrate_simulation.py)."""
+    from src.scripts.calibrate_simulation import calibrate
+    return calibrate(symbol=str(params.get("symbol", "SPY")).upper(),
+                     days_back=int(params.get("days_back", 500)),
+                     horizon=int(params.get("horizon", 30)),
+                     progress=ctx.progress)
+
+@job_handler("backfill")
+def backfill_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Historical forecasts for the last `days_back` days (see src/scripts/seed_db.py)."""
+    from src.scripts.seed_db import seed_database
+    symbols = params.get("symbols")
+    return seed_database(days_back=int(params.get("days_back", 7)),
+                         symbols=[str(s).upper() for s in symbols] if symbols else None,
+                         progress=ctx.progress)
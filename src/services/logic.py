@@ -1,35 +1,154 @@
-from datetime import datetime
-from typing import List, Dict, Any
+import asyncio
+import concurrent.futures
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Hashable, List, Dict, Any, Optional
 import pandas as pd
 import numpy as np
-from src.core.repository import MarketRepository, SimulationRepository, WishlistRepository
-from src.core.models import MarketOverview, SimulationRun, WishlistItem
+from src.core.repository import MarketRepository, SimulationRepository, WishlistRepository, ChartRepository
+from src.core.models import MarketOverview, SimulationRun, SimulationChart, WishlistItem
 from src.data.loader import DataLoader
 from src.core.config import settings
+from src.core.singleflight import SingleFlight
+from src.core.freshness import freshness
 
 from src.models.hmm import RegimeDetector
 
-def needs_refresh(last_update: datetime) -> bool:
+# Overview computations (data load + HMM fit) fan out on a bounded pool;
+# work that outlives a request keeps running and is saved for the next one
+_overview_executor = ThreadPoolExecutor(max_workers=settings.OVERVIEW_WORKERS, thread_name_prefix="overview")
+
+# Stale results are served immediately and recomputed here, off the request path
+_refresh_executor = ThreadPoolExecutor(max_workers=settings.REFRESH_WORKERS, thread_name_prefix="refresh")
+_refreshing: set = set()
+_refreshing_lock = threading.Lock()
+
+# One simulation per symbol/date serves every horizon and the fan chart,
+# which covers at least two years of simulated days
+CHART_DAYS = 730
+SIMULATION_SIMS = 1000
+
+# Concurrent requests for the same symbol/date share one computation
+overview_flight = SingleFlight("overview")
+simulation_flight = SingleFlight("simulation")
+model_flight = SingleFlight("model_fit")
+
+def _returns_key(returns: pd.Series) -> tuple:
+    """Identify a returns series by its span, so equal inputs share one fit."""
+    if returns.empty:
+        return (0,)
+    return (len(returns), str(returns.index[0]), str(returns.index[-1]), float(returns.iloc[-1]))
+
+def fit_regime_detector(symbol: str, returns: pd.Series) -> RegimeDetector:
+    """Fit the HMM for a symbol; concurrent fits on the same data are coalesced."""
+    def fit():
+        hmm = RegimeDetector()
+        hmm.fit(returns)
+        return hmm
+    return model_flight.do(("hmm", symbol) + _returns_key(returns), fit)
+
+def fit_regime_params(symbol: str, simulator, returns: pd.Series, regimes: np.ndarray) -> Dict:
+    """Fit per-regime GARCH params; concurrent fits on the same data are coalesced."""
+    return model_flight.do(("garch", symbol) + _returns_key(returns),
+                           simulator.fit_regime_params, returns, regimes)
+
+def needs_refresh(last_update: datetime, symbol: Optional[str] = None) -> bool:
     """
-    Check if data needs refresh based on 10am, 12pm, 2pm, 4pm checkpoints.
+    Check if a stored result is older than the last market data change
+    (intraday checkpoints while the session is open, the daily close,
+    holidays and weekends come from the shared freshness policy).
     """
-    if not last_update:
-        return True
+    return not freshness.result_is_fresh(last_update, symbol)
+
+def is_stale(created_at: datetime, symbol: str, date: str) -> bool:
+    """Stored results for today are recomputed once market data has moved on; past dates never change."""
+    return date == datetime.now().strftime("%Y-%m-%d") and needs_refresh(created_at, symbol)
+
+FRESH, STALE, EXPIRED = "fresh", "stale", "expired"
+
+def result_state(created_at: datetime, symbol: str, date: str) -> str:
+    """
+    FRESH results are served as is. STALE ones are served while a background
+    refresh runs; past RESULT_MAX_STALENESS_MINUTES they are EXPIRED and the
+    request recomputes them.
+    """
+    if not is_stale(created_at, symbol, date):
+        return FRESH
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    age = datetime.now(timezone.utc) - created_at
+    if age > timedelta(minutes=settings.RESULT_MAX_STALENESS_MINUTES):
+        return EXPIRED
+    return STALE
+
+def revalidate(key: Hashable, fn: Callable[..., Any], *args) -> bool:
+    """
+    Run `fn(*args)` on the refresh pool unless a refresh for `key` is already
+    queued or running. Returns whether a refresh was started.
+    """
+    with _refreshing_lock:
+        if key in _refreshing:
+            return False
+        _refreshing.add(key)
+
+    def run():
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Warning: background refresh of {key} failed: {e}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    _refresh_executor.submit(run)
+    return True
+
+def _resolve_later(loop: asyncio.AbstractEventLoop, waiter: asyncio.Future, fn: Callable[[], None]):
+    # From a pool thread; a loop that has closed meanwhile has nobody waiting
+    def resolve():
+        if not waiter.done():
+            fn()
+    try:
+        loop.call_soon_threadsafe(resolve)
+    except RuntimeError:
+        pass
+
+def _await_pool(loop: asyncio.AbstractEventLoop, work: concurrent.futures.Future) -> asyncio.Future:
+    """
+    Awaitable result of pool work. Unlike run_in_executor, cancelling the
+    awaitable (a timeout, a deadline, a client that went away) leaves the
+    work queued or running, so its result is still saved.
+    """
+    waiter = loop.create_future()
+    def copy(done: concurrent.futures.Future):
+        error = done.exception()
+        if error is not None:
+            _resolve_later(loop, waiter, lambda: waiter.set_exception(error))
+        else:
+            _resolve_later(loop, waiter, lambda: waiter.set_result(done.result()))
+    work.add_done_callback(copy)
+    return waiter
+
+def analyze_quantiles(quantiles: Dict[int, Dict[str, float]], current_price: float) -> Dict[int, Dict[str, Any]]:
+    """Upside/downside and a risk label per horizon from the P10/P90 prices."""
+    analysis = {}
+    for h, q in quantiles.items():
+        upside = (q['p90'] / current_price - 1) * 100
+        downside = (q['p10'] / current_price - 1) * 100
         
-    now = datetime.now()
-    # If different day, definitely refresh
-    if last_update.date() < now.date():
-        return True
-    
-    # Intraday checkpoints
-    checkpoints = [10, 12, 14, 16]
-    for cp in checkpoints:
-        cp_time = now.replace(hour=cp, minute=0, second=0, microsecond=0)
-        # If we passed a checkpoint that the last update didn't cover
-        if now >= cp_time and last_update < cp_time:
-            return True
-            
-    return False
+        risk_label = "Moderate"
+        if downside < -20 and h <= 30: risk_label = "High Crash Risk"
+        elif downside < -40: risk_label = "High Risk"
+        elif upside > 50 and downside > -10: risk_label = "Bullish Skew"
+        
+        analysis[h] = {
+            "risk_label": risk_label,
+            "upside_pct": upside,
+            "downside_pct": downside,
+            "interpretation": f"P90: +{upside:.1f}%, P10: {downside:.1f}% ({risk_label})"
+        }
+    return analysis
 
 class MarketService:
     def __init__(self):
@@ -41,30 +160,159 @@ class MarketService:
         self.loader = DataLoader(settings.DATA_CACHE_DIR)
 
     def get_overview(self, symbol: str, date: str) -> MarketOverview:
-        # 1. Try DB
-        existing = None
+        return overview_flight.do((symbol, date), self._get_overview, symbol, date)
+
+    def get_overviews(self, symbols: List[str], date: str) -> Dict[str, MarketOverview]:
+        """
+        Overviews for many symbols on one date. Stored overviews come from a
+        single batched query; only missing or stale ones are computed.
+        Symbols that fail are logged and left out.
+        """
+        stored = {}
+        if self.repo:
+            try:
+                stored = self.repo.find_by_symbols_date(symbols, date)
+            except Exception as e:
+                print(f"Warning: DB batch fetch failed: {e}")
+
+        overviews = {}
+        for symbol in symbols:
+            existing = stored.get(symbol)
+            state = result_state(existing.created_at, symbol, date) if existing else None
+            if state == FRESH:
+                overviews[symbol] = existing
+                continue
+            if state == STALE:
+                overviews[symbol] = self._serve_stale(symbol, date, existing)
+                continue
+            try:
+                overviews[symbol] = overview_flight.do((symbol, date), self._get_overview, symbol, date,
+                                                       existing, False)
+            except Exception as e:
+                print(f"Error for {symbol}: {e}")
+        return overviews
+
+    async def aget_overviews(self, symbols: List[str], date: str,
+                             symbol_timeout: float = settings.OVERVIEW_SYMBOL_TIMEOUT,
+                             deadline: float = settings.OVERVIEW_DEADLINE) -> Dict[str, Dict[str, Any]]:
+        """
+        Concurrent variant of `get_overviews` for async endpoints. Returns, in
+        `symbols` order, {symbol: {"overview": MarketOverview or None, "status": ..., "error": ...}}
+        (see `astream_overviews` for the statuses).
+        """
+        results = {symbol: result async for symbol, result in
+                   self.astream_overviews(symbols, date, symbol_timeout, deadline)}
+        return {symbol: results[symbol] for symbol in dict.fromkeys(symbols)}
+
+    async def astream_overviews(self, symbols: List[str], date: str,
+                                symbol_timeout: float = settings.OVERVIEW_SYMBOL_TIMEOUT,
+                                deadline: float = settings.OVERVIEW_DEADLINE):
+        """
+        Yield (symbol, result) as each overview becomes available: stored ones
+        first (one batched query), then computed ones in completion order.
+        Missing or stale symbols are computed in parallel on the overview pool.
+        Status is "cached", "stale" (stored, refreshing in the background),
+        "computed", "error", "timeout" (running longer than `symbol_timeout`;
+        time queued for a pool thread does not count) or "pending" (unfinished
+        at the global `deadline`). Timed-out and pending computations, and
+        those left when the consumer stops early, still run on the pool and
+        are saved, so a later request finds them stored.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        stored = {}
         if self.repo:
+            try:
+                stored = await asyncio.to_thread(self.repo.find_by_symbols_date, symbols, date)
+            except Exception as e:
+                print(f"Warning: DB batch fetch failed: {e}")
+
+        async def compute(symbol: str, existing: Optional[MarketOverview]):
+            began = loop.create_future()
+            def run():
+                _resolve_later(loop, began, lambda: began.set_result(None))
+                return overview_flight.do((symbol, date), self._get_overview, symbol, date, existing, False)
+            result = _await_pool(loop, _overview_executor.submit(run))
+            try:
+                # The symbol's timeout starts when a pool thread picks it up
+                await asyncio.wait({began, result}, return_when=asyncio.FIRST_COMPLETED)
+                overview = await asyncio.wait_for(result, symbol_timeout)
+                return symbol, {"overview": overview, "status": "computed", "error": None}
+            except asyncio.TimeoutError:
+                return symbol, {"overview": None, "status": "timeout", "error": f"Timed out after {symbol_timeout}s"}
+            except Exception as e:
+                print(f"Error for {symbol}: {e}")
+                return symbol, {"overview": None, "status": "error", "error": str(e)}
+
+        cached = []
+        tasks = {}
+        for symbol in dict.fromkeys(symbols):
+            existing = stored.get(symbol)
+            state = result_state(existing.created_at, symbol, date) if existing else None
+            if state == FRESH:
+                cached.append((symbol, existing, "cached"))
+            elif state == STALE:
+                cached.append((symbol, self._serve_stale(symbol, date, existing), "stale"))
+            else:
+                # Start computing before anything is yielded
+                tasks[symbol] = asyncio.ensure_future(compute(symbol, existing))
+
+        try:
+            for symbol, overview, status in cached:
+                yield symbol, {"overview": overview, "status": status, "error": None}
+
+            emitted = set()
+            remaining = deadline - (loop.time() - started)
+            if tasks and remaining > 0:
+                try:
+                    for next_done in asyncio.as_completed(list(tasks.values()), timeout=remaining):
+                        symbol, result = await next_done
+                        emitted.add(symbol)
+                        yield symbol, result
+                except asyncio.TimeoutError:
+                    pass
+            for symbol, task in tasks.items():
+                if symbol in emitted:
+                    continue
+                if task.done() and not task.cancelled():
+                    yield task.result()
+                else:
+                    yield symbol, {"overview": None, "status": "pending", "error": f"Not ready within {deadline}s"}
+        finally:
+            # Stop waiting (also when the consumer goes away); submitted work
+            # is not cancelled with the waiters, so the pool computes and saves it
+            for task in tasks.values():
+                task.cancel()
+
+    def _serve_stale(self, symbol: str, date: str, existing: MarketOverview) -> MarketOverview:
+        """Serve a stale overview now and refresh the stored one in the background."""
+        # Not through overview_flight: the request that found the stale overview
+        # may still hold that key and would hand back the stale result
+        revalidate(("overview", symbol, date), self._get_overview, symbol, date, None, True, True)
+        return existing.model_copy(update={"stale": True})
+
+    def _get_overview(self, symbol: str, date: str, existing: Optional[MarketOverview] = None,
+                      lookup: bool = True, revalidating: bool = False) -> MarketOverview:
+        # 1. Try DB (skipped when the caller already looked it up)
+        if lookup and self.repo:
             try:
                 existing = self.repo.find_by_date(symbol, date)
             except Exception as e:
                 print(f"Warning: DB fetch failed for {symbol}: {e}")
 
-        # Check Freshness
-        force_refresh = False
+        # Check Freshness: stale overviews are served while a background
+        # refresh runs; expired ones (and the refresh itself) recompute here
         if existing:
-            if needs_refresh(existing.created_at):
-                if date == datetime.now().strftime("%Y-%m-%d"):
-                    force_refresh = True
-                    print(f"Refreshing stale data for {symbol} (Last update: {existing.created_at})")
-        
-        if existing and not force_refresh:
-            return existing
+            state = result_state(existing.created_at, symbol, date)
+            if state == FRESH:
+                return existing
+            if state == STALE and not revalidating:
+                return self._serve_stale(symbol, date, existing)
+            print(f"Refreshing stale data for {symbol} (Last update: {existing.created_at})")
 
         # 2. Compute
-        use_cache = not force_refresh
-        
-        # Load data up to date
-        df = self.loader.get_data(symbol, use_cache=use_cache)
+        # Load data up to date (the loader refreshes it if it is stale)
+        df = self.loader.get_data(symbol)
         if df.empty:
             raise ValueError(f"No data for {symbol}")
         
@@ -78,8 +326,7 @@ class MarketService:
         volatility = float(returns.std() * np.sqrt(252))
 
         # Regime
-        hmm = RegimeDetector()
-        hmm.fit(returns)
+        hmm = fit_regime_detector(symbol, returns)
         regime_idx = int(hmm.predict(returns)[-1])
         regime_label = hmm.get_regime_label(regime_idx)
 
@@ -95,11 +342,11 @@ class MarketService:
             forecast_long={}
         )
         
-        # 3. Save
+        # 3. Save (a refreshed overview replaces the stored one in place)
         if self.repo:
             try:
-                if existing and force_refresh:
-                    self.repo.delete({"_id": existing.id})
+                if existing:
+                    return self.repo.replace({"symbol": symbol, "date": date}, overview)
                 return self.repo.create(overview)
             except Exception as e:
                 print(f"Warning: DB save failed for {symbol}: {e}")
@@ -128,10 +375,12 @@ class SimulationService:
         try:
             self.repo = SimulationRepository()
             self.market_repo = MarketRepository()
+            self.chart_repo = ChartRepository()
         except Exception as e:
             print(f"Warning: SimulationRepository init failed: {e}")
             self.repo = None
             self.market_repo = None
+            self.chart_repo = None
             
         self.loader = DataLoader(settings.DATA_CACHE_DIR)
         self.simulator = None
@@ -142,94 +391,156 @@ class SimulationService:
             self.simulator = AdvancedSimulator()
         return self.simulator
 
-    def run_simulation(self, symbol: str, date: str, horizons: List[int] = [10, 30, 100, 365, 547, 730]) -> Dict[str, Any]:
-        check_run = None
+    def run_simulation(self, symbol: str, date: str, horizons: List[int] = [10, 30, 100, 365, 547, 730],
+                       conservative: bool = False) -> Dict[str, Any]:
+        """
+        Quantiles per horizon and the fan chart for one symbol/date. Quantiles
+        always come from the baseline model; `conservative` selects the fan
+        chart simulated with damped jumps and a tighter daily cap.
+        """
+        return simulation_flight.do((symbol, date, tuple(horizons), conservative),
+                                    self._run_simulation, symbol, date, horizons, conservative)
+
+    def _run_simulation(self, symbol: str, date: str, horizons: List[int], conservative: bool = False,
+                        revalidating: bool = False) -> Dict[str, Any]:
+        # All stored horizons in one round-trip, plus the stored fan chart
+        stored = {}
+        chart = None
         if self.repo:
             try:
-                check_run = self.repo.find_run(symbol, date, horizons[0])
+                stored = self.repo.find_runs(symbol, date, horizons)
+                chart = self.chart_repo.find_chart(symbol, date, conservative)
             except Exception as e:
-                print(f"Warning: DB find_run failed: {e}")
+                print(f"Warning: DB find_runs failed: {e}")
 
         force_refresh = False
-        if check_run:
-            if needs_refresh(check_run.created_at):
-                if date == datetime.now().strftime("%Y-%m-%d"):
-                    force_refresh = True
-                    print(f"Refreshing stale simulation for {symbol}")
+        complete = chart is not None and all(h in stored for h in horizons)
+        if stored or chart:
+            # The oldest of the runs and the chart decides
+            docs = list(stored.values()) + ([chart] if chart else [])
+            state = result_state(min(doc.created_at for doc in docs), symbol, date)
+            if state == STALE and complete and not revalidating:
+                # Serve what is stored; the refresh runs in the background
+                revalidate(("simulation", symbol, date, tuple(horizons), conservative),
+                           self._run_simulation, symbol, date, horizons, conservative, True)
+                return self._result(symbol, date, [stored[h] for h in horizons], chart, stale=True)
+            if state != FRESH:
+                force_refresh = True
+                print(f"Refreshing stale simulation for {symbol}")
         
-        if force_refresh and self.repo:
-            try:
-                self.repo.delete_many({"symbol": symbol, "date": date})
-                self.loader.get_data(symbol, use_cache=False)
-            except Exception as e:
-                print(f"Warning: DB delete failed: {e}")
+        if force_refresh:
+            # Recompute everything; stored documents are replaced, not deleted,
+            # so concurrent readers keep seeing the previous version meanwhile
+            stored = {}
+            chart = None
+
+        if chart and all(h in stored for h in horizons):
+            # Everything is stored: no data load, model fit or simulation needed
+            return self._result(symbol, date, [stored[h] for h in horizons], chart)
 
-        runs = []
-        
         # Load data once
         df = self.loader.get_data(symbol)
         df = df[df.index <= date]
         returns = df['Close'].pct_change().dropna()
         current_price = float(df['Close'].iloc[-1])
 
-        # Fit Models
-        hmm = RegimeDetector()
-        hmm.fit(returns)
+        # Fit Models once
+        hmm = fit_regime_detector(symbol, returns)
         regimes = hmm.predict(returns)
         current_regime = int(regimes[-1])
         regime_label = hmm.get_regime_label(current_regime)
         transmat = hmm.model.transmat_
-        params = self._get_simulator().fit_regime_params(returns, regimes)
+        params = fit_regime_params(symbol, self._get_simulator(), returns, regimes)
 
-        for h in horizons:
-            existing = None
-            if self.repo and not force_refresh:
-                try:
-                    existing = self.repo.find_run(symbol, date, h)
-                except:
-                    pass
-            
-            if existing:
-                runs.append(existing)
-                continue
+        # One simulation long enough for every horizon and the fan chart
+        # (a second one only for a conservative chart next to missing runs)
+        days = max(CHART_DAYS, max(horizons))
+        simulator = self._get_simulator()
 
-            # Compute
-            sim_res = self._get_simulator().simulate_paths(
+        def simulate(conservative_tails: bool) -> np.ndarray:
+            return simulator.simulate_paths(
                 start_price=current_price,
                 start_regime=current_regime,
                 params=params,
                 transmat=transmat,
-                days=h,
-                sims=1000
-            )
-            
-            q = sim_res['quantiles'][h]
-            
-            run = SimulationRun(
+                days=days,
+                sims=SIMULATION_SIMS,
+                conservative=conservative_tails
+            )['paths']
+
+        missing_runs = any(h not in stored for h in horizons)
+        paths = simulate(False) if missing_runs or (chart is None and not conservative) else None
+
+        new_runs = []
+        for h in horizons:
+            if h in stored:
+                continue
+            p10, p50, p90 = np.percentile(paths[:, h], [10, 50, 90])
+            new_runs.append(SimulationRun(
                 symbol=symbol,
                 date=date,
                 horizon=h,
                 ml_forecast=0.0, 
-                p10=q['p10'],
-                p50=q['p50'],
-                p90=q['p90'],
+                p10=float(p10),
+                p50=float(p50),
+                p90=float(p90),
                 regime=regime_label,
                 model_snapshot={"regime_id": current_regime}
+            ))
+
+        # New runs are saved in one round-trip as well
+        if self.repo and new_runs:
+            try:
+                if force_refresh:
+                    for run in new_runs:
+                        self.repo.replace({"symbol": symbol, "date": date, "horizon": run.horizon}, run)
+                else:
+                    self.repo.create_many(new_runs)
+            except Exception as e:
+                print(f"Warning: DB save run failed: {e}")
+
+        if chart is None:
+            fan = simulator.fan_chart(simulate(True) if conservative else paths)
+            chart = SimulationChart.from_arrays(
+                fan['bands'], fan['paths'],
+                symbol=symbol,
+                date=date,
+                conservative=conservative,
+                days=days,
+                sims=SIMULATION_SIMS,
+                start_price=current_price,
+                regime_id=current_regime,
+                regime=regime_label,
+                levels=fan['levels']
             )
-            
-            if self.repo:
+            if self.chart_repo:
                 try:
-                    saved_run = self.repo.create(run)
-                    runs.append(saved_run)
+                    if force_refresh:
+                        self.chart_repo.replace(self.chart_repo.key(symbol, date, conservative), chart)
+                    else:
+                        self.chart_repo.create(chart)
                 except Exception as e:
-                    print(f"Warning: DB save run failed: {e}")
-                    runs.append(run)
-            else:
-                runs.append(run)
+                    print(f"Warning: DB save chart failed: {e}")
+
+        computed = {run.horizon: run for run in new_runs}
+        return self._result(symbol, date, [stored.get(h) or computed[h] for h in horizons], chart)
 
+    def _result(self, symbol: str, date: str, runs: List[SimulationRun], chart: SimulationChart,
+                stale: bool = False) -> Dict[str, Any]:
+        """
+        Everything the simulation endpoint serves, from stored or freshly computed
+        runs. `stale` marks stored results served while a refresh runs.
+        """
+        quantiles = {run.horizon: {"p10": run.p10, "p50": run.p50, "p90": run.p90} for run in runs}
         return {
             "symbol": symbol,
             "date": date,
-            "regime": regime_label,
-            "runs": [run.model_dump() for run in runs]
+            "regime": chart.regime,
+            "regime_id": chart.regime_id,
+            "current_price": chart.start_price,
+            "runs": [run.model_dump() for run in runs],
+            "quantiles": quantiles,
+            "analysis": analyze_quantiles(quantiles, chart.start_price),
+            "chart": chart.model_dump(),
+            "stale": stale
         }
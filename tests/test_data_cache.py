@@ -0,0 +1,87 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.cache import DataCache, FrameCache
+
+def make_frame(periods=100):
+    dates = pd.date_range(start='2024-01-01', periods=periods)
+    return pd.DataFrame({
+        'Open': np.random.rand(periods) * 100,
+        'High': np.random.rand(periods) * 100,
+        'Low': np.random.rand(periods) * 100,
+        'Close': np.random.rand(periods) * 100,
+        'Volume': np.random.randint(1000, 10000, periods)
+    }, index=dates)
+
+def test_memory_cache_hits_and_invalidation(tmp_path):
+    memory = FrameCache(max_bytes=10 * 1024 * 1024)
+    cache = DataCache(str(tmp_path), memory_cache=memory)
+    cache.save("SPY", make_frame())
+
+    first = cache.load("SPY")
+    second = cache.load("SPY")
+    assert first is second
+    assert memory.stats()["hits"] == 1
+    assert memory.stats()["misses"] == 1
+
+    # Shared frames are read-only
+    with pytest.raises(ValueError):
+        first['Close'].values[0] = 0.0
+
+    # Rewriting the file invalidates the entry
+    cache.save("SPY", make_frame(120))
+    third = cache.load("SPY")
+    assert third is not first
+    assert len(third) == 120
+
+def test_memory_cache_detects_external_rewrite(tmp_path):
+    memory = FrameCache(max_bytes=10 * 1024 * 1024)
+    cache = DataCache(str(tmp_path), memory_cache=memory)
+    cache.save("QQQ", make_frame())
+    cache.load("QQQ")
+
+    # Another process replaces the file behind our back
+    path = tmp_path / "QQQ.parquet"
+    make_frame(150).to_parquet(path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert len(cache.load("QQQ")) == 150
+
+def test_memory_cache_evicts_least_recently_used():
+    frame = make_frame()
+    nbytes = int(frame.memory_usage(index=True).sum())
+    memory = FrameCache(max_bytes=int(nbytes * 2.5))
+
+    memory.put("a", (1, 1), make_frame())
+    memory.put("b", (1, 1), make_frame())
+    assert memory.get("a", (1, 1)) is not None
+    memory.put("c", (1, 1), make_frame())
+
+    assert memory.get("b", (1, 1)) is None
+    assert memory.get("a", (1, 1)) is not None
+    assert memory.stats()["evictions"] == 1
+
+def test_arrow_backend_roundtrip_is_zero_copy(tmp_path):
+    memory = FrameCache(max_bytes=10 * 1024 * 1024)
+    cache = DataCache(str(tmp_path), memory_cache=memory, backend="arrow")
+    frame = make_frame()
+    cache.save("SPY", frame)
+
+    assert (tmp_path / "SPY.arrow").exists()
+    loaded = cache.load("SPY")
+    pd.testing.assert_frame_equal(loaded, frame, check_freq=False)
+    # Columns are views into the memory-mapped file, not private copies
+    close = loaded['Close'].to_numpy()
+    assert not close.flags.owndata
+    assert not close.flags.writeable
+
+def test_arrow_backend_migrates_parquet_cache(tmp_path):
+    memory = FrameCache(max_bytes=10 * 1024 * 1024)
+    DataCache(str(tmp_path), memory_cache=memory).save("IWM", make_frame())
+
+    cache = DataCache(str(tmp_path), memory_cache=memory, backend="arrow")
+    loaded = cache.load("IWM")
+    assert len(loaded) == 100
+    assert (tmp_path / "IWM.arrow").exists()
@@ -0,0 +1,135 @@
+import threading
+import time
+import pandas as pd
+import numpy as np
+from src.data.loader import DataLoader
+from src.data.providers import DataProvider, RateLimiter
+
+def make_bars(start, periods, base=100.0):
+    dates = pd.bdate_range(start=start, periods=periods)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(periods, 1000)
+    }, index=dates)
+
+class FakeProvider(DataProvider):
+    name = "fake"
+
+    def __init__(self, bars: pd.DataFrame):
+        self.bars = bars
+        self.calls = []
+
+    def fetch(self, symbol, start=None, end=None):
+        self.calls.append((symbol, start, end))
+        df = self.bars
+        if start:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end:
+            df = df[df.index < pd.Timestamp(end)]
+        return df.copy()
+
+def test_refresh_full_then_incremental(tmp_path):
+    bars = make_bars("2024-01-01", 300)
+    provider = FakeProvider(bars.iloc[:290])
+    loader = DataLoader(str(tmp_path), provider=provider)
+
+    first = loader.refresh("SPY")
+    assert first['mode'] == "full"
+    assert first['fetched'] == 290
+    assert first['reused'] == 0
+
+    # Ten new bars plus a revision of the last cached bar
+    revised = bars.copy()
+    revised.loc[revised.index[289], 'Close'] = -1.0
+    provider.bars = revised
+
+    second = loader.refresh("SPY", overlap_days=3)
+    assert second['mode'] == "incremental"
+    assert second['fetched'] < 20
+    assert second['reused'] + second['fetched'] == 300
+    assert len(second['data']) == 300
+    assert second['data'].index.is_unique
+    assert second['data']['Close'].iloc[289] == -1.0
+
+    # The incremental request only asked for the tail of the history
+    _, start, _ = provider.calls[-1]
+    assert pd.Timestamp(start) >= bars.index[280]
+
+    cached = loader.cache.load("SPY")
+    assert len(cached) == 300
+
+def test_refresh_without_new_bars_keeps_cache(tmp_path):
+    bars = make_bars("2024-01-01", 50)
+    provider = FakeProvider(bars)
+    loader = DataLoader(str(tmp_path), provider=provider)
+    loader.refresh("QQQ")
+
+    provider.bars = bars.iloc[:0]
+    result = loader.refresh("QQQ")
+    assert result['fetched'] == 0
+    assert result['reused'] == 50
+    assert len(result['data']) == 50
+
+def test_get_data_uses_cache(tmp_path):
+    provider = FakeProvider(make_bars("2024-01-01", 30))
+    loader = DataLoader(str(tmp_path), provider=provider)
+
+    df = loader.get_data("spy")
+    assert len(df) == 30
+    df = loader.get_data("SPY")
+    assert len(df) == 30
+    assert len(provider.calls) == 1
+
+class FlakyProvider(FakeProvider):
+    name = "flaky"
+    host = "flaky.test"
+
+    def __init__(self, bars, failures, broken=()):
+        super().__init__(bars)
+        self.failures = dict(failures)
+        self.broken = set(broken)
+        self.lock = threading.Lock()
+
+    def fetch(self, symbol, start=None, end=None):
+        with self.lock:
+            if symbol in self.broken:
+                raise ConnectionError(f"{symbol} unavailable")
+            if self.failures.get(symbol, 0) > 0:
+                self.failures[symbol] -= 1
+                raise TimeoutError("transient")
+        return super().fetch(symbol, start, end)
+
+def test_get_many_retries_and_reports_partial_failures(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    provider = FlakyProvider(make_bars("2024-01-01", 40), failures={"QQQ": 2}, broken={"BAD"})
+    loader = DataLoader(str(tmp_path / "cache"), provider=provider, max_retries=2, backoff_seconds=0)
+
+    results = loader.get_many(["SPY", "QQQ", "BAD", "sp500"], max_workers=4)
+
+    assert results["SPY"]["status"] == "fetched"
+    assert results["QQQ"]["status"] == "fetched"
+    assert len(results["QQQ"]["data"]) == 40
+    assert results["BAD"]["status"] == "error"
+    assert "unavailable" in results["BAD"]["error"]
+    assert results["BAD"]["data"].empty
+    # Aliases resolve to the same download
+    assert results["sp500"] is results["SPY"]
+    assert sum(1 for call in provider.calls if call[0] == "SPY") == 1
+
+    # Second batch is served from cache without touching the provider
+    calls = len(provider.calls)
+    results = loader.get_many(["SPY", "QQQ"])
+    assert results["SPY"]["status"] == "cached"
+    assert len(provider.calls) == calls
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.09
+
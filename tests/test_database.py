@@ -0,0 +1,157 @@
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from src.core import database
+from src.core.config import settings
+from src.core.database import Database, ForecastWriter, get_sqlite_connection
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'forecasts.db'}")
+    return Database()
+
+def test_connections_are_persistent_per_thread(db):
+    first = db._conn()
+    assert db._conn() is first
+    assert Database()._conn() is first
+    assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert first.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(get_sqlite_connection(db.db_path)))
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+
+def test_schema_initialized_once_per_process(db, monkeypatch):
+    calls = []
+    monkeypatch.setattr(Database, "_init_sqlite", lambda self: calls.append(1))
+    Database()
+    Database()
+    assert calls == []
+    assert str(db.db_path) in database._initialized
+
+def test_forecast_roundtrip(db):
+    db.save_forecast("2024-01-02", "SPY", 10, 0.01, 470.0, "2024-01-12")
+    db.save_forecast("2024-01-02", "SPY", 10, 0.02, 470.0, "2024-01-12")  # upsert
+    db.save_forecast("2024-01-03", "SPY", 10, 0.03, 472.0, "2024-01-13")
+
+    history = db.get_history("SPY")
+    assert [row["date"] for row in history] == ["2024-01-03", "2024-01-02"]
+    assert history[1]["prediction"] == 0.02
+
+    db.add_to_watchlist("qqq")
+    db.add_to_watchlist("QQQ")
+    assert db.get_watchlist() == ["QQQ"]
+    db.remove_from_watchlist("qqq")
+    assert db.get_watchlist() == []
+    # Every write commits: the shared per-thread connection is never left mid-transaction
+    assert not db._conn().in_transaction
+
+def test_save_forecasts_bulk_upsert_keeps_actuals(db):
+    rows = [
+        {"date": "2024-01-02", "symbol": sym, "horizon": h, "prediction": 0.01,
+         "start_price": 100.0, "target_date": "2024-01-12"}
+        for sym in ["SPY", "QQQ"] for h in [10, 100, 365]
+    ]
+    assert db.save_forecasts(rows) == 6
+    db.update_actuals("SPY", "2024-02-01", 110.0)
+
+    rows[0]["prediction"] = 0.05
+    db.save_forecasts(rows)
+
+    spy = {row["horizon"]: row for row in db.get_history("SPY")}
+    assert len(spy) == 3
+    assert spy[10]["prediction"] == 0.05
+    assert spy[10]["actual"] == pytest.approx(0.0953, abs=1e-4)
+
+def test_forecast_writer_flushes_by_size_and_on_close(db):
+    with ForecastWriter(db, max_rows=3, max_seconds=60) as writer:
+        for i in range(7):
+            writer.add(f"2024-01-{i + 1:02d}", "IWM", 10, 0.0, 200.0, "2024-02-01")
+        assert writer.written == 6
+    assert writer.written == 7
+    assert len(db.get_history("IWM")) == 7
+
+def test_reconcile_actuals_uses_close_at_each_target_date(db):
+    db.save_forecasts([
+        {"date": "2024-01-02", "symbol": "SPY", "horizon": 1, "prediction": 0.0, "start_price": 100.0, "target_date": "2024-01-03"},
+        # Target falls on a Saturday: the Friday close is used
+        {"date": "2024-01-02", "symbol": "SPY", "horizon": 5, "prediction": 0.0, "start_price": 100.0, "target_date": "2024-01-06"},
+        # Not matured yet
+        {"date": "2024-01-02", "symbol": "SPY", "horizon": 20, "prediction": 0.0, "start_price": 100.0, "target_date": "2024-02-01"},
+        {"date": "2024-01-02", "symbol": "QQQ", "horizon": 1, "prediction": 0.0, "start_price": 50.0, "target_date": "2024-01-03"},
+    ])
+    spy = pd.Series([101.0, 102.0, 103.0, 104.0, 110.0],
+                    index=pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", "2024-01-08"]))
+    qqq = pd.Series([50.0, 55.0], index=pd.to_datetime(["2024-01-02", "2024-01-03"]))
+
+    assert db.reconcile_actuals({"SPY": spy, "QQQ": qqq}) == 3
+
+    spy_actuals = {r["horizon"]: r["actual"] for r in db.get_history("SPY")}
+    assert spy_actuals[1] == pytest.approx(np.log(102.0 / 100.0))
+    assert spy_actuals[5] == pytest.approx(np.log(104.0 / 100.0))
+    assert spy_actuals[20] is None
+    assert db.get_history("QQQ")[0]["actual"] == pytest.approx(np.log(55.0 / 50.0))
+
+    # Already reconciled rows are left alone
+    assert db.reconcile_actuals({"SPY": spy * 2}) == 0
+
+def test_query_history_keyset_pages_with_projection(db):
+    dates = pd.bdate_range("2024-01-01", periods=30).strftime("%Y-%m-%d")
+    db.save_forecasts([
+        {"date": d, "symbol": sym, "horizon": h, "prediction": 0.01, "start_price": 100.0, "target_date": d}
+        for d in dates for sym in ["SPY", "QQQ", "IWM"] for h in [10, 100]
+    ])
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = db.query_history(["SPY", "QQQ"], start=dates[5], fields=["symbol", "prediction"],
+                                        limit=7, cursor=cursor)
+        seen.extend(rows)
+        pages += 1
+        if cursor is None:
+            break
+
+    assert len(seen) == 25 * 2 * 2
+    assert pages == 15
+    assert set(seen[0]) == {"id", "date", "symbol", "prediction"}
+    assert len({row["id"] for row in seen}) == len(seen)
+    keys = [(row["date"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert {row["symbol"] for row in seen} == {"SPY", "QQQ"}
+    assert min(row["date"] for row in seen) == dates[5]
+
+    streamed = list(db.iter_history(["SPY", "QQQ"], start=dates[5], batch_size=9))
+    assert [row["id"] for row in streamed] == [row["id"] for row in seen]
+
+    with pytest.raises(ValueError):
+        db.query_history(["SPY"], fields=["secret"])
+
+def test_accuracy_aggregates_and_caches_until_actuals_change(db):
+    db.save_forecasts([
+        {"date": "2024-01-02", "symbol": "SPY", "horizon": 1, "prediction": 0.02, "start_price": 100.0, "target_date": "2024-01-03"},
+        {"date": "2024-01-03", "symbol": "SPY", "horizon": 1, "prediction": -0.01, "start_price": 100.0, "target_date": "2024-01-04"},
+        {"date": "2024-02-01", "symbol": "SPY", "horizon": 1, "prediction": 0.01, "start_price": 100.0, "target_date": "2024-02-02"},
+    ])
+    closes = pd.Series([101.0, 101.0], index=pd.to_datetime(["2024-01-03", "2024-01-04"]))
+    db.reconcile_actuals({"SPY": closes})
+
+    metrics = db.accuracy(["SPY"])
+    assert len(metrics) == 1
+    january = metrics[0]
+    errors = np.array([0.02, -0.01]) - np.log(1.01)
+    assert january["month"] == "2024-01"
+    assert january["count"] == 2
+    assert january["mae"] == pytest.approx(np.abs(errors).mean())
+    assert january["rmse"] == pytest.approx(np.sqrt((errors ** 2).mean()))
+    assert january["bias"] == pytest.approx(errors.mean())
+    assert january["hit_rate"] == pytest.approx(0.5)
+
+    assert db.accuracy(["SPY"]) is metrics
+
+    db.reconcile_actuals({"SPY": pd.Series([99.0], index=pd.to_datetime(["2024-02-02"]))})
+    metrics = db.accuracy(["SPY"])
+    assert [m["month"] for m in metrics] == ["2024-01", "2024-02"]
+    assert db.accuracy(["SPY"], by_month=False)[0]["count"] == 3
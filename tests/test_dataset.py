@@ -0,0 +1,46 @@
+import pandas as pd
+import numpy as np
+from src.data.dataset import MarketDataset
+
+def make_history(start, periods, base):
+    dates = pd.bdate_range(start=start, periods=periods)
+    close = base + np.arange(periods, dtype=float)
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(periods, 1000)
+    }, index=dates)
+
+def test_dataset_filters_and_as_of(tmp_path):
+    dataset = MarketDataset(str(tmp_path))
+    dataset.write("SPY", make_history("2022-06-01", 400, 100.0))
+    dataset.write("^VIX", make_history("2022-06-01", 400, 20.0))
+    dataset.write("QQQ", make_history("2023-01-02", 100, 300.0))
+
+    spy = dataset.load("SPY", start="2023-01-01", end="2023-01-31", columns=["Close"])
+    assert list(spy.columns) == ["Close"]
+    assert spy.index.min() >= pd.Timestamp("2023-01-01")
+    assert spy.index.max() <= pd.Timestamp("2023-01-31")
+
+    snapshot = dataset.as_of("2023-01-08", columns=["Close"])
+    assert set(snapshot.index) == {"SPY", "^VIX", "QQQ"}
+    # 2023-01-08 is a Sunday: the Friday bar is returned
+    assert snapshot.loc["QQQ", "Date"] == pd.Timestamp("2023-01-06")
+
+    panel = dataset.tail(["SPY", "^VIX"], days=20, end="2023-06-30")
+    assert panel.shape == (20, 2)
+
+def test_dataset_rewrites_only_touched_years(tmp_path):
+    dataset = MarketDataset(str(tmp_path))
+    history = make_history("2022-06-01", 400, 100.0)
+    dataset.write("SPY", history)
+
+    revised = history.copy()
+    revised.loc[revised.index[-1], 'Close'] = -1.0
+    dataset.write("SPY", revised, since=revised.index[-1])
+
+    df = dataset.load("SPY")
+    assert len(df) == 400
+    assert df['Close'].iloc[-1] == -1.0
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import pandas as pd
+from src.core.freshness import FreshnessPolicy, MarketCalendar
+
+ET = ZoneInfo("America/New_York")
+
+def et(*args):
+    return datetime(*args, tzinfo=ET)
+
+def test_calendar_holidays_and_early_closes():
+    calendar = MarketCalendar()
+    assert not calendar.is_trading_day(datetime(2025, 12, 25).date())
+    assert not calendar.is_trading_day(datetime(2025, 12, 27).date())  # Saturday
+    assert calendar.previous_trading_day(datetime(2025, 12, 26).date()) == datetime(2025, 12, 24).date()
+    _, close = calendar.session(datetime(2025, 11, 28).date())
+    assert close.hour == 13
+
+def test_data_fetched_friday_evening_is_fresh_all_weekend():
+    policy = FreshnessPolicy(intraday_minutes=120)
+    fetched = et(2025, 6, 13, 18, 0)  # Friday after the close
+    last_bar = pd.Timestamp("2025-06-13")
+    assert policy.data_is_fresh("SPY", last_bar, fetched, now=et(2025, 6, 15, 12, 0))
+    # Monday after the open new bars appear
+    assert not policy.data_is_fresh("SPY", last_bar, fetched, now=et(2025, 6, 16, 10, 0))
+
+def test_data_fetched_before_open_is_stale_during_session():
+    policy = FreshnessPolicy(intraday_minutes=120)
+    fetched = et(2025, 6, 16, 9, 0)
+    last_bar = pd.Timestamp("2025-06-13")
+    assert policy.data_is_fresh("SPY", last_bar, fetched, now=et(2025, 6, 16, 9, 20))
+    assert not policy.data_is_fresh("SPY", last_bar, fetched, now=et(2025, 6, 16, 9, 45))
+
+def test_intraday_checkpoints_for_results():
+    policy = FreshnessPolicy(intraday_minutes=120)
+    created = et(2025, 6, 16, 10, 0).astimezone(timezone.utc).replace(tzinfo=None)  # naive UTC
+    assert policy.result_is_fresh(created, "SPY", now=et(2025, 6, 16, 11, 0))
+    assert not policy.result_is_fresh(created, "SPY", now=et(2025, 6, 16, 11, 45))
+
+def test_holiday_does_not_trigger_refresh():
+    policy = FreshnessPolicy()
+    created = et(2025, 12, 24, 14, 0)  # after the early close
+    assert policy.result_is_fresh(created, "SPY", now=et(2025, 12, 25, 15, 0))
+
+def test_crypto_trades_every_day():
+    policy = FreshnessPolicy(intraday_minutes=120)
+    fetched = datetime(2025, 6, 14, 9, 0, tzinfo=timezone.utc)  # Saturday
+    last_bar = pd.Timestamp("2025-06-14")
+    assert policy.data_is_fresh("BTC-USD", last_bar, fetched, now=datetime(2025, 6, 14, 9, 30, tzinfo=timezone.utc))
+    assert not policy.data_is_fresh("BTC-USD", last_bar, fetched, now=datetime(2025, 6, 14, 11, 0, tzinfo=timezone.utc))
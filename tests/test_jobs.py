@@ -0,0 +1,135 @@
+import socket
+import threading
+import time
+import pytest
+from src.core.config import settings
+from src.core.jobs import JobQueue, JobWorkers, job_handler, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+import src.services.jobs  # noqa: F401
+
+runs = []
+runs_lock = threading.Lock()
+release = threading.Event()
+
+@job_handler("test_echo")
+def echo_job(ctx, params):
+    with runs_lock:
+        runs.append(params["n"])
+    ctx.progress(0.5, "halfway")
+    return {"n": params["n"]}
+
+@job_handler("test_fail")
+def fail_job(ctx, params):
+    raise RuntimeError("boom")
+
+@job_handler("test_loop")
+def loop_job(ctx, params):
+    for i in range(500):
+        release.wait(0.01)
+        ctx.progress(i / 500, f"step {i}")
+    return "done"
+
+def wait_for(queue, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} still {queue.get(job_id)['status']}")
+
+def test_submit_run_and_fetch_result(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("test_echo", {"n": 7})
+    assert job["status"] == QUEUED and job["progress"] == 0
+
+    workers = JobWorkers(queue, workers=1, poll_seconds=0.05).start()
+    try:
+        done = wait_for(queue, job["id"], [SUCCEEDED])
+    finally:
+        workers.stop()
+    assert done["result"] == {"n": 7}
+    assert done["progress"] == 1.0
+    assert done["message"] == "halfway"
+    assert done["started_at"] and done["finished_at"]
+
+    failed = queue.submit("test_fail")
+    assert JobWorkers(queue).run_once()
+    assert queue.get(failed["id"])["status"] == FAILED
+    assert "boom" in queue.get(failed["id"])["error"]
+
+    with pytest.raises(ValueError):
+        queue.submit("no_such_kind")
+    assert [j["kind"] for j in queue.list()] == ["test_fail", "test_echo"]
+    assert queue.list(status=FAILED)[0]["result"] is None
+
+def test_each_job_is_claimed_once(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    runs.clear()
+    ids = [queue.submit("test_echo", {"n": n})["id"] for n in range(20)]
+    workers = JobWorkers(queue, workers=4, poll_seconds=0.05).start()
+    try:
+        for job_id in ids:
+            wait_for(queue, job_id, [SUCCEEDED])
+    finally:
+        workers.stop()
+    assert sorted(runs) == list(range(20))
+
+def test_cancel_queued_and_running(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    queued = queue.submit("test_echo", {"n": 1})
+    assert queue.cancel(queued["id"])["status"] == CANCELLED
+    assert not JobWorkers(queue).run_once()
+
+    release.clear()
+    running = queue.submit("test_loop")
+    workers = JobWorkers(queue, workers=1, poll_seconds=0.05).start()
+    try:
+        wait_for(queue, running["id"], [RUNNING])
+        assert queue.cancel(running["id"])["cancel_requested"]
+        job = wait_for(queue, running["id"], [CANCELLED, SUCCEEDED])
+    finally:
+        workers.stop()
+    assert job["status"] == CANCELLED
+    assert job["progress"] < 1.0
+
+def test_orphaned_jobs_are_requeued(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    workers = JobWorkers(queue, lease_seconds=60)
+    orphan = queue.submit("test_echo", {"n": 3})
+    # Claimed before a restart; the new boot has the same hostname (and PID)
+    assert queue.claim(f"{socket.gethostname()}:previous-boot")["id"] == orphan["id"]
+    own = queue.submit("test_echo", {"n": 4})
+    assert queue.claim(workers.worker_id)["id"] == own["id"]
+
+    # Both leases are still valid
+    assert queue.requeue_orphans(workers.worker_id, lease_seconds=60) == 0
+    # Once they run out only the other boot's job goes back; ours is renewed
+    time.sleep(0.01)
+    queue.heartbeat(workers.worker_id)
+    assert queue.requeue_orphans(workers.worker_id, lease_seconds=0.005) == 1
+    assert queue.get(orphan["id"])["status"] == QUEUED
+    assert queue.get(own["id"])["status"] == RUNNING
+    assert workers.run_once()
+    assert queue.get(orphan["id"])["status"] == SUCCEEDED
+
+def test_simulation_job_reports_progress(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_PROVIDER", "synthetic")
+    monkeypatch.setattr(settings, "DATA_CACHE_DIR", str(tmp_path / "cache"))
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job = queue.submit("simulation", {"symbol": "spy", "date": "2024-06-03", "horizons": [30, 10],
+                                      "sims": 1500, "seed": 1})
+    assert JobWorkers(queue).run_once()
+
+    done = queue.get(job["id"])
+    assert done["status"] == SUCCEEDED, done["error"]
+    result = done["result"]
+    assert result["symbol"] == "SPY" and result["sims"] == 1500 and result["days"] == 30
+    assert set(result["quantiles"]) == {"10", "30"}
+    q = result["quantiles"]["30"]
+    assert q["p10"] <= q["p50"] <= q["p90"]
+    assert len(result["bands"]["values"]) == len(result["bands"]["levels"])
+    assert len(result["bands"]["values"][0]) == 31
+
+    too_big = queue.submit("simulation", {"symbol": "SPY", "sims": settings.JOB_MAX_SIMS + 1})
+    assert JobWorkers(queue).run_once()
+    assert "sims must be" in queue.get(too_big["id"])["error"]
@@ -0,0 +1,101 @@
+import json
+import pytest
+import numpy as np
+from bson import ObjectId
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from src.core.config import settings
+from src.core.database import get_sqlite_connection
+from src.core.models import MarketOverview, SimulationChart, SimulationRun, WishlistItem
+from src.core.mongo import ensure_indexes
+from src.core.repository import ChartRepository, MarketRepository, SimulationRepository, WishlistRepository
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'forecasts.db'}")
+
+def overview(symbol, date, price=1.0, **kw):
+    return MarketOverview(symbol=symbol, date=date, regime="Bull", price=price, volatility=0.2, **kw)
+
+def test_market_repository_roundtrip_and_batch_lookup():
+    repo = MarketRepository()
+    saved = repo.create(overview("SPY", "2024-01-02", forecast_short={"p50": 1.5}))
+    repo.create(overview("SPY", "2024-01-03", price=2.0))
+    repo.create(overview("QQQ", "2024-01-03", price=3.0))
+
+    found = repo.find_by_date("SPY", "2024-01-02")
+    assert found.id == saved.id
+    assert found.forecast_short == {"p50": 1.5}
+    assert isinstance(found.created_at, datetime)
+
+    assert repo.find_latest_by_symbol("SPY").price == 2.0
+    batch = repo.find_by_symbols_date(["SPY", "QQQ", "IWM"], "2024-01-03")
+    assert sorted(batch) == ["QQQ", "SPY"]
+    assert repo.get_available_dates() == ["2024-01-02", "2024-01-03"]
+
+    # Same unique key as the Mongo collection
+    with pytest.raises(DuplicateKeyError):
+        repo.create(overview("SPY", "2024-01-02"))
+
+    repo.delete({"_id": saved.id})
+    assert repo.find_by_date("SPY", "2024-01-02") is None
+
+def test_simulation_and_wishlist_repositories():
+    runs = SimulationRepository()
+    runs.create_many([
+        SimulationRun(symbol="SPY", date="2024-01-02", horizon=h, ml_forecast=0.0,
+                      p10=1.0, p50=2.0, p90=3.0, regime="Bull")
+        for h in [10, 30, 100]
+    ])
+    assert sorted(runs.find_runs("SPY", "2024-01-02", [10, 100, 365])) == [10, 100]
+    assert runs.find_run("SPY", "2024-01-02", 30).p50 == 2.0
+    runs.delete_many({"symbol": "SPY", "date": "2024-01-02"})
+    assert runs.find_runs("SPY", "2024-01-02", [10, 30, 100]) == {}
+
+    wishlist = WishlistRepository()
+    for symbol in ["QQQ", "AAPL"]:
+        wishlist.create(WishlistItem(symbol=symbol))
+    wishlist.update({"symbol": "AAPL"}, {"note": "core"})
+    assert wishlist.get_all_symbols() == ["AAPL", "QQQ"]
+    assert wishlist.find_one({"symbol": "AAPL"}).note == "core"
+    assert [i.symbol for i in wishlist.find_many({}, sort=[("symbol", -1)], limit=1)] == ["QQQ"]
+
+def test_local_store_query_operators():
+    repo = MarketRepository()
+    for day, price in [(2, 1.0), (3, 2.0), (4, 3.0)]:
+        repo.create(overview("SPY", f"2024-01-0{day}", price=price))
+    collection = repo.collection
+
+    assert [d["date"] for d in collection.find({"price": {"$gte": 2.0}}).sort("date", -1)] == ["2024-01-04", "2024-01-03"]
+    assert collection.count_documents({"$or": [{"price": 1.0}, {"date": "2024-01-04"}]}) == 2
+    doc = collection.find_one({"symbol": "SPY"}, {"price": 1}, sort=[("price", -1)])
+    assert set(doc) == {"_id", "price"} and doc["price"] == 3.0
+    assert collection.count_documents({"created_at": {"$lt": datetime.utcnow() + timedelta(minutes=1)}}) == 3
+    assert ensure_indexes()["market_overview"]
+
+def test_charts_are_keyed_by_conservative(tmp_path):
+    # A store from before the flag: (symbol, date) unique, chart without the field
+    legacy_id = str(ObjectId())
+    conn = get_sqlite_connection(tmp_path / "forecasts.db")
+    with conn:
+        conn.execute("CREATE TABLE doc_simulation_charts (id TEXT PRIMARY KEY, doc TEXT NOT NULL)")
+        conn.execute("CREATE UNIQUE INDEX idx_doc_simulation_charts_symbol_date ON doc_simulation_charts "
+                     "(json_extract(doc, '$.symbol'), json_extract(doc, '$.date'))")
+        conn.execute("INSERT INTO doc_simulation_charts VALUES (?, ?)",
+                     (legacy_id, json.dumps({"symbol": "SPY", "date": "2024-01-02", "start_price": 1.0})))
+
+    def chart(conservative, price):
+        return SimulationChart.from_arrays(np.ones((3, 11)), np.ones((2, 11)), symbol="SPY", date="2024-01-02",
+                                           conservative=conservative, days=10, sims=100, start_price=price,
+                                           regime_id=0, regime="Bull", levels=[10, 50, 90])
+
+    repo = ChartRepository()
+    assert repo.collection.find_one(ChartRepository.key("SPY", "2024-01-02"))["_id"] == legacy_id
+    repo.create(chart(True, 2.0))
+    repo.replace(ChartRepository.key("SPY", "2024-01-02"), chart(False, 3.0))
+
+    assert repo.find_chart("SPY", "2024-01-02").start_price == 3.0
+    assert repo.find_chart("SPY", "2024-01-02", conservative=True).start_price == 2.0
+    assert repo.collection.count_documents({}) == 2
+    with pytest.raises(DuplicateKeyError):
+        repo.create(chart(True, 4.0))
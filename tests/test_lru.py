@@ -0,0 +1,32 @@
+from src.core.files import write_atomic
+from src.core.lru import SizedLRU
+
+def test_sized_lru_signatures_and_byte_budget():
+    lru = SizedLRU(max_bytes=100)
+    lru.put("a", (1,), "A", 40)
+    assert lru.get("a", (1,)) == "A"
+    assert lru.get("a", (2,)) is None  # source changed
+    lru.resign("a", (1,), (2,))
+    assert lru.get("a", (2,)) == "A"
+
+    lru.put("b", None, "B", 40)
+    lru.get("a", (2,))  # "b" is now least recently used
+    lru.put("c", None, "C", 40)
+    assert lru.get("b") is None and lru.get("c") == "C"
+    assert lru.put("huge", None, "H", 101) == "H"
+    assert lru.stats() == {"hits": 4, "misses": 2, "evictions": 1, "entries": 2, "bytes": 80, "max_bytes": 100}
+
+def test_write_atomic_leaves_no_partial_file(tmp_path):
+    target = tmp_path / "artifact.txt"
+    write_atomic(target, lambda path: open(path, "w").write("v1"))
+    assert target.read_text() == "v1"
+
+    def fail(path):
+        open(path, "w").write("partial")
+        raise RuntimeError("interrupted")
+    try:
+        write_atomic(target, fail)
+    except RuntimeError:
+        pass
+    assert target.read_text() == "v1"
+    assert [p.name for p in tmp_path.iterdir()] == ["artifact.txt"]
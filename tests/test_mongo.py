@@ -0,0 +1,28 @@
+import asyncio
+import weakref
+from src.core import mongo
+from src.core.config import settings
+
+URL = "mongodb://localhost:27017/forcast_test"
+
+def test_clients_are_shared_per_url(monkeypatch):
+    monkeypatch.setattr(mongo, "_clients", {})
+    monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 7)
+
+    client = mongo.get_client(URL)
+    assert mongo.get_client(URL) is client
+    assert client.options.pool_options.max_pool_size == 7
+    assert mongo.get_database(URL).name == "forcast_test"
+    mongo.close_clients()
+    assert mongo._clients == {}
+
+def test_async_clients_are_shared_per_event_loop(monkeypatch):
+    monkeypatch.setattr(mongo, "_async_clients", weakref.WeakKeyDictionary())
+
+    async def grab():
+        return mongo.get_async_client(URL), mongo.get_async_client(URL)
+
+    first, again = asyncio.run(grab())
+    assert first is again
+    second, _ = asyncio.run(grab())
+    assert second is not first
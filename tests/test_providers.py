@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from src.data.loader import DataLoader
+from src.data.providers import SyntheticProvider, ReplayProvider
+
+def test_synthetic_provider_is_deterministic_and_range_independent():
+    provider = SyntheticProvider(seed=7, start="2020-01-01", end="2023-12-31")
+    full = provider.fetch("SYN0001")
+    again = SyntheticProvider(seed=7, start="2020-01-01", end="2023-12-31").fetch("SYN0001")
+    pd.testing.assert_frame_equal(full, again)
+
+    tail = provider.fetch("SYN0001", start="2023-06-01")
+    pd.testing.assert_frame_equal(tail, full[full.index >= "2023-06-01"])
+
+    other = provider.fetch("SYN0002")
+    assert not np.allclose(other['Close'].values, full['Close'].values)
+
+    # A longer calendar extends the bars without changing the shared days
+    longer = SyntheticProvider(seed=7, start="2020-01-01", end="2024-12-31").fetch("SYN0001")
+    pd.testing.assert_frame_equal(longer[longer.index <= "2023-12-31"], full)
+
+def test_synthetic_provider_bars_are_consistent_and_regime_switching():
+    df = SyntheticProvider(seed=1, start="2010-01-01", end="2020-12-31").fetch("SPY")
+    assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+    assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+    assert (df.index.dayofweek < 5).all()
+
+    # Volatility clusters: rolling vol varies well beyond sampling noise
+    vol = np.log(df['Close']).diff().rolling(60).std().dropna()
+    assert vol.max() > 2 * vol.min()
+
+def test_universe_names():
+    symbols = SyntheticProvider.universe(5000)
+    assert len(set(symbols)) == 5000
+    assert symbols[0] == "SYN0000"
+
+def test_replay_provider_reads_local_files(tmp_path):
+    recorded = SyntheticProvider(seed=3, start="2022-01-01", end="2022-12-31").fetch("QQQ")
+    recorded.to_parquet(tmp_path / "QQQ.parquet")
+    recorded.to_csv(tmp_path / "IWM.csv")
+
+    provider = ReplayProvider(str(tmp_path))
+    pd.testing.assert_frame_equal(provider.fetch("QQQ"), recorded)
+    csv = provider.fetch("IWM", start="2022-06-01", end="2022-07-01")
+    assert csv.index.min() >= pd.Timestamp("2022-06-01")
+    assert csv.index.max() < pd.Timestamp("2022-07-01")
+    assert provider.fetch("MISSING").empty
+
+def test_loader_runs_offline_on_synthetic_universe(tmp_path):
+    provider = SyntheticProvider(seed=5, start="2020-01-01", end="2021-12-31")
+    loader = DataLoader(str(tmp_path), provider=provider)
+    results = loader.get_many(SyntheticProvider.universe(50))
+    assert all(r['status'] == "fetched" for r in results.values())
@@ -0,0 +1,69 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from src.models.lightgbm_forecaster import ForecastModel
+from src.models.registry import ModelCache, ModelRegistry
+
+def make_model(seed=0, rows=200):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.normal(size=(rows, 3)), columns=["a", "b", "c"])
+    y = pd.Series(X["a"] * 0.5 + rng.normal(scale=0.1, size=rows))
+    model = ForecastModel()
+    model.fit(X, y)
+    return model, X
+
+def test_registry_caches_models_until_republished(tmp_path):
+    cache = ModelCache(max_bytes=50 * 1024 * 1024)
+    registry = ModelRegistry(str(tmp_path), cache=cache)
+    model, X = make_model()
+    registry.save_forecast_model("SPY", model, 10)
+
+    first = registry.load_forecast_model("SPY", 10)
+    second = registry.load_forecast_model("SPY", 10)
+    assert first is second
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert np.allclose(first.predict(X), model.predict(X))
+
+    # Publishing a new artifact swaps it in on the next load
+    retrained, _ = make_model(seed=1, rows=300)
+    registry.save_forecast_model("SPY", retrained, 10)
+    third = registry.load_forecast_model("SPY", 10)
+    assert third is not first
+    assert np.allclose(third.predict(X), retrained.predict(X))
+    # No temporary files are left behind
+    assert sorted(os.listdir(tmp_path)) == ["SPY_lgb_10d.txt"]
+
+    assert registry.load_forecast_model("SPY", 100) is None
+
+def test_concurrent_loads_share_one_read(tmp_path):
+    cache = ModelCache(max_bytes=50 * 1024 * 1024)
+    registry = ModelRegistry(str(tmp_path), cache=cache)
+    registry.save_forecast_model("QQQ", make_model()[0], 10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.load_forecast_model("QQQ", 10)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(m) for m in results}) == 1
+    assert cache.stats()["entries"] == 1
+
+def test_model_cache_evicts_least_recently_used():
+    cache = ModelCache(max_bytes=100)
+    cache.put(("d", "A", "lgb", 10), (1, 40), "a", 40)
+    cache.put(("d", "B", "lgb", 10), (1, 40), "b", 40)
+    assert cache.get(("d", "A", "lgb", 10), (1, 40)) == "a"
+
+    cache.put(("d", "C", "lgb", 10), (1, 40), "c", 40)
+    assert cache.get(("d", "B", "lgb", 10), (1, 40)) is None
+    assert cache.get(("d", "A", "lgb", 10), (1, 40)) == "a"
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 80
+
+    # Oversized models are returned but not kept
+    assert cache.put(("d", "D", "lgb", 10), (1, 500), "d", 500) == "d"
+    assert cache.get(("d", "D", "lgb", 10), (1, 500)) is None
@@ -0,0 +1,97 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from src.core.config import settings
+from src.core.models import MarketOverview
+from src.core.response_cache import ResponseCache
+
+def make_app(cache: ResponseCache, state: dict):
+    app = FastAPI()
+
+    @app.get("/item")
+    def item(request: Request):
+        def compute():
+            state["computed"] += 1
+            return {"value": state["value"]}
+        return cache.cached(request, lambda: ("item", state["version"]), compute)
+
+    return app
+
+def test_etag_and_conditional_get():
+    cache = ResponseCache(max_bytes=1024 * 1024)
+    state = {"value": 1, "version": 1, "computed": 0}
+    client = TestClient(make_app(cache, state))
+
+    first = client.get("/item")
+    assert first.status_code == 200
+    assert first.json() == {"value": 1}
+    etag = first.headers["etag"]
+    assert "must-revalidate" in first.headers["cache-control"]
+
+    # Repeat request: served from the cache
+    second = client.get("/item")
+    assert second.headers["etag"] == etag
+    assert state["computed"] == 1
+
+    # Revalidation: 304 without a body
+    not_modified = client.get("/item", headers={"If-None-Match": f'W/{etag}, "other"'})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert cache.stats()["not_modified"] == 1
+
+    # A new input version is a new key
+    state["value"], state["version"] = 2, 2
+    changed = client.get("/item", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json() == {"value": 2}
+    assert changed.headers["etag"] != etag
+    assert state["computed"] == 2
+
+def test_unchanged_content_is_not_modified_after_recompute():
+    cache = ResponseCache(max_bytes=1024 * 1024)
+    state = {"value": 1, "version": 1, "computed": 0}
+    client = TestClient(make_app(cache, state))
+    etag = client.get("/item").headers["etag"]
+
+    # Publishing drops the entries, but identical content keeps its ETag
+    cache.publish()
+    response = client.get("/item", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert state["computed"] == 2
+    assert cache.stats()["generation"] == 1
+
+def test_eviction_under_budget():
+    cache = ResponseCache(max_bytes=40)
+    state = {"value": 1, "version": 1, "computed": 0}
+    client = TestClient(make_app(cache, state))
+    for version in range(1, 6):
+        state["version"] = version
+        client.get("/item")
+    stats = cache.stats()
+    assert stats["bytes"] <= 40
+    assert stats["evictions"] > 0
+
+def test_overview_routes_answer_conditional_gets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'forecasts.db'}")
+    from src.api import routes
+
+    async def fake_symbols():
+        return ["SPY"]
+
+    async def fake_overviews(symbols, date):
+        ov = MarketOverview(symbol="SPY", date=date, regime="Bull", price=1.0, volatility=0.1)
+        return {"SPY": {"overview": ov, "status": "cached", "error": None}}
+
+    monkeypatch.setattr(routes, "_overview_symbols", fake_symbols)
+    monkeypatch.setattr(routes.market_service, "aget_overviews", fake_overviews)
+    monkeypatch.setattr(routes, "response_cache", ResponseCache(max_bytes=1024 * 1024))
+    app = FastAPI()
+    app.include_router(routes.router)
+    client = TestClient(app)
+
+    for path in ["/market/overview?date=2024-01-05", "/watchlist/overview?date=2024-01-05"]:
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.json()["overview"][0]["symbol"] == "SPY"
+        etag = response.headers["etag"]
+        assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
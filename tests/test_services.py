@@ -0,0 +1,291 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.core.config import settings
+import numpy as np
+from src.core.models import MarketOverview, SimulationRun, SimulationChart
+from src.models.advanced_simulation import AdvancedSimulator
+from src.core.freshness import freshness
+from src.services import logic
+from src.services.logic import MarketService, SimulationService, result_state, FRESH, STALE, EXPIRED
+
+@pytest.fixture(autouse=True)
+def local_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'forecasts.db'}")
+
+class FakeMarketRepo:
+    def __init__(self, stored):
+        self.stored = stored
+        self.batch_calls = 0
+
+    def find_by_symbols_date(self, symbols, date):
+        self.batch_calls += 1
+        return {s: self.stored[s] for s in symbols if s in self.stored}
+
+    def find_by_date(self, symbol, date):
+        raise AssertionError("per-symbol lookup used")
+
+def overview(symbol, date):
+    return MarketOverview(symbol=symbol, date=date, regime="Bull", price=1.0, volatility=0.1)
+
+def test_get_overviews_batches_stored_and_computes_missing(monkeypatch):
+    date = "2024-01-05"
+    service = MarketService()
+    service.repo = FakeMarketRepo({"SPY": overview("SPY", date), "QQQ": overview("QQQ", date)})
+
+    computed = []
+    def fake_compute(symbol, date, existing=None, lookup=True):
+        computed.append((symbol, existing, lookup))
+        if symbol == "BAD":
+            raise ValueError("no data")
+        return overview(symbol, date)
+    monkeypatch.setattr(service, "_get_overview", fake_compute)
+
+    result = service.get_overviews(["SPY", "QQQ", "IWM", "BAD"], date)
+
+    assert service.repo.batch_calls == 1
+    assert list(result) == ["SPY", "QQQ", "IWM"]
+    assert computed == [("IWM", None, False), ("BAD", None, False)]
+
+def test_aget_overviews_fans_out_with_deadlines(monkeypatch):
+    date = "2024-01-05"
+    service = MarketService()
+    service.repo = FakeMarketRepo({"SPY": overview("SPY", date)})
+
+    delays = {"A": 0.2, "B": 0.2, "C": 0.2, "SLOW": 1.0}
+    def fake_compute(symbol, date, existing=None, lookup=True):
+        if symbol == "BAD":
+            raise ValueError("no data")
+        time.sleep(delays[symbol])
+        return overview(symbol, date)
+    monkeypatch.setattr(service, "_get_overview", fake_compute)
+
+    start = time.monotonic()
+    results = asyncio.run(service.aget_overviews(["SPY", "A", "B", "C", "SLOW", "BAD"], date,
+                                                 symbol_timeout=0.5, deadline=5.0))
+    elapsed = time.monotonic() - start
+
+    # Bounded by the slowest symbol's timeout, not the sum of all symbols
+    assert elapsed < 0.9
+    assert list(results) == ["SPY", "A", "B", "C", "SLOW", "BAD"]
+    assert results["SPY"]["status"] == "cached"
+    assert [results[s]["status"] for s in "ABC"] == ["computed"] * 3
+    assert results["SLOW"]["status"] == "timeout"
+    assert results["BAD"]["status"] == "error" and "no data" in results["BAD"]["error"]
+
+    # The global deadline returns partial results
+    results = asyncio.run(service.aget_overviews(["SPY", "SLOW"], date, symbol_timeout=5.0, deadline=0.2))
+    assert results["SPY"]["overview"] is not None
+    assert results["SLOW"]["status"] == "pending"
+
+def test_astream_overviews_yields_cached_first_then_completion_order(monkeypatch):
+    date = "2024-01-05"
+    service = MarketService()
+    service.repo = FakeMarketRepo({"SPY": overview("SPY", date)})
+
+    delays = {"SLOW": 0.4, "FAST": 0.05}
+    def fake_compute(symbol, date, existing=None, lookup=True):
+        time.sleep(delays[symbol])
+        return overview(symbol, date)
+    monkeypatch.setattr(service, "_get_overview", fake_compute)
+
+    async def collect():
+        start = time.monotonic()
+        seen = []
+        async for symbol, result in service.astream_overviews(["SLOW", "FAST", "SPY"], date):
+            seen.append((symbol, result["status"], time.monotonic() - start))
+        return seen
+
+    seen = asyncio.run(collect())
+    assert [(s, status) for s, status, _ in seen] == [("SPY", "cached"), ("FAST", "computed"), ("SLOW", "computed")]
+    # The stored overview is available immediately, before any computation finishes
+    assert seen[0][2] < 0.05
+    assert seen[1][2] < 0.3
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return condition()
+
+def storing_compute(stored, delay):
+    lock = threading.Lock()
+    def fake_compute(symbol, date, existing=None, lookup=True):
+        time.sleep(delay)
+        with lock:
+            stored.append(symbol)
+        return overview(symbol, date)
+    return fake_compute
+
+def test_overviews_queued_past_the_deadline_are_still_stored(monkeypatch):
+    date = "2024-01-05"
+    monkeypatch.setattr(logic, "_overview_executor", ThreadPoolExecutor(max_workers=2))
+    service = MarketService()
+    service.repo = FakeMarketRepo({})
+    stored = []
+    monkeypatch.setattr(service, "_get_overview", storing_compute(stored, 0.2))
+    symbols = [f"S{i}" for i in range(8)]
+
+    # Time queued behind the two workers does not count against a symbol
+    results = asyncio.run(service.aget_overviews(symbols, date, symbol_timeout=0.3, deadline=5.0))
+    assert [r["status"] for r in results.values()] == ["computed"] * 8
+
+    # The deadline stops the waiting, not the work queued behind it
+    stored.clear()
+    results = asyncio.run(service.aget_overviews(symbols, date, symbol_timeout=0.3, deadline=0.1))
+    assert {r["status"] for r in results.values()} == {"pending"}
+    assert wait_until(lambda: sorted(stored) == symbols)
+
+def test_closed_overview_stream_still_stores_the_rest(monkeypatch):
+    date = "2024-01-05"
+    monkeypatch.setattr(logic, "_overview_executor", ThreadPoolExecutor(max_workers=2))
+    service = MarketService()
+    service.repo = FakeMarketRepo({})
+    stored = []
+    monkeypatch.setattr(service, "_get_overview", storing_compute(stored, 0.1))
+    symbols = [f"S{i}" for i in range(8)]
+
+    async def first_then_disconnect():
+        stream = service.astream_overviews(symbols, date)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    symbol, result = asyncio.run(first_then_disconnect())
+    assert result["status"] == "computed"
+    assert len(stored) < len(symbols)
+    assert wait_until(lambda: sorted(stored) == symbols)
+
+class FakeSimulationRepo:
+    def __init__(self, runs):
+        self.runs = runs
+        self.calls = 0
+
+    def find_runs(self, symbol, date, horizons):
+        self.calls += 1
+        return {h: self.runs[h] for h in horizons if h in self.runs}
+
+class FakeChartRepo:
+    def __init__(self, chart):
+        self.chart = chart
+
+    def find_chart(self, symbol, date, conservative=False):
+        return self.chart
+
+def test_fan_chart_roundtrip_is_compact():
+    rng = np.random.default_rng(0)
+    paths = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(200, 731)), axis=1)
+    fan = AdvancedSimulator().fan_chart(paths)
+    chart = SimulationChart.from_arrays(fan['bands'], fan['paths'], symbol="SPY", date="2024-01-05", days=730,
+                                        sims=200, start_price=100.0, regime_id=0, regime="Bull", levels=fan['levels'])
+
+    bands = chart.bands_array()
+    assert bands.shape == (7, 731)
+    assert bands.dtype == np.float32
+    np.testing.assert_allclose(bands[3], np.median(paths, axis=0), rtol=1e-6)
+    assert chart.paths_array().shape == (20, 731)
+    # Sample paths span the fan from the lowest to the highest terminal price
+    assert chart.paths_array()[0, -1] == np.float32(paths[:, -1].min())
+    assert chart.paths_array()[-1, -1] == np.float32(paths[:, -1].max())
+    assert len(chart.bands) + len(chart.paths) < 27 * 731 * 4 * 4 / 3
+
+def test_run_simulation_served_from_one_batched_query():
+    date = "2024-01-05"
+    runs = {h: SimulationRun(symbol="SPY", date=date, horizon=h, ml_forecast=0.0, p10=1.0, p50=2.0, p90=3.0,
+                             regime="Bull", created_at=datetime.utcnow())
+            for h in [10, 30, 100]}
+    service = SimulationService()
+    service.repo = FakeSimulationRepo(runs)
+    chart = SimulationChart.from_arrays(np.ones((7, 731)), np.ones((20, 731)), symbol="SPY", date=date, days=730,
+                                        sims=200, start_price=1.0, regime_id=0, regime="Bull",
+                                        levels=[5, 10, 25, 50, 75, 90, 95])
+    service.chart_repo = FakeChartRepo(chart)
+    service.loader = None  # Must not be touched
+
+    result = service.run_simulation("SPY", date, [100, 10, 30])
+
+    assert service.repo.calls == 1
+    assert [run["horizon"] for run in result["runs"]] == [100, 10, 30]
+    assert result["regime"] == "Bull"
+    assert SimulationChart(**result["chart"]).paths_array().shape == (20, 731)
+    assert result["current_price"] == 1.0
+    assert result["quantiles"][10] == {"p10": 1.0, "p50": 2.0, "p90": 3.0}
+    assert result["analysis"][10]["upside_pct"] == pytest.approx(200.0)
+
+def stale_time(symbol="BTC-USD"):
+    """Just before the latest freshness change point (naive UTC, as stored)."""
+    change = freshness.last_change_point(symbol).astimezone(timezone.utc).replace(tzinfo=None)
+    return change - timedelta(minutes=1)
+
+def test_result_state_thresholds(monkeypatch):
+    today = datetime.now().strftime("%Y-%m-%d")
+    monkeypatch.setattr(settings, "RESULT_MAX_STALENESS_MINUTES", 360)
+    assert result_state(datetime.utcnow(), "BTC-USD", today) == FRESH
+    assert result_state(stale_time(), "BTC-USD", today) == STALE
+    assert result_state(stale_time() - timedelta(days=1), "BTC-USD", today) == EXPIRED
+    # Past dates never change
+    assert result_state(stale_time() - timedelta(days=1), "BTC-USD", "2024-01-05") == FRESH
+
+    monkeypatch.setattr(settings, "RESULT_MAX_STALENESS_MINUTES", 0)
+    assert result_state(stale_time(), "BTC-USD", today) == EXPIRED
+
+def test_stale_overview_served_while_refreshing_once(monkeypatch):
+    date = datetime.now().strftime("%Y-%m-%d")
+    monkeypatch.setattr(settings, "RESULT_MAX_STALENESS_MINUTES", 360)
+    stored = overview("BTC-USD", date)
+    stored.created_at = stale_time()
+    service = MarketService()
+    service.repo = FakeMarketRepo({"BTC-USD": stored})
+
+    refreshes = []
+    def fake_compute(symbol, date, existing=None, lookup=True, revalidating=False):
+        refreshes.append((symbol, revalidating))
+        time.sleep(0.2)
+        return overview(symbol, date)
+    monkeypatch.setattr(service, "_get_overview", fake_compute)
+
+    start = time.monotonic()
+    first = service.get_overviews(["BTC-USD"], date)["BTC-USD"]
+    second = asyncio.run(service.aget_overviews(["BTC-USD"], date))["BTC-USD"]
+    assert time.monotonic() - start < 0.15
+
+    assert first.stale and first.price == stored.price
+    assert not stored.stale
+    assert second["status"] == "stale" and second["overview"].stale
+
+    # One deduplicated background refresh
+    deadline = time.monotonic() + 2
+    while logic._refreshing and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert refreshes == [("BTC-USD", True)]
+
+def test_stale_simulation_served_and_refreshed_in_background(monkeypatch):
+    date = datetime.now().strftime("%Y-%m-%d")
+    monkeypatch.setattr(settings, "RESULT_MAX_STALENESS_MINUTES", 360)
+    runs = {h: SimulationRun(symbol="BTC-USD", date=date, horizon=h, ml_forecast=0.0, p10=1.0, p50=2.0, p90=3.0,
+                             regime="Bull", created_at=stale_time())
+            for h in [10, 30]}
+    service = SimulationService()
+    service.repo = FakeSimulationRepo(runs)
+    chart = SimulationChart.from_arrays(np.ones((7, 731)), np.ones((20, 731)), symbol="BTC-USD", date=date,
+                                        days=730, sims=200, start_price=1.0, regime_id=0, regime="Bull",
+                                        levels=[5, 10, 25, 50, 75, 90, 95])
+    service.chart_repo = FakeChartRepo(chart)
+    service.loader = None  # Must not be touched in the request
+
+    started = []
+    monkeypatch.setattr(logic, "revalidate", lambda key, fn, *args: started.append((key, args[-1])))
+
+    result = service.run_simulation("BTC-USD", date, [10, 30])
+    assert result["stale"] is True
+    assert result["quantiles"][30] == {"p10": 1.0, "p50": 2.0, "p90": 3.0}
+    assert started == [(("simulation", "BTC-USD", date, (10, 30), False), True)]
+
+    # Past the hard limit the request recomputes instead
+    monkeypatch.setattr(settings, "RESULT_MAX_STALENESS_MINUTES", 0)
+    with pytest.raises(AttributeError):
+        service.run_simulation("BTC-USD", date, [10, 30])
+    assert len(started) == 1
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from src.models.advanced_simulation import AdvancedSimulator
+
+def simple_params(mean, std, jump_lambda=0.0):
+    return {"method": "simple", "mean": mean, "std": std, "jump_lambda": jump_lambda}
+
+def test_simulate_paths_vectorized_shapes_and_drift():
+    sim = AdvancedSimulator()
+    params = {0: simple_params(0.001, 0.0), 1: simple_params(-0.001, 0.0)}
+    res = sim.simulate_paths(100.0, 0, params, transmat=None, days=30, sims=50, seed=1)
+
+    assert res["paths"].shape == (50, 31)
+    # Fixed regime, no noise, no jumps: every path compounds the same drift
+    np.testing.assert_allclose(res["paths"][:, -1], 100.0 * 1.001 ** 30)
+    assert res["quantiles"][10]["p50"] == pytest.approx(100.0 * 1.001 ** 10)
+
+def test_simulate_paths_switches_regimes_and_is_reproducible():
+    sim = AdvancedSimulator()
+    params = {0: simple_params(0.002, 0.01, 0.05), 1: simple_params(-0.002, 0.02, 0.05)}
+    transmat = np.array([[0.0, 1.0], [0.0, 1.0]])
+
+    first = sim.simulate_paths(100.0, 0, params, transmat=transmat, days=200, sims=400, seed=7)["paths"]
+    again = sim.simulate_paths(100.0, 0, params, transmat=transmat, days=200, sims=400, seed=7)["paths"]
+    np.testing.assert_array_equal(first, again)
+    # Forced into the bear regime from day one: median path drifts down
+    assert np.median(first[:, -1]) < 100.0
+    # Daily moves stay within the +/-30% cap
+    assert np.abs(np.diff(first, axis=1) / first[:, :-1]).max() <= 0.3 + 1e-12
@@ -0,0 +1,40 @@
+import threading
+import time
+import pytest
+from src.core.singleflight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight("test_share")
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(timeout=5)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("SPY", compute))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    while group.stats()["coalesced"] < 7:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(r is results[0] for r in results)
+    assert group.stats() == {"executed": 1, "coalesced": 7, "in_flight": 0}
+
+def test_errors_propagate_and_are_not_cached():
+    group = SingleFlight("test_errors")
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        group.do("QQQ", fail)
+    assert group.do("QQQ", lambda: 42) == 42
+    assert group.stats()["executed"] == 2